@@ -0,0 +1,119 @@
+"""
+algorithms/bitboard.py
+
+Bitboard encoding of the map for tree searches.
+
+Every cell is one bit of a Python int: bit = r * W + c with W = cols + 1.
+The extra (always empty) column stops left/right shifts from wrapping
+into the next row, so whole sets of cells move with four shifts:
+    up = m >> W, down = m << W, left = m >> 1, right = m << 1
+Terrain is a handful of masks (walls, traps, mud, open cells), positions
+are bit indices, and a node's moves are a few bit tests instead of
+get_cell / get_neighbors calls building Cell lists.
+"""
+
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+from environment.cell import TerrainType
+from environment.entities import step_energy_cost
+
+
+class Bitboard:
+    def __init__(self, grid):
+        self.rows, self.cols = grid.rows, grid.cols
+        self.width = W = grid.cols + 1
+        self.grid_fingerprint = grid.fingerprint() # Content, not id(): ids of freed grids are reused
+
+        wall = trap = mud = board = 0
+        size = self.rows * W
+        self.cost = [0] * size   # Cell.cost by bit (pathfinding weight)
+        self.energy = [0] * size # Energy to step in (step_energy_cost), 0 for walls
+        for r in range(self.rows):
+            for c in range(self.cols):
+                cell = grid.get_cell(r, c)
+                bit = 1 << (r * W + c)
+                board |= bit
+                if cell.terrain_type == TerrainType.WALL:
+                    wall |= bit
+                elif cell.terrain_type == TerrainType.TRAP:
+                    trap |= bit
+                elif cell.terrain_type == TerrainType.MUD:
+                    mud |= bit
+                self.cost[r * W + c] = cell.cost
+                self.energy[r * W + c] = step_energy_cost(cell) or 0
+        self.board = board            # Every real cell (padding excluded)
+        self.wall = wall
+        self.trap = trap
+        self.mud = mud
+        self.open = board & ~wall     # Ants may stand here
+        self.safe = self.open & ~trap # The Anteater may stand here
+
+        # Per-bit lookups used by the searches
+        self.row = [i // W for i in range(size)]
+        self.col = [i % W for i in range(size)]
+        self._moves = {True: self._move_table(self.safe), False: self._move_table(self.open)}
+
+    def _move_table(self, allowed):
+        """Moves of every bit into `allowed`, in get_neighbors order (Up, Down, Left, Right)."""
+        W = self.width
+        table = []
+        for i in range(self.rows * W):
+            moves = []
+            for j in (i - W, i + W, i - 1, i + 1):
+                if j >= 0 and (allowed >> j) & 1:
+                    moves.append(j)
+            table.append(tuple(moves))
+        return table
+
+    def matches(self, grid):
+        """True if built from this grid and its terrain is unchanged."""
+        return grid.fingerprint() == self.grid_fingerprint
+
+    # --- Positions ---
+
+    def bit(self, r, c):
+        return r * self.width + c
+
+    def position(self, i):
+        return divmod(i, self.width)
+
+    # --- Move generation ---
+
+    def moves(self, i, avoid_traps=False):
+        """Destination bits from bit i (same rules and order as get_neighbors)."""
+        return self._moves[avoid_traps][i]
+
+    def spread(self, mask, allowed=None):
+        """Cells one step from any cell of mask (within allowed, default open cells)."""
+        W = self.width
+        if allowed is None:
+            allowed = self.open
+        return ((mask >> W) | (mask << W) | (mask >> 1) | (mask << 1)) & allowed
+
+    def reachable(self, r, c, avoid_traps=False, max_steps=None):
+        """Mask of every cell reachable from (r, c), optionally within max_steps."""
+        allowed = self.safe if avoid_traps else self.open
+        seen = 1 << self.bit(r, c)
+        frontier = seen
+        steps = 0
+        while frontier and (max_steps is None or steps < max_steps):
+            frontier = self.spread(frontier, allowed) & ~seen
+            seen |= frontier
+            steps += 1
+        return seen
+
+    def cells(self, mask):
+        """(r, c) of every set bit of mask."""
+        out = []
+        while mask:
+            low = mask & -mask
+            out.append(self.position(low.bit_length() - 1))
+            mask ^= low
+        return out
+
+    @staticmethod
+    def count(mask):
+        return bin(mask).count("1")
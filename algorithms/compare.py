@@ -0,0 +1,128 @@
+"""
+algorithms/compare.py
+
+Side-by-side comparison of the preview planners (BFS, DFS, A*, Scent HC).
+
+All planners run at once in a process pool (pure Python searches would
+take turns on the GIL in threads), each on its own copy of ONE snapshot
+of the map and ant positions taken when the comparison starts. The total
+wait is that of the slowest planner, not the sum. The game loop calls
+poll() once per frame and draws whatever has finished; results of an
+older comparison that arrive late are dropped.
+"""
+
+import time
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from algorithms.pathfinding import bfs, dfs, astar
+from algorithms.hill_climbing import hill_climbing_scent, hill_climbing_scent_multi
+from algorithms.stats import SearchStats
+from environment.entities import Ant, step_energy_cost
+from environment.grid import Grid
+
+ALGORITHMS = ("BFS", "DFS", "A*", "Scent HC")
+
+
+class CompareResult:
+    __slots__ = ("algorithm", "path", "steps", "cost", "elapsed", "stats")
+
+    def __init__(self, algorithm, path, cost, elapsed, stats):
+        self.algorithm = algorithm
+        self.path = path                      # (r, c) positions, start included
+        self.steps = max(0, len(path) - 1)
+        self.cost = cost                      # Energy spent walking it
+        self.elapsed = elapsed                # Seconds inside the worker
+        self.stats = stats                    # SearchStats of the run
+
+
+_WORKER_GRID = [None] # Grid rebuilt from the last snapshot (per worker process)
+
+
+def _run(algorithm, snapshot, start, target, ant_positions):
+    """One planner on a Grid rebuilt from the snapshot (runs in a worker)."""
+    rows, cols, terrain = snapshot
+    grid = _WORKER_GRID[0]
+    if grid is None or (grid.rows, grid.cols) != (rows, cols) or grid.terrain_bytes() != terrain:
+        grid = Grid(rows, cols)
+        grid.load_terrain(terrain)
+        _WORKER_GRID[0] = grid
+
+    stats = SearchStats(algorithm)
+    t0 = time.perf_counter()
+    start_cell = grid.get_cell(*start)
+    if algorithm == "Scent HC":
+        ants = [Ant(r, c) for r, c in ant_positions]
+        if config.HC_CHAINS > 1:
+            path, _, _ = hill_climbing_scent_multi(grid, start_cell, ants, chains=config.HC_CHAINS, stats=stats)
+        else:
+            path, _ = hill_climbing_scent(grid, start_cell, ants, stats=stats)
+    else:
+        search = {"BFS": bfs, "DFS": dfs, "A*": astar}[algorithm]
+        path, _ = search(grid, start_cell, grid.get_cell(*target), stats=stats)
+    elapsed = time.perf_counter() - t0
+    cost = sum(step_energy_cost(cell) for cell in path[1:]) # Start cell is free
+    return CompareResult(algorithm, [cell.position for cell in path], cost, elapsed, stats)
+
+
+class CompareRun:
+    """Runs every planner concurrently and collects the results frame by frame."""
+
+    def __init__(self, workers=None):
+        self.workers = config.COMPARE_WORKERS if workers is None else workers
+        self.pool = None    # Created on first use, reused afterwards
+        self.pending = {}   # Future -> algorithm
+        self.results = {}   # algorithm -> CompareResult
+        self.started = 0.0
+        self.wall_time = None # Seconds from start() to the last result
+
+    def start(self, grid, anteater, ants, target):
+        """Snapshots the map and launches all planners towards target (an Ant)."""
+        self.cancel()
+        if self.pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        snapshot = (grid.rows, grid.cols, grid.terrain_bytes())
+        ant_positions = [a.position for a in ants if a.is_alive]
+        self.started = time.perf_counter()
+        self.wall_time = None
+        for algorithm in ALGORITHMS:
+            future = self.pool.submit(_run, algorithm, snapshot, anteater.position, target.position, ant_positions)
+            self.pending[future] = algorithm
+
+    def poll(self):
+        """Collects finished planners (never blocks); returns True if anything new arrived."""
+        finished = [f for f in self.pending if f.done()]
+        for future in finished:
+            algorithm = self.pending.pop(future)
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                print(f"[COMPARE] {algorithm} failed: {error!r}")
+                continue
+            self.results[algorithm] = future.result()
+        if finished and not self.pending:
+            self.wall_time = time.perf_counter() - self.started
+        return bool(finished)
+
+    @property
+    def running(self):
+        return bool(self.pending)
+
+    def cancel(self):
+        """Forgets the current comparison (planners already running finish unseen)."""
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        self.results.clear()
+        self.wall_time = None
+
+    def close(self):
+        self.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
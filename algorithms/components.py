@@ -0,0 +1,180 @@
+"""
+algorithms/components.py
+
+Connected-component labels of the map, one set per traversal mode.
+
+Two cells get the same label when a walker can go from one to the other
+(walls always block, traps only when avoiding them). "Can the Anteater
+reach that ant?" is then two array reads instead of a search that
+explores the whole region before giving up.
+
+Labels follow the terrain:
+- set_terrain() (one cell) is applied incrementally through the grid's
+  terrain listeners: an opened cell merges its neighbors' components
+  (the smaller ones are relabelled), a blocked cell refloods only the
+  component it belonged to.
+- Bulk changes (new map, clear_zone, load_terrain) only bump
+  terrain_version; the labels are rebuilt on the next query.
+"""
+
+from array import array
+from collections import deque
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+from environment.cell import TerrainType
+
+BLOCKED = -1 # Label of cells the mode cannot stand on
+
+
+def _is_blocked(terrain, avoid_traps):
+    return terrain == TerrainType.WALL or (avoid_traps and terrain == TerrainType.TRAP)
+
+
+class ComponentIndex:
+    def __init__(self, grid):
+        self.grid = grid
+        self.rows, self.cols = grid.rows, grid.cols
+        self.labels = {}   # avoid_traps -> array('i') of labels by flat index
+        self.sizes = {}    # avoid_traps -> {label: cell count}
+        self._next_label = {}
+        self.rebuilds = 0  # Full relabelling passes (stats)
+        self.updates = 0   # Incremental set_terrain updates (stats)
+        self._rebuild()
+        listeners = getattr(grid, "terrain_listeners", None)
+        if listeners is not None:
+            listeners.append(self._terrain_changed)
+
+    # --- Labelling ---
+
+    def _rebuild(self):
+        grid = self.grid
+        self.rows, self.cols = grid.rows, grid.cols
+        terrain = [grid.get_cell(r, c).terrain_type for r in range(self.rows) for c in range(self.cols)]
+        for mode in (True, False):
+            labels = array("i", [BLOCKED]) * len(terrain)
+            self.labels[mode] = labels
+            self.sizes[mode] = {}
+            self._next_label[mode] = 0
+            # Open cells get a placeholder, then one flood per component
+            for i, t in enumerate(terrain):
+                if not _is_blocked(t, mode):
+                    labels[i] = -2
+            for i in range(len(terrain)):
+                if labels[i] == -2:
+                    self._flood(mode, i, -2, self._new_label(mode))
+        self.terrain_version = grid.terrain_version
+        self.rebuilds += 1
+
+    def _new_label(self, mode):
+        label = self._next_label[mode]
+        self._next_label[mode] = label + 1
+        return label
+
+    def _neighbors(self, i):
+        cols = self.cols
+        r, c = divmod(i, cols)
+        if r > 0: yield i - cols
+        if r < self.rows - 1: yield i + cols
+        if c > 0: yield i - 1
+        if c < cols - 1: yield i + 1
+
+    def _flood(self, mode, start, old, new):
+        """Relabels the cells labelled `old` connected to start as `new`; returns how many."""
+        labels = self.labels[mode]
+        labels[start] = new
+        queue = deque([start])
+        count = 1
+        while queue:
+            i = queue.popleft()
+            for j in self._neighbors(i):
+                if labels[j] == old:
+                    labels[j] = new
+                    queue.append(j)
+                    count += 1
+        sizes = self.sizes[mode]
+        sizes[new] = sizes.get(new, 0) + count
+        if old in sizes:
+            sizes[old] -= count
+            if sizes[old] <= 0:
+                del sizes[old]
+        return count
+
+    def _terrain_changed(self, r, c, old, new):
+        """Grid terrain listener: one cell changed from `old` to `new`."""
+        if self.terrain_version != self.grid.terrain_version - 1:
+            return # Already stale (missed a bulk change): rebuilt on the next query
+        i = r * self.cols + c
+        for mode in (True, False):
+            was, now = _is_blocked(old, mode), _is_blocked(new, mode)
+            if was and not now:
+                self._open(mode, i)
+            elif now and not was:
+                self._block(mode, i)
+        self.terrain_version = self.grid.terrain_version
+        self.updates += 1
+
+    def _open(self, mode, i):
+        labels, sizes = self.labels[mode], self.sizes[mode]
+        around = {labels[j] for j in self._neighbors(i) if labels[j] != BLOCKED}
+        if not around:
+            label = self._new_label(mode)
+            labels[i] = label
+            sizes[label] = 1
+            return
+        # Keep the biggest component's label, pour the others into it
+        keep = max(around, key=lambda label: sizes[label])
+        labels[i] = keep
+        sizes[keep] += 1
+        for j in self._neighbors(i):
+            if labels[j] != BLOCKED and labels[j] != keep:
+                self._flood(mode, j, labels[j], keep)
+
+    def _block(self, mode, i):
+        labels, sizes = self.labels[mode], self.sizes[mode]
+        old = labels[i]
+        labels[i] = BLOCKED
+        sizes[old] -= 1
+        if sizes[old] == 0:
+            del sizes[old]
+            return
+        # The component may have split: every piece still labelled `old` gets its own label
+        for j in self._neighbors(i):
+            if labels[j] == old:
+                self._flood(mode, j, old, self._new_label(mode))
+
+    def _current(self):
+        if self.terrain_version != self.grid.terrain_version:
+            self._rebuild()
+
+    # --- Queries ---
+
+    def label(self, pos, avoid_traps=True):
+        """Component of (r, c), or BLOCKED."""
+        self._current()
+        return self.labels[avoid_traps][pos[0] * self.cols + pos[1]]
+
+    def size(self, pos, avoid_traps=True):
+        """Number of cells in the component of (r, c) (0 if blocked)."""
+        label = self.label(pos, avoid_traps)
+        return 0 if label == BLOCKED else self.sizes[avoid_traps][label]
+
+    def connected(self, start_pos, target_pos, avoid_traps=True):
+        """
+        True if a search from start_pos can reach target_pos (same rules as
+        get_neighbors). A start on a blocked cell (the Anteater standing on
+        a trap) can still step out of it, so its neighbors' components count.
+        """
+        self._current()
+        if start_pos == target_pos:
+            return True
+        labels = self.labels[avoid_traps]
+        target = labels[target_pos[0] * self.cols + target_pos[1]]
+        if target == BLOCKED:
+            return False
+        start = start_pos[0] * self.cols + start_pos[1]
+        if labels[start] != BLOCKED:
+            return labels[start] == target
+        return any(labels[j] == target for j in self._neighbors(start))
@@ -0,0 +1,98 @@
+"""
+algorithms/distance_field.py
+
+Flat, array-backed views of the map for bulk queries.
+
+Cells are addressed by their flat index (r * cols + c). The tables are
+built once per map and then shared by every query, so a whole-map
+distance field costs one BFS over plain integers instead of Cell objects.
+"""
+
+from array import array
+from collections import deque
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from environment.cell import TerrainType
+from environment.entities import step_energy_cost
+
+UNREACHABLE = -1
+
+
+def build_adjacency(grid, avoid_traps=False):
+    """
+    Returns a list where entry i is the tuple of flat neighbor indices of
+    cell i, in get_neighbors order (Up, Down, Left, Right).
+    Walls (and traps when avoid_traps=True) are never neighbors.
+    """
+    rows, cols = grid.rows, grid.cols
+    blocked = bytearray(rows * cols)
+    for r in range(rows):
+        for c in range(cols):
+            t = grid.get_cell(r, c).terrain_type
+            if t == TerrainType.WALL or (avoid_traps and t == TerrainType.TRAP):
+                blocked[r * cols + c] = 1
+
+    adjacency = []
+    for r in range(rows):
+        for c in range(cols):
+            n = []
+            if r > 0 and not blocked[(r - 1) * cols + c]: n.append((r - 1) * cols + c)
+            if r < rows - 1 and not blocked[(r + 1) * cols + c]: n.append((r + 1) * cols + c)
+            if c > 0 and not blocked[r * cols + c - 1]: n.append(r * cols + c - 1)
+            if c < cols - 1 and not blocked[r * cols + c + 1]: n.append(r * cols + c + 1)
+            adjacency.append(tuple(n))
+    return adjacency
+
+
+def build_move_costs(grid):
+    """Energy spent to step INTO each cell (same rule as Entity.move_to)."""
+    costs = array("i", [config.ENERGY_COST_MOVE]) * (grid.rows * grid.cols)
+    for r in range(grid.rows):
+        for c in range(grid.cols):
+            cost = step_energy_cost(grid.get_cell(r, c))
+            if cost is not None: # Walls keep a placeholder, they are never entered
+                costs[r * grid.cols + c] = cost
+    return costs
+
+
+def build_terrain_costs(grid):
+    """Pathfinding weight (Cell.cost) of entering each cell."""
+    return [grid.get_cell(r, c).cost for r in range(grid.rows) for c in range(grid.cols)]
+
+
+def reverse_adjacency(adjacency):
+    """For each cell, the cells that can step INTO it."""
+    reverse = [[] for _ in adjacency]
+    for u, neighbors in enumerate(adjacency):
+        for v in neighbors:
+            reverse[v].append(u)
+    return [tuple(r) for r in reverse]
+
+
+def distance_field(adjacency, sources):
+    """
+    Multi-source BFS over a flat adjacency table.
+    Returns array('i') of step distances to the nearest source,
+    UNREACHABLE (-1) where no source can get to.
+    """
+    dist = array("i", [UNREACHABLE]) * len(adjacency)
+    queue = deque()
+    for s in sources:
+        if dist[s] == UNREACHABLE:
+            dist[s] = 0
+            queue.append(s)
+
+    popleft = queue.popleft
+    append = queue.append
+    while queue:
+        i = popleft()
+        d = dist[i] + 1
+        for j in adjacency[i]:
+            if dist[j] == UNREACHABLE:
+                dist[j] = d
+                append(j)
+    return dist
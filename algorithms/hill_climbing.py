@@ -12,29 +12,45 @@ Greedy Best First Search (always pick best neighbor) but without backtracking (n
 To implement Simulated Annealing:
 We will attempt to generate a full path or a sequence of moves by iterating.
 If we get stuck (local optimum), we accept a bad move with probability P.
+
+hill_climbing_scent_multi runs many independent annealing chains (random
+restarts) over a flat copy of the scent map, optionally spread across
+worker processes, and keeps the best path.
 """
 
 import random
 import math
+import time
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
 from environment.cell import TerrainType
+from algorithms.distance_field import build_adjacency
+
+GOAL_SCENT = 20 # Scent on top of an ant (grid.update_scent source level)
 
 def manhattan_distance(a, b):
     return abs(a.r - b.r) + abs(a.c - b.c)
 
-def hill_climbing_scent(grid, start_cell, ants, max_iterations=1000):
+def hill_climbing_scent(grid, start_cell, ants, max_iterations=1000, stats=None):
     """
     Hill Climbing based on SCENT (Pheromone).
     The Anteater climbs the gradient of HIGHEST Pheromone level.
+    If a SearchStats is given, the work done is added to it
+    (steps back onto an already visited cell count as re-expansions).
     """
+    t0 = time.perf_counter()
+    generated = 0
+    revisits = 0
+
     # 1. Update Scent Grid first
     grid.update_scent(ants)
     
     current = start_cell
     path = [current]
+    visited = {current} # Cells hash by position: O(1) instead of scanning path
     explored_nodes = [current]
     
     # Annealing Parameters
@@ -53,6 +69,7 @@ def hill_climbing_scent(grid, start_cell, ants, max_iterations=1000):
         neighbors = grid.get_neighbors(current, avoid_traps=False)
         if not neighbors:
             break
+        generated += len(neighbors)
         
         # Sort by scent (Descent: Max to Min)
         # If a Trap has high scent (because it's the shortest path for scent propagation),
@@ -62,7 +79,7 @@ def hill_climbing_scent(grid, start_cell, ants, max_iterations=1000):
         best_next = None
         for n in neighbors:
             # We only skip Walls (already handled by get_neighbors) or visited loops
-            if n not in path:
+            if n not in visited:
                 if n.pheromone_level > current.pheromone_level:
                     best_next = n
                     break
@@ -104,10 +121,151 @@ def hill_climbing_scent(grid, start_cell, ants, max_iterations=1000):
                 # Let's pick best available to keep moving towards 'flat' if necessary
                 chosen = best_next
         
+        if stats is not None and chosen in visited:
+            revisits += 1
         current = chosen
         path.append(current)
+        visited.add(current)
         explored_nodes.append(current)
 
         T = T * alpha
     
+    if stats is not None:
+        steps = len(path) - 1
+        stats.record(time.perf_counter() - t0, expanded=steps, generated=generated,
+                     pushes=steps, pops=steps, reexpansions=revisits, peak_frontier=1)
     return path, explored_nodes
+
+
+def _anneal_chain(scent, adjacency, start, max_iterations, seed, T_initial=100.0, alpha=0.95):
+    """
+    One annealing chain over flat tables, same rules as hill_climbing_scent.
+    Returns (path of flat indices, generated, revisits).
+    """
+    rng = random.Random(seed)
+    current = start
+    path = [current]
+    visited = {current}
+    generated = revisits = 0
+    T = T_initial
+
+    for _ in range(max_iterations):
+        level = scent[current]
+        if level >= GOAL_SCENT:
+            break
+        neighbors = adjacency[current]
+        if not neighbors:
+            break
+        generated += len(neighbors)
+        neighbors = sorted(neighbors, key=scent.__getitem__, reverse=True) # Stable: ties keep U/D/L/R
+
+        best_next = None
+        for n in neighbors:
+            if n not in visited and scent[n] >= level:
+                best_next = n
+                break
+        if best_next is None:
+            best_next = neighbors[0]
+
+        delta = scent[best_next] - level
+        if delta > 0 or rng.random() >= math.exp(delta / max(T, 0.0001)):
+            chosen = best_next
+        else:
+            chosen = rng.choice(neighbors)
+
+        if chosen in visited:
+            revisits += 1
+        else:
+            visited.add(chosen)
+        current = chosen
+        path.append(current)
+        T = T * alpha
+    return path, generated, revisits
+
+
+def _erase_loops(path):
+    """Cuts every loop out of a walk: same endpoints, each cell at most once."""
+    out = []
+    position = {}
+    for i in path:
+        if i in position:
+            for dropped in out[position[i] + 1:]:
+                del position[dropped]
+            del out[position[i] + 1:]
+        else:
+            position[i] = len(out)
+            out.append(i)
+    return out
+
+
+def _run_chains(scent, adjacency, start, max_iterations, seeds, deadline=None):
+    """Runs chains until done (or the deadline); one result dict per chain."""
+    results = []
+    for seed in seeds:
+        if deadline is not None and results and time.perf_counter() >= deadline:
+            break
+        walk, generated, revisits = _anneal_chain(scent, adjacency, start, max_iterations, seed)
+        path = _erase_loops(walk)
+        results.append({
+            "seed": seed,
+            "reached": scent[path[-1]] >= GOAL_SCENT,
+            "final_scent": scent[path[-1]],
+            "steps": len(path) - 1,
+            "walk_steps": len(walk) - 1,
+            "generated": generated,
+            "revisits": revisits,
+            "path": path,
+            "walk": walk,
+        })
+    return results
+
+
+def hill_climbing_scent_multi(grid, start_cell, ants, chains=8, max_iterations=1000,
+                              seed=None, workers=0, time_budget=None, stats=None):
+    """
+    Runs `chains` independent annealing chains from start_cell and returns
+    (best path, explored_nodes, chain_stats).
+
+    - Best: reaches an ant in the fewest steps; otherwise ends on the
+      highest scent. Each chain's walk is loop-erased, so the path never
+      repeats a cell.
+    - seed: chain k uses seed + k, so a run is reproducible.
+    - workers > 0 spreads the chains over that many processes.
+    - time_budget (seconds) stops starting new chains once spent
+      (sequential mode only; at least one chain always runs).
+    chain_stats holds one dict per chain (seed, reached, final_scent,
+    steps, walk_steps, generated, revisits), in chain order.
+    """
+    t0 = time.perf_counter()
+    grid.update_scent(ants)
+    cols = grid.cols
+    scent = [grid.get_cell(r, c).pheromone_level for r in range(grid.rows) for c in range(cols)]
+    adjacency = build_adjacency(grid, avoid_traps=False) # Scent is followed even into Traps
+    start = start_cell.r * cols + start_cell.c
+    base = random.randrange(1 << 30) if seed is None else seed
+    seeds = [base + k for k in range(chains)]
+
+    if workers > 0 and chains > 1:
+        from concurrent.futures import ProcessPoolExecutor # Only paid for when workers are used
+        batches = [seeds[k::workers] for k in range(workers) if seeds[k::workers]]
+        with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+            futures = [pool.submit(_run_chains, scent, adjacency, start, max_iterations, batch)
+                       for batch in batches]
+            results = [r for f in futures for r in f.result()]
+        results.sort(key=lambda r: r["seed"])
+    else:
+        deadline = t0 + time_budget if time_budget is not None else None
+        results = _run_chains(scent, adjacency, start, max_iterations, seeds, deadline)
+
+    best = min(results, key=lambda r: (not r["reached"], -r["final_scent"], r["steps"], r["seed"]))
+    path = [grid.get_cell(*divmod(i, cols)) for i in best["path"]]
+    explored_nodes = [grid.get_cell(*divmod(i, cols)) for i in best["walk"]]
+    chain_stats = [{k: v for k, v in r.items() if k not in ("path", "walk")} for r in results]
+
+    if stats is not None:
+        walked = sum(r["walk_steps"] for r in results)
+        stats.record(time.perf_counter() - t0, expanded=walked,
+                     generated=sum(r["generated"] for r in results),
+                     pushes=walked, pops=walked,
+                     reexpansions=sum(r["revisits"] for r in results), peak_frontier=len(results))
+    return path, explored_nodes, chain_stats
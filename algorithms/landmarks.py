@@ -0,0 +1,169 @@
+"""
+algorithms/landmarks.py
+
+ALT heuristic for astar() (A*, Landmarks, Triangle inequality).
+
+Manhattan distance knows nothing about walls, so around the gates, the
+spiral and the mud fields A* floods most of the map. Landmarks fixes that
+with a little precomputation per map:
+- Pick K landmark cells spread over the map (farthest-point selection).
+- From each landmark L, one Dijkstra forwards (d(L, x)) and one backwards
+  (d(x, L)), with the same Cell.cost weights and avoid_traps rule as astar.
+- For any cell n and target t, the triangle inequality gives two lower
+  bounds on d(n, t):
+      d(L, t) - d(L, n)   and   d(n, L) - d(t, L)
+  The heuristic is the best of them over all landmarks (and Manhattan),
+  so it stays admissible and A* still returns optimal paths.
+Tables depend only on the terrain, so with a PrecomputeCache they are
+saved to disk keyed by grid.fingerprint() and memory-mapped back for the
+same map.
+"""
+
+import heapq
+import time
+from array import array
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from algorithms.distance_field import build_adjacency, build_terrain_costs, reverse_adjacency
+
+UNREACHABLE = -1
+VERSION = 1 # Bump when the tables' content changes (invalidates cached ones)
+
+
+def _dijkstra(adjacency, costs, source):
+    """Weighted distances from source (stepping into v costs costs[v]), UNREACHABLE where none."""
+    dist = array("q", [UNREACHABLE]) * len(adjacency)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for v in adjacency[u]:
+            nd = d + costs[v]
+            if dist[v] == UNREACHABLE or nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def _dijkstra_to(reverse, costs, target):
+    """Weighted distances TO target (stepping into v costs costs[v])."""
+    dist = array("q", [UNREACHABLE]) * len(reverse)
+    dist[target] = 0
+    heap = [(0, target)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if d > dist[v]:
+            continue
+        nd = d + costs[v]
+        for u in reverse[v]:
+            if dist[u] == UNREACHABLE or nd < dist[u]:
+                dist[u] = nd
+                heapq.heappush(heap, (nd, u))
+    return dist
+
+
+class Landmarks:
+    def __init__(self, grid, count=None, avoid_traps=True, cache=None):
+        """
+        Builds (or loads from a PrecomputeCache) the landmark tables of this map.
+        count: number of landmarks (default config.ALT_LANDMARKS).
+        """
+        t0 = time.perf_counter()
+        self.grid = grid
+        self.rows, self.cols = grid.rows, grid.cols
+        self.count = config.ALT_LANDMARKS if count is None else count
+        self.avoid_traps = avoid_traps
+        self.grid_fingerprint = grid.fingerprint() # Content, not id(): ids of freed grids are reused
+        self.from_cache = False
+
+        if cache is not None:
+            key = (VERSION, self.count, avoid_traps, config.COST_NORMAL, config.COST_MUD, config.COST_TRAP)
+            tables = cache.load("landmarks", grid.fingerprint(), key)
+            if tables is not None:
+                self.from_cache = True
+            else:
+                tables = self._build(grid)
+                cache.store("landmarks", grid.fingerprint(), tables, key)
+        else:
+            tables = self._build(grid)
+        # Layout: landmark cells, then k forward and k backward tables
+        k = len(tables[0])
+        self.landmarks = list(tables[0])
+        self.forward, self.backward = tables[1:k + 1], tables[k + 1:]
+        self.build_time = time.perf_counter() - t0
+
+    # --- Precomputation ---
+
+    def _build(self, grid):
+        adjacency = build_adjacency(grid, self.avoid_traps)
+        reverse = reverse_adjacency(adjacency)
+        costs = build_terrain_costs(grid)
+        size = len(adjacency)
+        # Cells some move leads into: the ones the mode can stand on
+        open_cells = [i for i in range(size) if reverse[i]]
+
+        landmarks = []
+        forward_tables = []  # d(L, x) per landmark
+        backward_tables = [] # d(x, L) per landmark
+        if not open_cells:
+            return [array("i")]
+
+        # Farthest-point selection: start from the cell farthest from the
+        # first open cell, then always add the cell farthest from all landmarks
+        seed = _dijkstra(adjacency, costs, open_cells[0])
+        nearest = array("q", [UNREACHABLE]) * size # Distance to the closest landmark so far
+        candidate = max(open_cells, key=lambda i: seed[i])
+        while len(landmarks) < min(self.count, len(open_cells)):
+            forward = _dijkstra(adjacency, costs, candidate)
+            landmarks.append(candidate)
+            forward_tables.append(forward)
+            backward_tables.append(_dijkstra_to(reverse, costs, candidate))
+            for i in open_cells:
+                d = forward[i]
+                if d != UNREACHABLE and (nearest[i] == UNREACHABLE or d < nearest[i]):
+                    nearest[i] = d
+            # Cells no landmark reaches yet (another component) come first
+            candidate = max(open_cells, key=lambda i: (nearest[i] == UNREACHABLE, nearest[i]))
+            if nearest[candidate] == 0:
+                break # Every cell is a landmark already
+        return [array("i", landmarks)] + forward_tables + backward_tables
+
+    # --- Queries ---
+
+    def matches(self, grid, avoid_traps=True):
+        """True if built for this grid, mode and (unchanged) terrain."""
+        return grid.fingerprint() == self.grid_fingerprint and avoid_traps == self.avoid_traps
+
+    def estimate(self, cell, target_cell):
+        """Admissible lower bound on the astar() cost from cell to target_cell."""
+        return self.heuristic(target_cell)(cell)
+
+    def heuristic(self, target_cell):
+        """
+        h(cell) towards target_cell, for astar(heuristic=...). The target's
+        landmark distances are looked up once here, not on every call.
+        """
+        cols = self.cols
+        tr, tc = target_cell.r, target_cell.c
+        t = tr * cols + tc
+        terms = [(forward, forward[t], backward, backward[t])
+                 for forward, backward in zip(self.forward, self.backward)]
+
+        def h(cell):
+            n = cell.r * cols + cell.c
+            best = abs(cell.r - tr) + abs(cell.c - tc) # Manhattan (every step costs >= 1)
+            for forward, ft, backward, bt in terms:
+                fn, bn = forward[n], backward[n]
+                # Unreachable entries give no bound (skipping them stays admissible)
+                if ft != UNREACHABLE and fn != UNREACHABLE and ft - fn > best:
+                    best = ft - fn
+                if bn != UNREACHABLE and bt != UNREACHABLE and bn - bt > best:
+                    best = bn - bt
+            return best
+        return h
@@ -0,0 +1,260 @@
+"""
+algorithms/mcts.py
+
+Adversarial Search: Monte Carlo Tree Search (UCT).
+Context: Anteater vs ALL living ants (no 1 vs 1 reduction).
+
+The tree only branches on the Anteater's moves (open loop): the ants'
+replies are sampled again on every iteration, so the branching factor
+stays at most 4 no matter how many ants are alive.
+- Selection:  UCB1 over the Anteater's moves.
+- Expansion:  one new child per iteration.
+- Playout:    fast rollout on a GameState (the rules every planner shares):
+              the Anteater walks greedily towards the closest ant, ants run
+              away from it, both with some randomness.
+- Reward:     every ant eaten is worth gamma^tick; a small bonus for ending
+              close to an ant breaks ties between empty playouts.
+Budget: a number of iterations and/or a time limit per move. With workers
+> 0 the search runs root-parallel: independent trees in a process pool,
+root statistics summed.
+"""
+
+import math
+import random
+import time
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from algorithms.bitboard import Bitboard
+from algorithms.stats import SearchStats
+from environment.game_state import GameState, WAIT
+
+
+class _Node:
+    __slots__ = ("children", "untried", "visits", "value")
+
+    def __init__(self, moves):
+        self.children = {}          # move (flat index) -> _Node
+        self.untried = list(moves)  # Moves not expanded yet
+        self.visits = 0
+        self.value = 0.0
+
+
+class _Playout:
+    """Rollout policies and rewards over a GameState (the shared make-move path)."""
+
+    def __init__(self, board, params, rng):
+        self.board = board
+        (self.rollout_depth, self.gamma, self.greedy, self.flee) = params
+        self.rng = rng
+
+    def reset(self, state):
+        self.state = state.copy()
+        self.start_tick = state.tick
+        self.reward = 0.0
+
+    def done(self):
+        return self.state.is_terminal
+
+    def _play(self, move):
+        state = self.state
+        alive = state.alive_count
+        state.apply_move(move)
+        if state.alive_count < alive: # Every ant eaten is worth gamma^tick
+            self.reward += (alive - state.alive_count) * self.gamma ** (state.tick - self.start_tick)
+
+    def _hunter_moves(self):
+        state = self.state
+        return [m for m in state.legal_moves() if not state.is_lethal(m)] # Never walks into traps
+
+    def _ant_move(self):
+        state = self.state
+        moves = state.legal_moves()
+        if len(moves) == 1 or self.rng.random() >= self.flee:
+            return self.rng.choice(moves)
+        row, col = self.board.row, self.board.col
+        hr, hc = row[state.hunter], col[state.hunter]
+        here = state.ants[state.turn - 1]
+        return max(moves, key=lambda m: abs(row[m if m != WAIT else here] - hr) + abs(col[m if m != WAIT else here] - hc))
+
+    def advance(self, move):
+        """One game tick: the Anteater tries `move`, then every ant replies."""
+        state = self.state
+        moves = self._hunter_moves()
+        if move not in moves: # Open loop: a stale tree move (the state differs this time)
+            move = self.rng.choice(moves) if moves else WAIT
+        self._play(move)
+        while state.turn != 0 and not state.is_terminal:
+            self._play(self._ant_move())
+
+    def rollout_move(self):
+        """Greedy step towards the closest ant (random with probability 1 - greedy)."""
+        state = self.state
+        moves = self._hunter_moves()
+        if not moves:
+            return WAIT
+        if len(moves) == 1 or self.rng.random() >= self.greedy:
+            return self.rng.choice(moves)
+        row, col = self.board.row, self.board.col
+        hr, hc = row[state.hunter], col[state.hunter]
+        target = min((p for p, a in zip(state.ants, state.ant_alive) if a),
+                     key=lambda t: abs(row[t] - hr) + abs(col[t] - hc))
+        tr, tc = row[target], col[target]
+        here = state.hunter
+        return min(moves, key=lambda m: abs(row[m if m != WAIT else here] - tr) + abs(col[m if m != WAIT else here] - tc))
+
+    def rollout(self):
+        """Plays on to the rollout horizon; returns (reward, ticks played)."""
+        state = self.state
+        start = state.tick
+        while state.tick - start < self.rollout_depth and not self.done():
+            self.advance(self.rollout_move())
+        reward = self.reward
+        if not self.done():
+            row, col = self.board.row, self.board.col
+            nearest = min(abs(row[p] - row[state.hunter]) + abs(col[p] - col[state.hunter])
+                          for p, a in zip(state.ants, state.ant_alive) if a)
+            reward += 0.01 * (1.0 - nearest / (self.board.rows + self.board.cols))
+        return reward, state.tick - start
+
+
+def _search(state, params, exploration, iterations, time_budget, seed):
+    """
+    Runs one UCT tree from a GameState (Anteater to move). Returns (root
+    stats {move: (visits, value)}, iterations run, rollout ticks, nodes
+    created, max tree depth).
+    """
+    rng = random.Random(seed)
+    sim = _Playout(state.board, params, rng)
+    sim.reset(state)
+    root = _Node(sim._hunter_moves())
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    runs = ticks = nodes = max_depth = 0
+
+    while True:
+        if iterations is not None and runs >= iterations:
+            break
+        if deadline is not None and runs and time.perf_counter() >= deadline:
+            break
+        sim.reset(state)
+        node = root
+        path = [root]
+
+        # 1. Selection
+        while not node.untried and node.children and not sim.done():
+            log_n = math.log(node.visits)
+            move, node = max(node.children.items(),
+                             key=lambda kv: kv[1].value / kv[1].visits
+                             + exploration * math.sqrt(log_n / kv[1].visits))
+            sim.advance(move)
+            path.append(node)
+
+        # 2. Expansion
+        if node.untried and not sim.done():
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            sim.advance(move)
+            child = _Node(sim._hunter_moves())
+            node.children[move] = child
+            node = child
+            path.append(node)
+            nodes += 1
+
+        # 3. Playout
+        reward, played = sim.rollout()
+        ticks += played
+
+        # 4. Backpropagation
+        for visited in path:
+            visited.visits += 1
+            visited.value += reward
+        runs += 1
+        if len(path) - 1 > max_depth:
+            max_depth = len(path) - 1
+
+    root_stats = {move: (child.visits, child.value) for move, child in root.children.items()}
+    return root_stats, runs, ticks, nodes, max_depth
+
+
+class MCTSAI:
+    def __init__(self, iterations=None, time_budget=None, exploration=None, rollout_depth=None,
+                 gamma=0.95, greedy=0.8, flee=0.8, workers=0, seed=None):
+        """
+        iterations / time_budget: per move; either may be None (defaults
+        from config). workers > 0: root-parallel over that many processes.
+        greedy / flee: how often the Anteater / ants follow the rollout
+        policy instead of a random move.
+        """
+        self.iterations = config.MCTS_ITERATIONS if iterations is None else iterations
+        self.time_budget = config.MCTS_TIME_BUDGET if time_budget is None else time_budget
+        if self.iterations is None and self.time_budget is None:
+            raise ValueError("MCTSAI needs an iteration count or a time budget")
+        self.exploration = config.MCTS_EXPLORATION if exploration is None else exploration
+        self.rollout_depth = config.MCTS_ROLLOUT_DEPTH if rollout_depth is None else rollout_depth
+        self.gamma = gamma
+        self.greedy = greedy
+        self.flee = flee
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.stats = SearchStats("MCTS")        # Last get_best_move call
+        self.total_stats = SearchStats("MCTS")  # Aggregated over all calls
+        self.board = None # Bitboard of the last grid searched
+
+    def _get_board(self, grid):
+        """Bitboard for this grid, rebuilt when the terrain changes."""
+        if self.board is None or not self.board.matches(grid):
+            self.board = Bitboard(grid)
+        return self.board
+
+    def get_best_move(self, grid, anteater, ants, index=None):
+        """
+        Determines the Anteater's next cell with UCT against every living ant.
+        Returns None when no ant is alive or the Anteater cannot move.
+        index is accepted for interface parity with MinimaxAI (unused).
+        """
+        t0 = time.perf_counter()
+        alive_ants = [a for a in ants if a.is_alive]
+        if not alive_ants:
+            return None # Victory state
+
+        board = self._get_board(grid)
+        state = GameState.from_entities(board, anteater, alive_ants)
+        if state.is_terminal or not [m for m in state.legal_moves() if not state.is_lethal(m)]:
+            return None
+        params = (self.rollout_depth, self.gamma, self.greedy, self.flee)
+        seeds = [self.rng.randrange(1 << 30) for _ in range(max(1, self.workers))]
+
+        if self.workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            share = None if self.iterations is None else -(-self.iterations // self.workers)
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(_search, state, params, self.exploration,
+                                       share, self.time_budget, s) for s in seeds]
+                results = [f.result() for f in futures]
+        else:
+            results = [_search(state, params, self.exploration,
+                               self.iterations, self.time_budget, seeds[0])]
+
+        # Root-parallel merge: sum visits and values per move
+        merged = {}
+        for root_stats, _, _, _, _ in results:
+            for move, (visits, value) in root_stats.items():
+                v, w = merged.get(move, (0, 0.0))
+                merged[move] = (v + visits, w + value)
+        best = max(merged.items(), key=lambda kv: (kv[1][0], kv[1][1]))[0] # Most visited
+
+        self.stats = SearchStats("MCTS")
+        self.stats.record(time.perf_counter() - t0,
+                          expanded=sum(r[1] for r in results),
+                          generated=sum(r[2] for r in results),
+                          pushes=sum(r[3] for r in results),
+                          peak_frontier=max(r[4] for r in results))
+        self.total_stats.merge(self.stats)
+        if best == WAIT:
+            # Resting = trying a step it cannot afford (move_to starts recovery)
+            best = next((j for j in board.moves(state.hunter) if board.energy[j] > anteater.energy), None)
+            if best is None:
+                return None
+        return grid.get_cell(*board.position(best))
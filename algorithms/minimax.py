@@ -4,22 +4,92 @@ algorithms/minimax.py
 Adversarial Search: Minimax with Alpha-Beta Pruning.
 Context: Anteater (MAX) vs MULTIPLE Ants (MIN).
 
+Move ordering (so cutoffs come early):
+- Distance to target: the Anteater tries closing moves first, the Ant
+  tries escaping moves first.
+- Killer moves: destinations that caused a cutoff at the same ply.
+- History heuristic: (side, from, to) moves that caused cutoffs before,
+  weighted by depth^2, break the remaining ties.
+Principal Variation Search (pvs=True): the first move gets the full
+window, the rest a null window, re-searched only when they beat it.
+Off by default: with only 4 moves per node the re-searches cost more
+than the null windows save (about +4% nodes at depth 6-8).
+The search walks one GameState with apply_move / undo_move (Bitboard
+positions, real energy rules: step costs, recovery, captures), so nodes
+never touch Cell or Entity objects.
+With a DuelTablebase attached, won 1 vs 1 positions are played straight
+from the table (no search) when the win fits in the Anteater's tank; the
+search runs everywhere else.
 """
 
+import time
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
 from environment.cell import TerrainType
+from algorithms.stats import SearchStats
+from algorithms.bitboard import Bitboard
+from environment.game_state import GameState, WAIT
+
+PVS_WINDOW = 1e-6 # Null-window width (scores move in steps of 0.5)
 
 def manhattan_distance(r1, c1, r2, c2):
     return abs(r1 - r2) + abs(c1 - c2)
 
 class MinimaxAI:
-    def __init__(self, depth=4):
+    def __init__(self, depth=4, ordering=True, pvs=False, tablebase=None):
         self.max_depth = depth
+        self.ordering = ordering   # Killer / distance / history move ordering
+        self.pvs = pvs             # Null-window search after the first move
+        self.tablebase = tablebase # Optional DuelTablebase for 1 vs 1 positions
+        self.board = None          # Bitboard of the last grid searched
+        self.stats = SearchStats("Minimax")        # Last get_best_move call
+        self.total_stats = SearchStats("Minimax")  # Aggregated over all calls
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._expanded = 0
+        self._generated = 0
+        self._cutoffs = 0
+        self._researches = 0
+        self._killers = [[] for _ in range(self.max_depth + 1)] # Per ply, newest first
+        self._history = {}
+
+    def _get_board(self, grid):
+        """Bitboard for this grid, rebuilt when the terrain changes."""
+        if self.board is None or not self.board.matches(grid):
+            self.board = Bitboard(grid)
+        return self.board
+
+    def _order_moves(self, moves, ply, is_maximizing, origin, target):
+        """By distance to the target, then killers first, then by history score."""
+        killers = self._killers[ply]
+        history = self._history
+        row, col = self.board.row, self.board.col
+        tr, tc = row[target], col[target]
+        sign = 1 if is_maximizing else -1 # Anteater closes in, Ant runs away
+
+        def key(move):
+            cell = move if move != WAIT else origin # Waiting keeps the distance
+            return (sign * (abs(row[cell] - tr) + abs(col[cell] - tc)),
+                    move not in killers,
+                    -history.get((is_maximizing, origin, move), 0))
+        return sorted(moves, key=key)
 
-    def get_best_move(self, grid, anteater, ants):
+    def _record_cutoff(self, ply, depth, is_maximizing, origin, move):
+        self._cutoffs += 1
+        if not self.ordering:
+            return
+        killers = self._killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        key = (is_maximizing, origin, move)
+        self._history[key] = self._history.get(key, 0) + depth * depth
+
+    def get_best_move(self, grid, anteater, ants, index=None):
         """
         Determines the optimal move for the Anteater using Minimax.
         
@@ -28,7 +98,12 @@ class MinimaxAI:
         2. Run Minimax (Depth 4) to predict outcomes.
         3. Anteater (Max) tries to maximize Score (minimize distance).
         4. Ant (Min) tries to minimize Score (maximize distance).
+
+        index: optional SpatialIndex over `ants` for the target lookup.
         """
+        t0 = time.perf_counter()
+        self._reset_counters()
+
         # 1. Filter Alive Ants
         alive_ants = [a for a in ants if a.is_alive]
         if not alive_ants:
@@ -36,11 +111,28 @@ class MinimaxAI:
             
         # 2. Select Target: Closest Ant
         # This simplifies the problem from "N Ants" to "1 vs 1 Duel".
-        closest_ant = min(alive_ants, key=lambda a: manhattan_distance(a.r, a.c, anteater.r, anteater.c))
+        # With a SpatialIndex the lookup is a ring search instead of a scan.
+        closest_ant = index.closest(anteater.r, anteater.c) if index is not None else None
+        if closest_ant is None:
+            closest_ant = min(alive_ants, key=lambda a: manhattan_distance(a.r, a.c, anteater.r, anteater.c))
+
+        # Solved duel: play the table's fastest capture
+        if self.tablebase is not None and len(alive_ants) == 1 and self.tablebase.matches(grid):
+            move = self.tablebase.best_move(anteater.position, closest_ant.position,
+                                            closest_ant.energy, closest_ant.recovering, anteater.energy)
+            if move is not None:
+                self.stats = SearchStats("Minimax")
+                self.stats.record(time.perf_counter() - t0, tt_hits=1)
+                self.total_stats.merge(self.stats)
+                return grid.get_cell(*move)
 
         # 3. Get Legal Moves for Anteater (Traps are VALID but LETHAL)
         # User Request: "Anteater can enter and die".
-        neighbors = grid.get_neighbors(grid.get_cell(*anteater.position), avoid_traps=False)
+        board = self._get_board(grid)
+        state = GameState.from_entities(board, anteater, [closest_ant])
+        neighbors = state.legal_moves()
+        if self.ordering:
+            neighbors = self._order_moves(neighbors, 0, True, state.hunter, state.ants[0])
         
         best_score = float('-inf')
         best_move = None
@@ -51,20 +143,14 @@ class MinimaxAI:
         for move in neighbors:
             # If move is lethal, we don't recurse (Game Over state).
             # We assign a terrible score.
-            if move.is_lethal:
+            if state.is_lethal(move):
                 score = -10000 # Instant Death
             else:
                 # Simulate Move
-                # Recursive Call: It's now the Ant's turn (Maximizing=False)
-                score = self.minimax(grid, 
-                                     move.position, 
-                                     closest_ant.position, 
-                                     self.max_depth - 1, 
-                                     False, # Next is Minimizer (Ant)
-                                     alpha, 
-                                     beta, 
-                                     anteater.energy - move.cost, 
-                                     closest_ant.energy)
+                # Recursive Call: It's now the Ant's turn (Minimizer)
+                state.apply_move(move)
+                score = self._search_child(state, self.max_depth - 1, alpha, beta, best_move is not None)
+                state.undo_move()
             
             # Select Best
             if score > best_score:
@@ -74,73 +160,122 @@ class MinimaxAI:
             # Alpha-Beta Pruning
             alpha = max(alpha, best_score)
             
-        return best_move
+        self._generated += len(neighbors)
+        self.stats = SearchStats("Minimax")
+        self.stats.record(time.perf_counter() - t0, expanded=self._expanded + 1,
+                          generated=self._generated, cutoffs=self._cutoffs,
+                          reexpansions=self._researches, peak_frontier=self.max_depth)
+        self.total_stats.merge(self.stats)
+        if best_move is None:
+            return None
+        if best_move == WAIT:
+            # Resting = trying a step it cannot afford (move_to starts recovery)
+            best_move = next((j for j in board.moves(state.hunter) if board.energy[j] > anteater.energy), None)
+            if best_move is None:
+                return None
+        return grid.get_cell(*board.position(best_move))
 
-    def minimax(self, grid, anteater_pos, ant_pos, depth, is_maximizing, alpha, beta, ant_energy, anteater_energy):
+    def _search_child(self, state, depth, alpha, beta, null_window):
         """
-        Recursive Minimax Function.
+        Searches one child of a node. With PVS, every child but the first
+        gets a null window first; if it lands strictly inside (alpha, beta)
+        it is re-searched with the full window.
+        """
+        if not (self.pvs and null_window):
+            return self._alphabeta(state, depth, alpha, beta)
+
+        if state.turn == 0: # Parent is the Ant (MIN): can this move go below beta?
+            score = self._alphabeta(state, depth, beta - PVS_WINDOW, beta)
+        else:               # Parent is the Anteater (MAX): can this move beat alpha?
+            score = self._alphabeta(state, depth, alpha, alpha + PVS_WINDOW)
+        if alpha < score < beta:
+            self._researches += 1
+            score = self._alphabeta(state, depth, alpha, beta)
+        return score
+
+    def minimax(self, grid, anteater_pos, ant_pos, depth, is_maximizing, alpha, beta, anteater_energy, ant_energy):
+        """
+        Minimax value of a 1 vs 1 position given as (r, c) tuples
+        (both sides not recovering).
+        """
+        board = self._get_board(grid)
+        state = GameState(board, board.bit(*anteater_pos), anteater_energy,
+                          [board.bit(*ant_pos)], [ant_energy], turn=0 if is_maximizing else 1)
+        return self._alphabeta(state, depth, alpha, beta)
+
+    def _alphabeta(self, state, depth, alpha, beta):
+        """
+        Recursive Minimax Function over a GameState (make / unmake in place).
+        The side to move is state.turn: 0 = Anteater (MAX), 1 = Ant (MIN).
         """
-        ar, ac = anteater_pos
-        tr, tc = ant_pos 
-        
         # --- Terminal Conditions ---
         
         # 1. Caught the Ant
-        if (ar, ac) == (tr, tc):
+        if state.alive_count == 0:
             return 10000 # High positive score for Anteater Victory
         
         # 2. Depth limit reached
+        board = self.board
+        hunter, ant = state.hunter, state.ants[0]
         if depth == 0:
-            return self.evaluate(ar, ac, tr, tc, anteater_energy)
+            return self.evaluate(board.row[hunter], board.col[hunter],
+                                 board.row[ant], board.col[ant], state.hunter_energy)
+
+        self._expanded += 1
+        ply = self.max_depth - depth
+        neighbors = state.legal_moves()
+        self._generated += len(neighbors)
+        searched = False
 
         # --- Recursion ---
         
-        if is_maximizing:
+        if state.turn == 0:
             # === ANTEATER'S TURN (Maximize Score) ===
-            # Constraint: Can enter Traps (avoid_traps=False)
+            # Constraint: Can enter Traps (lethal)
             max_eval = float('-inf')
-            current_cell = grid.get_cell(ar, ac)
-            neighbors = grid.get_neighbors(current_cell, avoid_traps=False)
+            if self.ordering:
+                neighbors = self._order_moves(neighbors, ply, True, hunter, ant)
             
             for move in neighbors:
-                if move.is_lethal: 
+                if state.is_lethal(move): 
                     # If we step on a trap, we die. Score is minimal.
                     # No recursion needed.
                     eval_score = -10000
                 else:
-                    new_energy = anteater_energy - move.cost
-                    if new_energy <= 0: continue # Cannot move if exhausted
-                
-                    eval_score = self.minimax(grid, move.position, ant_pos, depth - 1, False, alpha, beta, ant_energy, new_energy)
+                    state.apply_move(move)
+                    eval_score = self._search_child(state, depth - 1, alpha, beta, searched)
+                    state.undo_move()
+                    searched = True
                 
                 max_eval = max(max_eval, eval_score)
                 alpha = max(alpha, eval_score)
                 
                 if beta <= alpha: # Prune
+                    self._record_cutoff(ply, depth, True, hunter, move)
                     break
             
-            # If no valid moves, it's a loss/stuck state
-            return max_eval if max_eval != float('-inf') else -5000
+            return max_eval
             
         else:
             # === ANT'S TURN (Minimize Score) ===
-            # Constraint: Can walk on Traps (Passes avoid_traps=False)
+            # Constraint: Can walk on Traps
             min_eval = float('inf')
-            current_cell = grid.get_cell(tr, tc)
-            neighbors = grid.get_neighbors(current_cell, avoid_traps=False)
+            if self.ordering:
+                neighbors = self._order_moves(neighbors, ply, False, ant, hunter)
             
             for move in neighbors:
-                new_energy = ant_energy - move.cost
-                if new_energy <= 0: continue
-
-                eval_score = self.minimax(grid, anteater_pos, move.position, depth - 1, True, alpha, beta, new_energy, anteater_energy)
+                state.apply_move(move)
+                eval_score = self._search_child(state, depth - 1, alpha, beta, searched)
+                state.undo_move()
+                searched = True
                 min_eval = min(min_eval, eval_score)
                 beta = min(beta, eval_score)
                 
                 if beta <= alpha: # Prune
+                    self._record_cutoff(ply, depth, False, ant, move)
                     break
             
-            return min_eval if min_eval != float('inf') else 10000
+            return min_eval
 
     def evaluate(self, ar, ac, tr, tc, anteater_energy):
         """
@@ -0,0 +1,244 @@
+"""
+algorithms/multi_agent.py
+
+Coordinated hunting for K Anteaters (target assignment + joint planning).
+
+1. Assignment: one flow field per living ant (FlowFieldCache over the
+   Anteater's moves, traps avoided: weighted Cell.cost to reach the ant
+   from every cell, as astar counts it) gives every hunter-to-ant cost.
+   The whole pack shares it, and it is reused while the ant stands still
+   (recovering) until the terrain changes. Pairs are taken cheapest first,
+   one ant per hunter; hunters left over when there are more hunters than
+   ants join the hunt of their nearest ant.
+2. Prioritized planning with a reservation table (Windowed Cooperative
+   A*): hunters plan one after another, farthest from its target first,
+   in space-time (cell, tick) with "wait" as a move. Every planned step
+   reserves its cell at that tick and the edge it uses, so later hunters
+   never share a cell or swap places with an earlier one. Plans only look
+   `window` ticks ahead (the ants move anyway and the plan is redone each
+   tick), which keeps dozens of hunters cheap on big maps. Plans are
+   measured in ticks (a move or a wait is one tick, whatever the
+   terrain), so the A* heuristic is the BFS step distance to the target,
+   exact for an empty map; among plans as short, the one with the
+   cheapest Cell.cost to go (the target's integration field from step 1)
+   wins, so hunters still prefer cheap terrain as the single-Anteater A*
+   does. A plan may start with a wait (plan[1] is the hunter's own cell):
+   the hunter then stays put, it does not move.
+Energy is not planned beyond the first step (like bfs/astar), but that
+step is one the hunter can afford: only plan[1] is executed before the
+next replan, so the plans are collision-free for the moves that really
+happen. A hunter that will not move this tick (recovering, or too tired
+for any step: its move_to would start recovery) is stationary: it holds
+its cell for the whole window and the others plan around it.
+"""
+
+import heapq
+import time
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from algorithms.distance_field import build_adjacency, build_move_costs, distance_field, UNREACHABLE
+from algorithms.flow_field import FlowFieldCache, INF
+
+
+def spawn_points(grid, count, first=(0, 0)):
+    """
+    Start cells for a pack of `count` Anteaters spread over the map: the
+    safe cell nearest to `first`, then always the safe cell farthest (in
+    steps) from the ones already chosen.
+    """
+    adjacency = build_adjacency(grid, avoid_traps=True)
+    cols = grid.cols
+    safe = [i for i in range(len(adjacency)) if grid.get_cell(*divmod(i, cols)).cost < config.COST_TRAP]
+    chosen = [min(safe, key=lambda i: abs(i // cols - first[0]) + abs(i % cols - first[1]))] if safe else []
+    while len(chosen) < min(count, len(safe)):
+        field = distance_field(adjacency, chosen)
+        # Unreached cells (other components) only once the reachable ones run out
+        chosen.append(max((i for i in safe if field[i] != 0), key=lambda i: (field[i] > 0, field[i])))
+    return [divmod(i, cols) for i in chosen]
+
+
+class MultiAnteaterPlanner:
+    def __init__(self, grid, window=None, avoid_traps=True):
+        """Builds the flat map tables once; create a new planner if the map changes."""
+        self.grid = grid
+        self.cols = grid.cols
+        self.window = config.MULTI_WINDOW if window is None else window
+        self.terrain_version = grid.terrain_version
+        self.avoid_traps = avoid_traps
+        self.adjacency = build_adjacency(grid, avoid_traps)
+        self.costs = build_move_costs(grid)
+        self.flows = FlowFieldCache(grid) # One field per ant position, shared by the pack
+        self.assignment = {} # hunter index -> ant of the last plan()
+        self.steps = {} # target cell -> BFS steps to it, kept for the next plan()
+
+    def matches(self, grid):
+        return grid is self.grid and grid.terrain_version == self.terrain_version
+
+    def _index(self, entity):
+        return entity.r * self.cols + entity.c
+
+    def first_steps(self, hunter):
+        """Cells the hunter can step into this tick (none while recovering)."""
+        if hunter.recovering:
+            return ()
+        costs = self.costs
+        return tuple(v for v in self.adjacency[self._index(hunter)] if costs[v] <= hunter.energy)
+
+    def exhausted(self, hunter):
+        """True if the hunter has steps but can afford none: its next move_to starts recovery."""
+        return not hunter.recovering and bool(self.adjacency[self._index(hunter)]) and not self.first_steps(hunter)
+
+    # --- 1. Target assignment ---
+
+    def assign(self, hunters, ants):
+        """
+        Returns ({hunter index: ant}, {id(ant): cost-to-ant field}).
+        Hunters that reach no living ant are left out.
+        """
+        alive = [a for a in ants if a.is_alive]
+        flows = self.flows
+        flows.max_fields = max(flows.max_fields, 2 * len(alive)) # Every ant's field survives a tick
+        fields = {id(a): flows.get(a.position, self.avoid_traps).integration for a in alive}
+        pairs = []
+        for h, hunter in enumerate(hunters):
+            start = self._index(hunter)
+            for k, ant in enumerate(alive):
+                d = fields[id(ant)][start]
+                if d != INF:
+                    pairs.append((d, h, k))
+        pairs.sort()
+
+        assignment = {}
+        taken = set()
+        for d, h, k in pairs: # Cheapest pairs first, one ant per hunter
+            if h not in assignment and k not in taken:
+                assignment[h] = alive[k]
+                taken.add(k)
+        for d, h, k in pairs: # Spare hunters join their nearest ant
+            if h not in assignment:
+                assignment[h] = alive[k]
+        return assignment, fields
+
+    # --- 2. Prioritized space-time planning ---
+
+    def plan(self, hunters, ants, stats=None):
+        """
+        Collision-free plans for every hunter: a list (one per hunter) of
+        cells, start included, covering up to `window` ticks. A hunter with
+        no reachable ant, or stationary this tick (recovering, exhausted),
+        gets [its cell]: it waits, and the others avoid it.
+        If a SearchStats is given, the work done is added to it.
+        """
+        t0 = time.perf_counter()
+        hits = self.flows.hits
+        assignment, fields = self.assign(hunters, ants)
+        self.assignment = assignment
+        starts = [self._index(h) for h in hunters]
+        first = [self.first_steps(h) for h in hunters]
+        moving = [bool(steps) for steps in first]
+
+        # Farthest hunters plan first: they have the fewest good alternatives
+        def priority(h):
+            if h not in assignment or not moving[h]:
+                return -1
+            return fields[id(assignment[h])][starts[h]]
+        order = sorted(range(len(hunters)), key=priority, reverse=True)
+
+        reserved = {}       # (cell, tick) -> hunter
+        edges = set()       # (from, to, tick): moves already taken
+        for h, start in enumerate(starts):
+            reserved[(start, 0)] = h
+            if not moving[h]: # Stationary: its cell is taken for the whole window
+                for t in range(1, self.window + 1):
+                    reserved[(start, t)] = h
+        counters = [0, 0, 0, 0] # expanded, generated, pushes, peak
+
+        plans = [None] * len(hunters)
+        steps = {} # Shared by the hunters of a target; reused while it stands still
+        for h in order:
+            if h in assignment and moving[h]:
+                goal = self._index(assignment[h])
+                if goal not in steps:
+                    steps[goal] = self.steps.get(goal) or distance_field(self.adjacency, [goal])
+                cells = self._search(h, starts[h], goal, steps[goal], fields[id(assignment[h])],
+                                     first[h], reserved, edges, counters)
+            else:
+                cells = [starts[h]]
+            # Reserve the plan, then the final cell until the window ends
+            for t in range(1, len(cells)):
+                reserved[(cells[t], t)] = h
+                edges.add((cells[t - 1], cells[t], t))
+            last = cells[-1]
+            for t in range(len(cells), self.window + 1):
+                reserved[(last, t)] = h
+            plans[h] = [self.grid.get_cell(*divmod(i, self.cols)) for i in cells]
+        self.steps = steps
+
+        if stats is not None:
+            stats.record(time.perf_counter() - t0, expanded=counters[0], generated=counters[1],
+                         pushes=counters[2], pops=counters[0], peak_frontier=counters[3],
+                         tt_hits=self.flows.hits - hits)
+        return plans
+
+    def _free(self, h, u, v, t, reserved, edges):
+        """True if hunter h may move u -> v arriving at tick t."""
+        owner = reserved.get((v, t))
+        if owner is not None and owner != h:
+            return False
+        return (v, u, t) not in edges # No swapping with a hunter going v -> u
+
+    def _can_stay(self, h, v, t, reserved):
+        """True if hunter h can stop on v from tick t to the end of the window."""
+        for later in range(t + 1, self.window + 1):
+            owner = reserved.get((v, later))
+            if owner is not None and owner != h:
+                return False
+        return True
+
+    def _search(self, h, start, goal, dist, field, first, reserved, edges, counters):
+        """
+        Space-time A* from start towards goal within the window. Stops at
+        the goal (if it can stay there), or at the window horizon on the
+        node closest to it; if boxed in, on the deepest node reached.
+        dist: steps to the goal (the heuristic), field: Cell.cost to it
+        (the tie-break). first: the cells the hunter can afford to step
+        into at tick 1.
+        Returns the flat cells of the plan, one per tick, start included.
+        """
+        window = self.window
+        adjacency = self.adjacency
+        heap = [(dist[start], 0, field[start], start)] # (f, -tick: deeper first on ties, cost to go, cell)
+        parents = {(start, 0): None}
+        best, best_key = (start, 0), (0, -dist[start], -field[start])
+        while heap:
+            if len(heap) > counters[3]: counters[3] = len(heap)
+            _, neg_t, _, u = heapq.heappop(heap)
+            t = -neg_t
+            counters[0] += 1
+            if (t, -dist[u], -field[u]) > best_key:
+                best, best_key = (u, t), (t, -dist[u], -field[u])
+            if t == window or (u == goal and self._can_stay(h, u, t, reserved)):
+                best = (u, t)
+                break
+            for v in (first if t == 0 else adjacency[u]) + (u,): # Moves, then waiting in place
+                counters[1] += 1
+                nt = t + 1
+                if (v, nt) in parents or dist[v] == UNREACHABLE:
+                    continue
+                if not self._free(h, u, v, nt, reserved, edges):
+                    continue
+                parents[(v, nt)] = (u, t)
+                heapq.heappush(heap, (nt + dist[v], -nt, field[v], v))
+                counters[2] += 1
+
+        cells = []
+        node = best
+        while node is not None:
+            cells.append(node[0])
+            node = parents[node]
+        cells.reverse()
+        return cells
@@ -6,10 +6,12 @@ Implementations of BFS and A* (A-Star).
 
 from collections import deque
 import heapq
+import time
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
 from environment.cell import TerrainType
 
 def manhattan_distance(a, b):
@@ -20,11 +22,24 @@ class PathfindingTypes:
     DFS = "DFS"
     ASTAR = "A*"
 
-def bfs(grid, start_cell, target_cell, avoid_traps=True):
+def _unreachable(start_cell, target_cell, avoid_traps, components, stats, t0):
+    """True (and the rejection recorded) when the ComponentIndex rules the pair out."""
+    if components is None or components.connected(start_cell.position, target_cell.position, avoid_traps):
+        return False
+    if stats is not None:
+        stats.record(time.perf_counter() - t0)
+    return True
+
+def bfs(grid, start_cell, target_cell, avoid_traps=True, stats=None, components=None):
     """
     Breadth-First Search.
     Guarantees shortest path in terms of STEPS (edges), ignoring weights.
+    If a SearchStats is given, the work done is added to it.
+    With a ComponentIndex, unreachable targets return [] without searching.
     """
+    t0 = time.perf_counter()
+    if _unreachable(start_cell, target_cell, avoid_traps, components, stats, t0):
+        return [], []
     queue = deque([start_cell])
     visited = set()
     visited.add((start_cell.r, start_cell.c))
@@ -32,28 +47,43 @@ def bfs(grid, start_cell, target_cell, avoid_traps=True):
     # Store parents locally for path reconstruction
     parents = { (start_cell.r, start_cell.c): None }
     explored_nodes = []
+    pushes, generated, peak = 1, 0, 1
+    path = []
 
     while queue:
         current = queue.popleft()
         explored_nodes.append(current)
 
         if current == target_cell:
-            return reconstruct_path(current, parents), explored_nodes
+            path = reconstruct_path(current, parents)
+            break
 
         for neighbor in grid.get_neighbors(current, avoid_traps=avoid_traps):
+            generated += 1
             pos = (neighbor.r, neighbor.c)
             if pos not in visited:
                 parents[pos] = current  
                 visited.add(pos)
                 queue.append(neighbor)
+                pushes += 1
+        if len(queue) > peak: peak = len(queue)
     
-    return [], explored_nodes
+    if stats is not None:
+        pops = len(explored_nodes)
+        stats.record(time.perf_counter() - t0, expanded=pops, generated=generated,
+                     pushes=pushes, pops=pops, peak_frontier=peak)
+    return path, explored_nodes
 
-def dfs(grid, start_cell, target_cell, avoid_traps=True):
+def dfs(grid, start_cell, target_cell, avoid_traps=True, stats=None, components=None):
     """
     Depth-First Search.
     Does NOT guarantee shortest path.
+    If a SearchStats is given, the work done is added to it.
+    With a ComponentIndex, unreachable targets return [] without searching.
     """
+    t0 = time.perf_counter()
+    if _unreachable(start_cell, target_cell, avoid_traps, components, stats, t0):
+        return [], []
     stack = [start_cell]
     visited = set()
     visited.add((start_cell.r, start_cell.c))
@@ -61,22 +91,32 @@ def dfs(grid, start_cell, target_cell, avoid_traps=True):
     # Store parents locally for path reconstruction
     parents = { (start_cell.r, start_cell.c): None }
     explored_nodes = []
+    pushes, generated, peak = 1, 0, 1
+    path = []
 
     while stack:
         current = stack.pop()
         explored_nodes.append(current)
 
         if current == target_cell:
-            return reconstruct_path(current, parents), explored_nodes
+            path = reconstruct_path(current, parents)
+            break
 
         for neighbor in grid.get_neighbors(current, avoid_traps=avoid_traps):
+            generated += 1
             pos = (neighbor.r, neighbor.c)
             if pos not in visited:
                 parents[pos] = current  
                 visited.add(pos)
                 stack.append(neighbor)
+                pushes += 1
+        if len(stack) > peak: peak = len(stack)
     
-    return [], explored_nodes
+    if stats is not None:
+        pops = len(explored_nodes)
+        stats.record(time.perf_counter() - t0, expanded=pops, generated=generated,
+                     pushes=pushes, pops=pops, peak_frontier=peak)
+    return path, explored_nodes
 
 def multi_source_bfs(grid, sources, max_level):
     """
@@ -107,27 +147,41 @@ def multi_source_bfs(grid, sources, max_level):
                 
     return visited
 
-def astar(grid, start_cell, target_cell, avoid_traps=True):
+def astar(grid, start_cell, target_cell, avoid_traps=True, stats=None, components=None, heuristic=None):
     """
     A* Algorithm with weighted costs.
     Avoids Traps strictly if avoid_traps=True.
+    If a SearchStats is given, the work done is added to it
+    (stale heap entries count as pops but not as expansions).
+    With a ComponentIndex, unreachable targets return [] without searching.
+    heuristic: optional h(cell) towards target_cell (e.g. Landmarks.heuristic)
+    replacing Manhattan distance; it must never overestimate.
     """
+    t0 = time.perf_counter()
+    if _unreachable(start_cell, target_cell, avoid_traps, components, stats, t0):
+        return [], []
+    if heuristic is None:
+        heuristic = lambda cell: manhattan_distance(cell, target_cell)
     open_set = []
-    # heapq format: (f_score, tie_breaker, cell)
+    # heapq format: (f_score, h (ties go to the deeper node), tie_breaker, cell)
     # We'll calculate f, g, h locally.
     
     g_scores = { (start_cell.r, start_cell.c): 0 }
     parents = { (start_cell.r, start_cell.c): None }
     
-    start_h = manhattan_distance(start_cell, target_cell)
-    """open_set se llama la cola, 1er es de comparacion, 2do desempate"""
-    heapq.heappush(open_set, (start_h, id(start_cell), start_cell))
+    start_h = heuristic(start_cell)
+    """open_set se llama la cola, 1er es de comparacion, 2do y 3ro desempate"""
+    heapq.heappush(open_set, (start_h, start_h, id(start_cell), start_cell))
     
     visited = set()
     explored_nodes = []
+    pushes, pops, generated, peak = 1, 0, 0, 1
+    path = []
 
     while open_set:
-        _, _, current = heapq.heappop(open_set)
+        if len(open_set) > peak: peak = len(open_set)
+        _, _, _, current = heapq.heappop(open_set)
+        pops += 1
         curr_pos = (current.r, current.c)
         
         if curr_pos in visited:
@@ -136,9 +190,11 @@ def astar(grid, start_cell, target_cell, avoid_traps=True):
         explored_nodes.append(current)
 
         if current == target_cell:
-            return reconstruct_path(current, parents), explored_nodes
+            path = reconstruct_path(current, parents)
+            break
 
         for neighbor in grid.get_neighbors(current, avoid_traps=avoid_traps):
+            generated += 1
             neigh_pos = (neighbor.r, neighbor.c)
             if neigh_pos in visited:
                 continue
@@ -149,11 +205,15 @@ def astar(grid, start_cell, target_cell, avoid_traps=True):
             if neigh_pos not in g_scores or tentative_g < g_scores[neigh_pos]:
                 parents[neigh_pos] = current
                 g_scores[neigh_pos] = tentative_g
-                h = manhattan_distance(neighbor, target_cell)
+                h = heuristic(neighbor)
                 f = tentative_g + h
-                heapq.heappush(open_set, (f, id(neighbor), neighbor))
+                heapq.heappush(open_set, (f, h, id(neighbor), neighbor))
+                pushes += 1
 
-    return [], explored_nodes
+    if stats is not None:
+        stats.record(time.perf_counter() - t0, expanded=len(explored_nodes), generated=generated,
+                     pushes=pushes, pops=pops, peak_frontier=peak)
+    return path, explored_nodes
 
 def reconstruct_path(end_node, parents):
     path = []
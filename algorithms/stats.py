@@ -0,0 +1,88 @@
+"""
+algorithms/stats.py
+
+SearchStats: uniform work counters shared by every search algorithm.
+
+Algorithms take an optional `stats` argument and fill it in once at the end
+of the search (counting happens in local variables), so leaving it on costs
+a handful of integer additions per node. Stats from several runs can be
+aggregated with `+` / merge() to compare optimizations.
+"""
+
+
+class SearchStats:
+    """
+    Counters:
+    - expanded:      nodes whose successors were generated
+    - generated:     successor nodes produced
+    - pushes / pops: frontier insertions / removals (queue, stack or heap)
+    - reexpansions:  nodes expanded (or visited) more than once
+    - cutoffs:       alpha-beta cutoffs
+    - tt_hits:       transposition / value cache hits
+    - peak_frontier: largest frontier size seen
+    - elapsed:       wall time in seconds
+    """
+
+    COUNTERS = ("expanded", "generated", "pushes", "pops", "reexpansions", "cutoffs", "tt_hits")
+
+    def __init__(self, algorithm=""):
+        self.algorithm = algorithm
+        self.runs = 0
+        self.expanded = 0
+        self.generated = 0
+        self.pushes = 0
+        self.pops = 0
+        self.reexpansions = 0
+        self.cutoffs = 0
+        self.tt_hits = 0
+        self.peak_frontier = 0
+        self.elapsed = 0.0
+
+    def record(self, elapsed, expanded=0, generated=0, pushes=0, pops=0,
+               reexpansions=0, cutoffs=0, tt_hits=0, peak_frontier=0):
+        """Adds the counters of one finished run."""
+        self.runs += 1
+        self.elapsed += elapsed
+        self.expanded += expanded
+        self.generated += generated
+        self.pushes += pushes
+        self.pops += pops
+        self.reexpansions += reexpansions
+        self.cutoffs += cutoffs
+        self.tt_hits += tt_hits
+        if peak_frontier > self.peak_frontier:
+            self.peak_frontier = peak_frontier
+
+    def merge(self, other):
+        """Aggregates another SearchStats into this one (in place)."""
+        self.runs += other.runs
+        self.elapsed += other.elapsed
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.peak_frontier = max(self.peak_frontier, other.peak_frontier)
+        return self
+
+    def __add__(self, other):
+        total = SearchStats(self.algorithm if self.algorithm == other.algorithm else "")
+        return total.merge(self).merge(other)
+
+    def reset(self):
+        self.__init__(self.algorithm)
+
+    @property
+    def cutoff_rate(self):
+        """Alpha-beta cutoffs per expanded node."""
+        return self.cutoffs / self.expanded if self.expanded else 0.0
+
+    def as_dict(self):
+        data = {"algorithm": self.algorithm, "runs": self.runs}
+        for name in self.COUNTERS:
+            data[name] = getattr(self, name)
+        data["peak_frontier"] = self.peak_frontier
+        data["elapsed_ms"] = round(self.elapsed * 1000.0, 3)
+        return data
+
+    def __repr__(self):
+        return (f"SearchStats({self.algorithm or '-'}: exp={self.expanded} gen={self.generated} "
+                f"push={self.pushes} pop={self.pops} reexp={self.reexpansions} cut={self.cutoffs} "
+                f"tt={self.tt_hits} peak={self.peak_frontier} {self.elapsed * 1000.0:.2f}ms)")
@@ -0,0 +1,415 @@
+"""
+algorithms/tablebase.py
+
+Endgame tablebase for the 1 vs 1 duel (retrograde analysis).
+
+On a fixed map the duel has a small state space:
+    Anteater cell x Ant cell x Ant stamina x side to move.
+The solver starts from every capture position and walks the game graph
+BACKWARDS, one ply per layer:
+- Anteater to move: won as soon as ONE move leads to a won position
+  (first time reached = fewest plies).
+- Ant to move: won once ALL its moves lead to won positions (a counter
+  of unresolved replies per position; the last one gives the longest
+  escape).
+Positions never reached are escapes: the Ant survives forever.
+
+Rules modelled (as in the main loop): the sides alternate, the Anteater
+moves first and never enters traps, the Ant may walk over traps. The Ant's
+energy is exact (step costs, recovery stalls and recharge of
+Entity.move_to, in units of 5). The Anteater's energy is NOT part of the
+state (it would multiply the table by 61): plies are those of an endless
+tank. Instead every won position also stores the energy the table's line
+costs the Anteater against the worst Ant replies (filled in layer by
+layer, as all successors of a layer are shallower). Where the real tank
+holds that much, the line never stalls on recovery and the capture comes
+in exactly the stored plies; best_move(..., anteater_energy) only answers
+those positions and leaves the others to the search.
+
+Results live in flat tables (plies to capture, escape marker when none;
+energy needed, in units of the step costs' gcd), so queries are O(1) and a
+best move is at most 4 lookups. The tables are bytes (array('B')) whenever
+the values fit, which on the default maps halves them; they fall back to
+array('H') otherwise. The escape marker is the largest value of the type.
+With a PrecomputeCache the tables are saved per map fingerprint and
+memory-mapped back on later runs. TablebaseJob solves in a worker process
+so the game loop keeps running meanwhile.
+"""
+
+from array import array
+from math import gcd
+import time
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from algorithms.distance_field import build_adjacency, build_move_costs
+from environment.cell import TerrainType
+
+ESCAPE = 0xFFFF # The Ant is never caught (while solving; packed tables use their type's maximum)
+VERSION = 3     # Bump when the solver's output changes (invalidates cached tables)
+
+
+def _cache_key(ant_energy):
+    """The solution only depends on the map and the Ant's energy rules."""
+    return (VERSION, ant_energy, config.ANT_MAX_ENERGY, config.ENERGY_COST_MOVE,
+            config.ENERGY_COST_MUD, config.RECHARGE_ANT)
+
+
+class DuelTablebase:
+    def __init__(self, grid, ant_energy=True, cache=None, tables=None):
+        """
+        Solves the whole duel for this map (the constructor does the work).
+        ant_energy=False drops the Ant's stamina (it always moves), which is
+        21 times smaller and used for bigger maps.
+        cache: optional PrecomputeCache; a map solved before is memory-mapped
+        from disk instead of solved again.
+        tables: a solution already computed for this map (solve_snapshot()
+        in a worker); it is stored in the cache, if any.
+        """
+        t0 = time.perf_counter()
+        self.rows, self.cols = grid.rows, grid.cols
+        self.grid_fingerprint = grid.fingerprint() # Content, not id(): ids of freed grids are reused
+        self.ant_energy = ant_energy
+
+        hunter_adjacency = build_adjacency(grid, avoid_traps=True)
+        ant_adjacency = build_adjacency(grid, avoid_traps=False)
+        costs = build_move_costs(grid)
+        size = grid.rows * grid.cols
+        terrain = [grid.get_cell(*divmod(i, grid.cols)).terrain_type for i in range(size)]
+
+        # Compact numbering of the cells each side can stand on
+        self.hunter_cells = [i for i in range(size) if terrain[i] not in (TerrainType.WALL, TerrainType.TRAP)]
+        self.ant_cells = [i for i in range(size) if terrain[i] != TerrainType.WALL]
+        self.hunter_slot = {cell: k for k, cell in enumerate(self.hunter_cells)}
+        self.step_cost = [costs[cell] for cell in self.hunter_cells] # Energy to step INTO each Anteater slot
+        self.ant_slot = {cell: k for k, cell in enumerate(self.ant_cells)}
+
+        # Ant stamina states: (energy, recovering), energy in units of `unit`
+        if ant_energy:
+            max_e = config.ANT_MAX_ENERGY
+            self.unit = gcd(gcd(config.ENERGY_COST_MOVE, config.ENERGY_COST_MUD), gcd(config.RECHARGE_ANT, max_e))
+            self.stamina = [(e, False) for e in range(0, max_e + 1, self.unit)] + \
+                           [(e, True) for e in range(0, max_e, self.unit)]
+        else:
+            self.unit = 1
+            self.stamina = [(0, False)]
+        self.stamina_slot = {s: k for k, s in enumerate(self.stamina)}
+        S = len(self.stamina)
+        self.S = S
+        self.M = M = len(self.ant_cells) * S # Ant states per Anteater cell
+
+        # Anteater moves as slots (best_move needs them, cached or not)
+        self.hunter_moves = [tuple(self.hunter_slot[j] for j in hunter_adjacency[cell] if j in self.hunter_slot) or (h,)
+                             for h, cell in enumerate(self.hunter_cells)] # No move: it stays
+        H = len(self.hunter_cells)
+        self.state_count = 2 * H * M
+        self.from_cache = False
+
+        key = _cache_key(ant_energy)
+        if tables is None and cache is not None:
+            tables = cache.load("tablebase", grid.fingerprint(), key)
+            self.from_cache = tables is not None
+        if tables is None:
+            tables = self._solve(ant_adjacency, costs)
+        if cache is not None and not self.from_cache:
+            cache.store("tablebase", grid.fingerprint(), tables, key)
+        self.hunter_to_move, self.ant_to_move, self.hunter_need, self.ant_need, summary = tables
+        self.win_count, self.max_depth, self.need_unit = summary
+        self.escape = (1 << (8 * self.hunter_to_move.itemsize)) - 1
+        self.solve_time = time.perf_counter() - t0
+
+    def _solve(self, ant_adjacency, costs):
+        """
+        Retrograde BFS; returns [hunter_to_move, ant_to_move, hunter_need,
+        ant_need, (win count, longest win, energy unit)], packed by _pack().
+        """
+        H, M, S = len(self.hunter_cells), self.M, self.S
+
+        # Ant moves per Ant state (cell slot * S + stamina slot), deduplicated
+        ant_moves = [self._ant_moves(cell, s, ant_adjacency, costs)
+                     for cell in self.ant_cells for s in self.stamina]
+        reverse_ant = [[] for _ in range(M)]
+        for k, moves in enumerate(ant_moves):
+            for nxt in moves:
+                reverse_ant[nxt].append(k)
+
+        # Reverse Anteater moves: which slots can step INTO a slot
+        reverse_hunter = [[] for _ in self.hunter_cells]
+        for h, moves in enumerate(self.hunter_moves):
+            for nxt in moves:
+                reverse_hunter[nxt].append(h)
+
+        hunter_tb = array("H", [ESCAPE]) * (H * M)
+        ant_tb = array("H", [ESCAPE]) * (H * M)
+        hunter_need = array("H", [0]) * (H * M) # Energy the table's line costs the Anteater, in units
+        ant_need = array("H", [0]) * (H * M)
+        unit = 0
+        for cost in self.step_cost:
+            unit = gcd(unit, cost)
+        unit = unit or 1
+        step_cost = [cost // unit for cost in self.step_cost]
+        hunter_moves = self.hunter_moves
+        remaining = bytearray(len(m) for m in ant_moves) * H # Unresolved Ant replies
+
+        # Layer 0: captures (same cell, any stamina, either side to move)
+        frontier = []
+        for h, cell in enumerate(self.hunter_cells):
+            slot = self.ant_slot[cell]
+            for s in range(S):
+                idx = h * M + slot * S + s
+                hunter_tb[idx] = 0
+                ant_tb[idx] = 0
+                frontier.append((0, idx))
+                frontier.append((1, idx))
+
+        # Backward BFS by layers (side 0: Anteater to move, 1: Ant to move)
+        depth = 0
+        while frontier:
+            if depth > 0:
+                # This layer only leads to shallower ones: its energy needs are final
+                previous = depth - 1
+                for side, idx in frontier:
+                    h, k = divmod(idx, M)
+                    if side == 0: # Cheapest of the fastest Anteater moves (as best_move picks)
+                        need = ESCAPE
+                        for nxt in hunter_moves[h]:
+                            p = nxt * M + k
+                            if ant_tb[p] == previous and step_cost[nxt] + ant_need[p] < need:
+                                need = step_cost[nxt] + ant_need[p]
+                        hunter_need[idx] = need
+                    else: # Worst Ant reply
+                        base = h * M
+                        need = 0
+                        for nxt in ant_moves[k]:
+                            if hunter_need[base + nxt] > need:
+                                need = hunter_need[base + nxt]
+                        ant_need[idx] = need
+            depth += 1
+            next_frontier = []
+            append = next_frontier.append
+            for side, idx in frontier:
+                h, k = divmod(idx, M)
+                if side == 0:
+                    # Predecessors: Ant-to-move positions whose reply leads here
+                    base = h * M
+                    for prev in reverse_ant[k]:
+                        p = base + prev
+                        if ant_tb[p] == ESCAPE:
+                            remaining[p] -= 1
+                            if remaining[p] == 0:
+                                ant_tb[p] = depth
+                                append((1, p))
+                else:
+                    # Predecessors: Anteater-to-move positions one step away
+                    for prev in reverse_hunter[h]:
+                        p = prev * M + k
+                        if hunter_tb[p] == ESCAPE:
+                            hunter_tb[p] = depth
+                            append((0, p))
+            frontier = next_frontier
+
+        win_count = sum(1 for v in hunter_tb if v != ESCAPE) + sum(1 for v in ant_tb if v != ESCAPE)
+        return _pack([hunter_tb, ant_tb, hunter_need, ant_need], depth - 1) + \
+            [array("q", [win_count, depth - 1, unit])]
+
+    def _ant_moves(self, cell, stamina, adjacency, costs):
+        """Distinct Ant states after one Ant ply (Entity.move_to / recharge rules)."""
+        energy, recovering = stamina
+        S = self.S
+        slot = self.ant_slot[cell]
+        if not self.ant_energy:
+            moves = {self.ant_slot[j] * S for j in adjacency[cell]}
+            return tuple(sorted(moves)) or (slot * S,)
+        max_e = config.ANT_MAX_ENERGY
+        if recovering:
+            e = energy + config.RECHARGE_ANT
+            nxt = (max_e, False) if e >= max_e else (e, True)
+            return (slot * S + self.stamina_slot[nxt],)
+        moves = set()
+        for j in adjacency[cell]:
+            cost = costs[j]
+            if energy >= cost:
+                moves.add(self.ant_slot[j] * S + self.stamina_slot[(energy - cost, False)])
+            else:
+                moves.add(slot * S + self.stamina_slot[(energy, True)]) # Failed move: start_recovery()
+        return tuple(sorted(moves)) or (slot * S + self.stamina_slot[stamina],)
+
+    # --- Queries (O(1)) ---
+
+    def matches(self, grid):
+        """True if the table was solved for this grid and its terrain is unchanged."""
+        return grid.fingerprint() == self.grid_fingerprint
+
+    def _index(self, anteater_pos, ant_pos, ant_energy, ant_recovering):
+        h = self.hunter_slot.get(anteater_pos[0] * self.cols + anteater_pos[1])
+        a = self.ant_slot.get(ant_pos[0] * self.cols + ant_pos[1])
+        if h is None or a is None:
+            return None
+        if self.ant_energy:
+            energy = min(ant_energy, config.ANT_MAX_ENERGY) // self.unit * self.unit
+            s = self.stamina_slot.get((energy, bool(ant_recovering) and energy < config.ANT_MAX_ENERGY))
+        else:
+            s = 0
+        return h * self.M + a * self.S + s
+
+    def lookup(self, anteater_pos, ant_pos, ant_energy=config.ANT_MAX_ENERGY, ant_recovering=False,
+               anteater_to_move=True):
+        """
+        Plies until capture with best play, or None if the Ant escapes.
+        The Anteater's energy is not counted (see energy_needed()).
+        """
+        idx = self._index(anteater_pos, ant_pos, ant_energy, ant_recovering)
+        if idx is None:
+            return None
+        value = (self.hunter_to_move if anteater_to_move else self.ant_to_move)[idx]
+        return None if value == self.escape else value
+
+    def energy_needed(self, anteater_pos, ant_pos, ant_energy=config.ANT_MAX_ENERGY, ant_recovering=False):
+        """
+        Energy best_move's line spends until the capture, whatever the Ant
+        replies (Anteater to move), or None if the Ant escapes.
+        """
+        idx = self._index(anteater_pos, ant_pos, ant_energy, ant_recovering)
+        if idx is None or self.hunter_to_move[idx] == self.escape:
+            return None
+        return self.hunter_need[idx] * self.need_unit
+
+    def best_move(self, anteater_pos, ant_pos, ant_energy=config.ANT_MAX_ENERGY, ant_recovering=False,
+                  anteater_energy=None):
+        """
+        The Anteater's (r, c) that captures fastest, or None if the Ant
+        escapes from this position (or it is not in the table).
+        With anteater_energy, also None when that tank cannot pay for the
+        table's line (energy_needed()): it could stall on recovery.
+        """
+        idx = self._index(anteater_pos, ant_pos, ant_energy, ant_recovering)
+        if idx is None or self.hunter_to_move[idx] == self.escape:
+            return None
+        unit = self.need_unit
+        if anteater_energy is not None and self.hunter_need[idx] * unit > anteater_energy:
+            return None
+        h, k = divmod(idx, self.M)
+        M = self.M
+        best = min(self.hunter_moves[h], key=lambda nxt: (self.ant_to_move[nxt * M + k],
+                                                          self.step_cost[nxt] + self.ant_need[nxt * M + k] * unit))
+        return divmod(self.hunter_cells[best], self.cols)
+
+
+def _pack(tables, plies):
+    """
+    The solved array('H') tables as array('B') when every value fits
+    (plies below 0xFF, escapes become 0xFF), else unchanged.
+    """
+    if plies >= 0xFF or max(max(table, default=0) for table in tables[2:]) > 0xFF:
+        return tables
+    low = 0 if sys.byteorder == "little" else 1 # Low byte of each value: 0xFFFF -> 0xFF
+    return [array("B", table.tobytes()[low::2]) for table in tables]
+
+
+def solve_snapshot(snapshot, ant_energy=True):
+    """
+    Worker entry point: solves the map of a (rows, cols, terrain bytes)
+    snapshot. Returns (tables, seconds) for DuelTablebase(tables=...).
+    """
+    from environment.grid import Grid
+    rows, cols, terrain = snapshot
+    grid = Grid(rows, cols)
+    grid.load_terrain(terrain)
+    tb = DuelTablebase(grid, ant_energy)
+    return [tb.hunter_to_move, tb.ant_to_move, tb.hunter_need, tb.ant_need,
+            array("q", [tb.win_count, tb.max_depth, tb.need_unit])], tb.solve_time
+
+
+class TablebaseJob:
+    """
+    A DuelTablebase solved in a worker process (a few seconds of pure
+    Python) while the game loop keeps running; the loop calls poll() once
+    per frame. A map already in the cache is loaded at once instead.
+    """
+
+    def __init__(self, grid, ant_energy=True, cache=None):
+        self.grid = grid
+        self.terrain_version = grid.terrain_version
+        self.ant_energy = ant_energy
+        self.cache = cache
+        self.result = None # The DuelTablebase, once ready
+        self.pool = None
+        self.future = None
+        if cache is not None and os.path.exists(cache.path("tablebase", grid.fingerprint(), _cache_key(ant_energy))):
+            self.result = DuelTablebase(grid, ant_energy, cache)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        self.pool = ProcessPoolExecutor(max_workers=1)
+        snapshot = (grid.rows, grid.cols, grid.terrain_bytes())
+        self.future = self.pool.submit(solve_snapshot, snapshot, ant_energy)
+
+    def matches(self, grid):
+        """True if the job is for this grid and its terrain is unchanged."""
+        return grid is self.grid and grid.terrain_version == self.terrain_version
+
+    @property
+    def done(self):
+        """Solved, failed or stale: nothing more will arrive."""
+        return self.future is None
+
+    def poll(self):
+        """The DuelTablebase once solved, else None (never blocks)."""
+        if self.grid.terrain_version != self.terrain_version: # Map changed: the solve is stale
+            self.close()
+            return None
+        if self.result is None and self.future is not None and self.future.done():
+            future, self.future = self.future, None
+            self.close()
+            if future.cancelled():
+                return None
+            error = future.exception()
+            if error is not None:
+                print(f"[DUEL] Tablebase solve failed: {error!r}")
+                return None
+            tables, seconds = future.result()
+            self.result = DuelTablebase(self.grid, self.ant_energy, self.cache, tables=tables)
+            self.result.solve_time = seconds
+        return self.result
+
+    def close(self):
+        """Drops the job: a solve in progress is killed with its worker process."""
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        if self.pool is not None:
+            # A running task cannot be cancelled, and exit would wait for it
+            workers = list((self.pool._processes or {}).values())
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            for process in workers:
+                process.terminate()
+            self.pool = None
+
+
+def _main(argv):
+    import argparse
+    from environment.grid import Grid
+    from utils.precompute_cache import PrecomputeCache
+
+    parser = argparse.ArgumentParser(description="Solve the duel tablebase and report its size and time.")
+    parser.add_argument("--rows", type=int, default=config.ROWS)
+    parser.add_argument("--cols", type=int, default=config.COLS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-energy", action="store_true", help="Ignore the Ant's stamina")
+    parser.add_argument("--cache", metavar="DIR", help="PrecomputeCache directory (load/save the solution)")
+    args = parser.parse_args(argv)
+
+    grid = Grid(args.rows, args.cols)
+    grid.generate_navigation_map(seed=args.seed)
+    cache = PrecomputeCache(args.cache) if args.cache else None
+    tb = DuelTablebase(grid, ant_energy=not args.no_energy, cache=cache)
+    print(f"{args.rows}x{args.cols} map, {tb.state_count} states, {tb.win_count} won "
+          f"({100.0 * tb.win_count / tb.state_count:.1f}%), longest win {tb.max_depth} plies, "
+          f"{tb.solve_time:.2f}s{' (cached)' if tb.from_cache else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,264 @@
+"""
+algorithms/tour.py
+
+Multi-target tour planner: the order in which to eat ALL ants.
+
+1. Pairwise distances: one Dijkstra (energy cost per step, traps avoided)
+   from the Anteater and from every ant gives the cheapest leg between
+   every ordered pair of points, N+1 searches instead of N^2 A* calls.
+2. Visit order:
+   - Exact DP over (visited set, last ant) for up to
+     config.TOUR_EXACT_MAX_ANTS ants, keeping Pareto labels of
+     (objective, energy left) because energy changes how long later legs
+     take.
+   - For larger N: nearest-neighbor construction plus 2-opt improvement
+     within config.TOUR_TIME_BUDGET seconds.
+Every leg is costed with the real energy rules (simulate_travel): energy
+per step, recovery stalls when exhausted, ANTEATER_MAX_ENERGY cap and
++ENERGY_PER_ANT for every ant eaten.
+"""
+
+import heapq
+import time
+from array import array
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from algorithms.distance_field import build_adjacency, build_move_costs
+from environment.entities import simulate_travel
+
+INF = float('inf')
+
+
+def dijkstra_all(adjacency, step_costs, source):
+    """Single-source Dijkstra over flat tables. Returns (dist list, parent array)."""
+    dist = [INF] * len(adjacency)
+    parent = array("i", [-1]) * len(adjacency)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for v in adjacency[u]:
+            nd = d + step_costs[v]
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd, v))
+    return dist, parent
+
+
+class TourPlan:
+    def __init__(self):
+        self.order = []        # Ants in visit order
+        self.path = []         # Cells, starting at the Anteater's cell
+        self.ticks = 0         # Simulated ticks (moves + recovery)
+        self.energy_spent = 0  # Sum of step energy costs
+        self.final_energy = 0
+        self.unreachable = []  # Ants the Anteater cannot reach
+        self.exact = False     # True if the order came from the exact DP
+
+    @property
+    def steps(self):
+        return max(0, len(self.path) - 1)
+
+
+class TourPlanner:
+    def __init__(self, grid, objective="ticks", exact_max=None, time_budget=None):
+        """
+        objective: "ticks" (real time, recovery included) or "energy"
+                   (total energy spent).
+        """
+        if objective not in ("ticks", "energy"):
+            raise ValueError(f"Unknown objective {objective!r}")
+        self.grid = grid
+        self.cols = grid.cols
+        self.objective = objective
+        self.exact_max = config.TOUR_EXACT_MAX_ANTS if exact_max is None else exact_max
+        self.time_budget = config.TOUR_TIME_BUDGET if time_budget is None else time_budget
+        self.adjacency = build_adjacency(grid, avoid_traps=True)
+        self.move_costs = build_move_costs(grid)
+        self.max_energy = config.ANTEATER_MAX_ENERGY
+        self.recharge = config.RECHARGE_ANTEATER
+        self.bonus = config.ENERGY_PER_ANT
+
+    # --- Legs ---
+
+    def _prepare(self, points):
+        """Runs one Dijkstra per point and resets the leg caches."""
+        self.points = points
+        self.searches = [dijkstra_all(self.adjacency, self.move_costs, p) for p in points]
+        self._leg_steps = {}
+        self._leg_sim = {}
+
+    def leg_cost(self, i, j):
+        return self.searches[i][0][self.points[j]]
+
+    def leg_indices(self, i, j):
+        """Flat cell indices from point i to point j (both included)."""
+        parent = self.searches[i][1]
+        node = self.points[j]
+        cells = [node]
+        while node != self.points[i]:
+            node = parent[node]
+            cells.append(node)
+        return cells[::-1]
+
+    def _steps(self, i, j):
+        steps = self._leg_steps.get((i, j))
+        if steps is None:
+            steps = [self.move_costs[k] for k in self.leg_indices(i, j)[1:]]
+            self._leg_steps[(i, j)] = steps
+        return steps
+
+    def _travel(self, i, j, energy):
+        """(ticks, energy on arrival after eating) for one leg, memoized per energy."""
+        key = (i, j, energy)
+        result = self._leg_sim.get(key)
+        if result is None:
+            ticks, left, _ = simulate_travel(self._steps(i, j), energy, self.max_energy, self.recharge)
+            result = (ticks, min(left + self.bonus, self.max_energy))
+            self._leg_sim[key] = result
+        return result
+
+    def evaluate(self, order, energy):
+        """(objective, ticks, energy spent, final energy) of visiting points in order."""
+        ticks = spent = 0
+        prev = 0
+        for j in order:
+            t, energy = self._travel(prev, j, energy)
+            ticks += t
+            spent += self.leg_cost(prev, j)
+            prev = j
+        primary = ticks if self.objective == "ticks" else spent
+        return primary, ticks, spent, energy
+
+    # --- Ordering ---
+
+    def _exact_order(self, targets, energy):
+        """Held-Karp DP with Pareto labels (primary, -energy) per (mask, last)."""
+        n = len(targets)
+        full = (1 << n) - 1
+        labels = {}
+        for k, j in enumerate(targets):
+            t, e = self._travel(0, j, energy)
+            primary = t if self.objective == "ticks" else self.leg_cost(0, j)
+            labels[(1 << k, k)] = [(primary, e, (k,))]
+
+        for mask in range(1, full + 1):
+            for last in range(n):
+                entries = labels.get((mask, last))
+                if not entries:
+                    continue
+                for nxt in range(n):
+                    if mask & (1 << nxt):
+                        continue
+                    key = (mask | (1 << nxt), nxt)
+                    bucket = labels.setdefault(key, [])
+                    for primary, e, seq in entries:
+                        t, e2 = self._travel(targets[last], targets[nxt], e)
+                        step = t if self.objective == "ticks" else self.leg_cost(targets[last], targets[nxt])
+                        _insert_label(bucket, (primary + step, e2, seq + (nxt,)))
+
+        best = None
+        for last in range(n):
+            for label in labels.get((full, last), []):
+                if best is None or (label[0], -label[1]) < (best[0], -best[1]):
+                    best = label
+        return [targets[k] for k in best[2]]
+
+    def _heuristic_order(self, targets, energy):
+        """Nearest neighbor (cheapest leg) followed by time-boxed 2-opt."""
+        remaining = set(targets)
+        order = []
+        prev = 0
+        while remaining:
+            nxt = min(remaining, key=lambda j: (self.leg_cost(prev, j), j))
+            order.append(nxt)
+            remaining.discard(nxt)
+            prev = nxt
+
+        deadline = time.perf_counter() + self.time_budget
+        best = self.evaluate(order, energy)
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for a in range(len(order) - 1):
+                for b in range(a + 1, len(order)):
+                    candidate = order[:a] + order[a:b + 1][::-1] + order[b + 1:]
+                    score = self.evaluate(candidate, energy)
+                    if (score[0], -score[3]) < (best[0], -best[3]):
+                        order, best, improved = candidate, score, True
+                if time.perf_counter() >= deadline:
+                    break
+        return order
+
+    # --- Entry point ---
+
+    def plan(self, anteater, ants):
+        """Builds the full-clear TourPlan for the living ants."""
+        cols = self.cols
+        alive = [a for a in ants if a.is_alive]
+        start = anteater.r * cols + anteater.c
+        self._prepare([start] + [a.r * cols + a.c for a in alive])
+
+        plan = TourPlan()
+        targets = []
+        for k, ant in enumerate(alive, start=1):
+            if self.leg_cost(0, k) == INF:
+                plan.unreachable.append(ant)
+            else:
+                targets.append(k)
+        if not targets:
+            plan.path = [self.grid.get_cell(anteater.r, anteater.c)]
+            plan.final_energy = anteater.energy
+            return plan
+
+        if len(targets) <= self.exact_max:
+            order = self._exact_order(targets, anteater.energy)
+            plan.exact = True
+        else:
+            order = self._heuristic_order(targets, anteater.energy)
+
+        # Walk the order; ants passed over on the way are eaten early and skipped
+        eaten = set()
+        position_owner = {}
+        for k in targets:
+            position_owner.setdefault(self.points[k], []).append(k)
+        path = [start]
+        prev = 0
+        route = []
+        for j in order:
+            if j in eaten:
+                continue
+            leg = self.leg_indices(prev, j)[1:]
+            for cell in leg:
+                for k in position_owner.get(cell, ()):
+                    eaten.add(k)
+            path.extend(leg)
+            route.append(j)
+            prev = j
+
+        plan.order = [alive[k - 1] for k in order]
+        plan.path = [self.grid.get_cell(*divmod(i, cols)) for i in path]
+        _, plan.ticks, plan.energy_spent, plan.final_energy = self.evaluate(route, anteater.energy)
+        return plan
+
+
+def _insert_label(bucket, label):
+    """Keeps only labels not dominated in (primary lower, energy higher)."""
+    primary, energy = label[0], label[1]
+    for other in bucket:
+        if other[0] <= primary and other[1] >= energy:
+            return
+    bucket[:] = [o for o in bucket if not (primary <= o[0] and energy >= o[1])]
+    bucket.append(label)
+
+
+def plan_tour(grid, anteater, ants, objective="ticks"):
+    """Convenience wrapper: TourPlanner(grid, objective).plan(anteater, ants)."""
+    return TourPlanner(grid, objective).plan(anteater, ants)
@@ -5,6 +5,10 @@ Global configurations for the Ant Eater Game.
 Includes screen dimensions, colors, terrain costs, and game settings.
 """
 
+import os
+
+_ROOT = os.path.dirname(os.path.abspath(__file__)) # Repo root: on-disk artifacts live here, whatever the cwd
+
 # Screen & Grid Settings
 GRID_SIZE = 35  # Increased from 20 for larger icons/map
 ROWS = 20
@@ -43,6 +47,57 @@ ENERGY_COST_MOVE = 5
 ENERGY_COST_MUD = 20
 RECHARGE_ANTEATER = 15 # Fast recovery for the hunter
 RECHARGE_ANT = 5       # Slower recovery for the prey
+ENERGY_PER_ANT = 30    # Energy the Anteater gains for each ant eaten
 
 # Delay for visualization (ms)
-GAME_SPEED = 200
\ No newline at end of file
+GAME_SPEED = 200
+
+# Chunked World (Large Maps)
+CHUNK_SIZE = 64            # Tile side length (cells) of each paged chunk
+MAX_RESIDENT_CHUNKS = 64   # LRU capacity: chunks kept in memory at once
+
+# Tour Planner
+TOUR_EXACT_MAX_ANTS = 10   # Exact DP up to this many ants, heuristic beyond
+TOUR_TIME_BUDGET = 1.0     # Seconds for the heuristic's 2-opt improvement
+
+# Scent Hill Climbing
+HC_CHAINS = 8              # Independent annealing chains per search (1 = single chain)
+HC_WORKERS = 0             # Worker processes for the chains (0 = run in-process)
+
+# Monte Carlo Tree Search (duel AI)
+MCTS_ITERATIONS = 1000     # Playouts per move (None = time budget only)
+MCTS_TIME_BUDGET = 0.15    # Seconds per move, whichever runs out first (None = iterations only)
+MCTS_EXPLORATION = 0.7     # UCB1 exploration constant
+MCTS_ROLLOUT_DEPTH = 40    # Ticks simulated per playout
+
+# Duel Endgame Tablebase
+DUEL_TABLEBASE = True      # Solve the 1 vs 1 duel on the first Mode 5 of each map (worker process, search meanwhile)
+# ALT Heuristic (Landmarks for A*)
+ALT_LANDMARKS = 8          # Landmarks per map (0 = plain Manhattan A*)
+
+# Precomputation Cache (landmark tables, duel tablebase, ...)
+PRECOMPUTE_CACHE_DIR = os.path.join(_ROOT, ".cache") # Artifacts saved per map fingerprint (None = no disk cache)
+PRECOMPUTE_CACHE_MAX_BYTES = 256 * 2**20  # Least recently used artifacts evicted beyond this
+PRECOMPUTE_CACHE_KIND_MAX_BYTES = {"tablebase": 64 * 2**20} # Per-kind caps within it (a tablebase is ~10 MB per map)
+
+# Compare Mode (all preview planners at once)
+COMPARE_WORKERS = 4        # Worker processes (one per planner runs them all in parallel)
+COMPARE_COLORS = {         # Overlay colour per planner
+    "BFS": (0, 255, 0),
+    "DFS": (255, 165, 0),
+    "A*": (0, 120, 255),
+    "Scent HC": (255, 0, 255),
+}
+
+# Pack Hunt (several Anteaters)
+ANTEATER_COUNT = 3         # Anteaters in Mode 9 (spread over the map)
+MULTI_WINDOW = 16          # Ticks each joint plan looks ahead (replanned every tick)
+
+# Redraw Scheduling
+IDLE_WAIT_MS = 1000        # Idle (nothing animating): block on input for up to this long, no redraws
+
+# Expectimax (duel AI against the modelled ants)
+EXPECTIMAX_DEPTH = 8           # Plies searched (Anteater and Ant moves)
+EXPECTIMAX_ANT_GREEDY = 0.9    # Probability an ant plays the flee rule (the rest: any legal move, uniformly)
+EXPECTIMAX_CACHE_SIZE = 200000 # Value cache entries (cleared when full, 0 = off)
+EXPECTIMAX_STAR2 = False       # Star2 probing at chance nodes (costs more nodes than it saves here)
@@ -9,7 +9,8 @@ import sys
 import os
 
 # Add parent directory to path to import config
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
 import config
 
 class TerrainType(Enum):
@@ -42,6 +43,16 @@ class Cell:
             return float('inf')
         return 1
 
+    def __eq__(self, other):
+        # Cells are compared by position so that a tile re-created after being
+        # paged out (see ChunkedGrid) still matches the original one.
+        if not isinstance(other, Cell):
+            return NotImplemented
+        return self.r == other.r and self.c == other.c
+
+    def __hash__(self):
+        return hash((self.r, self.c))
+
     @property
     def is_lethal(self):
         return self.terrain_type == TerrainType.TRAP
@@ -0,0 +1,304 @@
+"""
+environment/chunked_grid.py
+
+Defines the ChunkedGrid class: a Grid whose terrain lives in a disk-backed
+store and is paged in by fixed-size square chunks on demand.
+Only the most recently used chunks stay in memory (LRU eviction), so the
+simulation can run over maps much larger than RAM with bounded memory use.
+
+Searches (bfs, dfs, astar, hill climbing) only talk to the grid through
+get_cell / get_neighbors, so they work unchanged and only touch the chunks
+that their frontier actually reaches.
+"""
+
+import os
+import random
+import tempfile
+from array import array
+from collections import OrderedDict
+
+from .cell import Cell, TerrainType
+from .grid import Grid, MUD_SPOTS
+import sys
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+
+# On-disk terrain codes (0 = never written, read back as NORMAL)
+_TERRAIN_BY_CODE = {
+    0: TerrainType.NORMAL,
+    TerrainType.NORMAL.value: TerrainType.NORMAL,
+    TerrainType.MUD.value: TerrainType.MUD,
+    TerrainType.TRAP.value: TerrainType.TRAP,
+    TerrainType.WALL.value: TerrainType.WALL,
+}
+
+
+class ChunkStore:
+    """
+    Fixed-size record file holding every chunk of the world.
+
+    Record layout (per chunk, chunk_size x chunk_size cells, row-major):
+    - 1 byte per cell: terrain code (TerrainType.value)
+    - 4 bytes per cell: pheromone level (float32)
+    The file is created sparse, so untouched chunks cost no disk space.
+    """
+
+    def __init__(self, path, chunk_rows, chunk_cols, chunk_size):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.chunk_cols = chunk_cols
+        self.cells_per_chunk = chunk_size * chunk_size
+        self.record_size = self.cells_per_chunk * 5
+
+        size = chunk_rows * chunk_cols * self.record_size
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        self.file = open(path, mode)
+        if os.path.getsize(path) < size:
+            self.file.truncate(size)
+
+    def _offset(self, cr, cc):
+        return (cr * self.chunk_cols + cc) * self.record_size
+
+    def read(self, cr, cc):
+        """Returns (terrain bytes, pheromone float array) of one chunk."""
+        self.file.seek(self._offset(cr, cc))
+        raw = self.file.read(self.record_size)
+        n = self.cells_per_chunk
+        pheromone = array("f")
+        pheromone.frombytes(raw[n:])
+        return raw[:n], pheromone
+
+    def write(self, cr, cc, terrain, pheromone):
+        self.file.seek(self._offset(cr, cc))
+        self.file.write(terrain)
+        self.file.write(pheromone.tobytes())
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class Chunk:
+    """A resident tile: its Cells plus the bytes it was loaded from."""
+
+    __slots__ = ("cr", "cc", "cells", "terrain", "pheromone")
+
+    def __init__(self, cr, cc, origin_r, origin_c, size, rows, cols, terrain, pheromone):
+        self.cr = cr
+        self.cc = cc
+        self.terrain = terrain
+        self.pheromone = pheromone
+        self.cells = []
+        for i in range(size * size):
+            r = origin_r + i // size
+            c = origin_c + i % size
+            if r < rows and c < cols:
+                cell = Cell(r, c, _TERRAIN_BY_CODE[terrain[i]])
+                cell.pheromone_level = pheromone[i]
+            else:
+                cell = None # Padding beyond the map edge
+            self.cells.append(cell)
+
+    def snapshot(self):
+        """Serializes the current Cell state back to (terrain, pheromone)."""
+        terrain = bytearray(len(self.cells))
+        pheromone = array("f", bytes(4 * len(self.cells)))
+        for i, cell in enumerate(self.cells):
+            if cell is not None:
+                terrain[i] = cell.terrain_type.value
+                pheromone[i] = cell.pheromone_level
+        return bytes(terrain), pheromone
+
+    def is_dirty(self, terrain, pheromone):
+        return terrain != self.terrain or pheromone != self.pheromone
+
+
+class ChunkedGrid(Grid):
+    """
+    Drop-in replacement for Grid that pages chunk_size x chunk_size tiles
+    from a ChunkStore and keeps at most max_resident_chunks of them loaded.
+    """
+
+    def __init__(self, rows=config.ROWS, cols=config.COLS, path=None,
+                 chunk_size=config.CHUNK_SIZE,
+                 max_resident_chunks=config.MAX_RESIDENT_CHUNKS,
+                 generate=True):
+        self.rows = rows
+        self.cols = cols
+        self.chunk_size = chunk_size
+        self.max_resident_chunks = max(1, max_resident_chunks)
+        self.chunk_rows = (rows + chunk_size - 1) // chunk_size
+        self.chunk_cols = (cols + chunk_size - 1) // chunk_size
+
+        self._owns_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="anteater_world_", suffix=".chunks")
+            os.close(fd)
+            os.remove(path)
+        self.store = ChunkStore(path, self.chunk_rows, self.chunk_cols, chunk_size)
+
+        self._chunks = OrderedDict() # (cr, cc) -> Chunk, oldest first
+        self._scented_chunks = set() # Chunks holding non-zero pheromone
+        self.loads = 0
+        self.evictions = 0
+        self.terrain_version = 0
+        self.terrain_listeners = [] # fn(r, c, old, new) called by set_terrain
+        self._fingerprint = (None, None) # (terrain_version, digest) of the last fingerprint()
+
+        if generate:
+            self.generate_navigation_map()
+
+    # --- Paging ---
+
+    def _chunk(self, cr, cc):
+        key = (cr, cc)
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            return chunk
+
+        terrain, pheromone = self.store.read(cr, cc)
+        size = self.chunk_size
+        chunk = Chunk(cr, cc, cr * size, cc * size, size, self.rows, self.cols, terrain, pheromone)
+        self._chunks[key] = chunk
+        self.loads += 1
+
+        while len(self._chunks) > self.max_resident_chunks:
+            _, old = self._chunks.popitem(last=False)
+            self._write_back(old)
+            self.evictions += 1
+        return chunk
+
+    def _write_back(self, chunk):
+        terrain, pheromone = chunk.snapshot()
+        if chunk.is_dirty(terrain, pheromone):
+            self.store.write(chunk.cr, chunk.cc, terrain, pheromone)
+            chunk.terrain, chunk.pheromone = terrain, pheromone
+
+    def _iter_chunk_cells(self):
+        """Visits every cell chunk by chunk, so each tile is loaded only once."""
+        for cr in range(self.chunk_rows):
+            for cc in range(self.chunk_cols):
+                for cell in self._chunk(cr, cc).cells:
+                    if cell is not None:
+                        yield cell
+
+    @property
+    def resident_chunks(self):
+        return len(self._chunks)
+
+    def flush(self):
+        """Writes every modified resident chunk back to disk."""
+        for chunk in self._chunks.values():
+            self._write_back(chunk)
+        self.store.flush()
+
+    def close(self):
+        self.flush()
+        self.store.close()
+        self._chunks.clear()
+        if self._owns_file and os.path.exists(self.store.path):
+            os.remove(self.store.path)
+
+    # --- Grid interface ---
+
+    @property
+    def cells(self):
+        raise AttributeError("ChunkedGrid has no resident cell matrix; use get_cell(r, c)")
+
+    def get_cell(self, r, c):
+        if 0 <= r < self.rows and 0 <= c < self.cols:
+            size = self.chunk_size
+            chunk = self._chunk(r // size, c // size)
+            return chunk.cells[(r % size) * size + (c % size)]
+        return None
+
+    def get_neighbors(self, cell, avoid_traps=False):
+        """Returns valid neighbors (Up, Down, Left, Right)."""
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        neighbors = []
+        for dr, dc in directions:
+            neighbor = self.get_cell(cell.r + dr, cell.c + dc)
+            if neighbor is None:
+                continue
+            if neighbor.terrain_type == TerrainType.WALL:
+                continue
+            if avoid_traps and neighbor.terrain_type == TerrainType.TRAP:
+                continue
+            neighbors.append(neighbor)
+        return neighbors
+
+    def generate_navigation_map(self, seed=None):
+        """
+        Same recipe as Grid.generate_navigation_map (MUD_SPOTS, random mud,
+        the Tactical Playground in the top-left corner), so a seed gives the
+        same map in both classes. The mud is drawn in Grid's row-major order
+        one band of chunk rows at a time, then written chunk by chunk, so
+        generation also stays within the resident budget.
+        """
+        rng = random.Random(seed) if seed is not None else random
+        self.seed = seed
+
+        size, cols = self.chunk_size, self.cols
+        spots = set(MUD_SPOTS)
+        for cr in range(self.chunk_rows):
+            r0 = cr * size
+            mud = bytearray(min(size, self.rows - r0) * cols)
+            for i in range(len(mud)):
+                r, c = divmod(i, cols)
+                # Hardcoded spots are mud already: Grid draws no number for them
+                mud[i] = (r0 + r, c) in spots or rng.random() < 0.15
+            for cc in range(self.chunk_cols):
+                for cell in self._chunk(cr, cc).cells:
+                    if cell is not None:
+                        cell.terrain_type = TerrainType.MUD if mud[(cell.r - r0) * cols + cell.c] else TerrainType.NORMAL
+                        cell.pheromone_level = 0.0
+        self._scented_chunks.clear()
+
+        if self.rows >= config.ROWS and self.cols >= config.COLS:
+            self._build_tactical_features()
+        else:
+            self.get_cell(0, 0).terrain_type = TerrainType.NORMAL
+        self.terrain_version += 1
+
+    def clear_zone(self, center_r, center_c, radius):
+        """Clears obstacles around a point."""
+        for r in range(center_r - radius, center_r + radius + 1):
+            for c in range(center_c - radius, center_c + radius + 1):
+                cell = self.get_cell(r, c)
+                if cell is not None:
+                    cell.terrain_type = TerrainType.NORMAL
+        self.terrain_version += 1
+
+    def update_scent(self, ants):
+        """
+        Multi-source BFS scent, as in Grid.update_scent. Only the chunks
+        that were scented last time are reset, instead of the whole world.
+        """
+        size = self.chunk_size
+        for cr, cc in self._scented_chunks:
+            for cell in self._chunk(cr, cc).cells:
+                if cell is not None:
+                    cell.pheromone_level = 0.0
+        self._scented_chunks = set()
+
+        sources = []
+        for ant in ants:
+            if ant.is_alive:
+                sources.append((self.get_cell(ant.r, ant.c), 20.0))
+
+        if not sources:
+            return
+
+        from algorithms.pathfinding import multi_source_bfs
+
+        scent_map = multi_source_bfs(self, sources, 20.0)
+
+        for (r, c), level in scent_map.items():
+            self.get_cell(r, c).pheromone_level = level
+            self._scented_chunks.add((r // size, c // size))
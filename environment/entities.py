@@ -7,9 +7,23 @@ Handles position, energy management, and types.
 
 import sys
 import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
 import config
 
+def step_energy_cost(cell):
+    """
+    Energy spent to step INTO a cell (None for walls).
+    Single source of truth for movement cost: Entity.move_to, path cost
+    previews and the energy-aware planners all use it.
+    """
+    t_name = cell.terrain_type.name
+    if t_name == "MUD":
+        return config.ENERGY_COST_MUD
+    elif t_name == "WALL":
+        return None
+    return config.ENERGY_COST_MOVE
+
 class Entity:
     def __init__(self, r, c, max_energy, recharge_rate, name="Entity"):
         self.r = r
@@ -20,11 +34,20 @@ class Entity:
         self.name = name
         self.is_alive = True
         self.recovering = False  # Status when restoring energy
+        self.index = None        # SpatialIndex this entity is registered in (if any)
 
     @property
     def position(self):
         return (self.r, self.c)
 
+    def set_position(self, r, c):
+        """Places the entity (no energy rules), keeping its SpatialIndex in sync."""
+        old_position = (self.r, self.c)
+        self.r = r
+        self.c = c
+        if self.index is not None:
+            self.index.moved(self, old_position)
+
     def move_to(self, cell):
         """
         Moves to a target cell if enough energy is available.
@@ -34,19 +57,13 @@ class Entity:
             self.recharge()
             return False
 
-        t_name = cell.terrain_type.name
-        
-        if t_name == "MUD":
-            energy_cost = config.ENERGY_COST_MUD
-        elif t_name == "WALL":
+        energy_cost = step_energy_cost(cell)
+        if energy_cost is None: # Wall
             return False
-        else:
-            energy_cost = config.ENERGY_COST_MOVE
         
         # Check affordability
         if self.energy >= energy_cost:
-            self.r = cell.r
-            self.c = cell.c
+            self.set_position(cell.r, cell.c)
             self.energy -= energy_cost
             return True
         else:
@@ -72,4 +89,37 @@ class Anteater(Entity):
 
 class Ant(Entity):
     def __init__(self, r, c):
-        super().__init__(r, c, config.ANT_MAX_ENERGY, config.RECHARGE_ANT, "Ant")
\ No newline at end of file
+        super().__init__(r, c, config.ANT_MAX_ENERGY, config.RECHARGE_ANT, "Ant")
+
+def simulate_travel(step_costs, energy, max_energy, recharge_rate, recovering=False):
+    """
+    Replays the Entity.move_to / recharge rules for a sequence of step
+    energy costs, one tick per call of move_to, without touching an Entity.
+    A step that cannot be afforded starts recovery (one tick), then the
+    entity recharges every tick until full before trying again.
+    Returns (ticks, energy, recovering) after the last step.
+    """
+    ticks = 0
+    for cost in step_costs:
+        if cost > max_energy:
+            raise ValueError(f"Step cost {cost} exceeds max energy {max_energy}")
+        if recovering or energy < cost:
+            if not recovering:
+                ticks += 1 # Failed move: start_recovery()
+            deficit = max_energy - energy
+            ticks += -(-deficit // recharge_rate) if deficit > 0 else 1
+            energy = max_energy
+            recovering = False
+        ticks += 1
+        energy -= cost
+    return ticks, energy, recovering
+
+def path_travel_ticks(path, entity):
+    """
+    Real ticks for an entity to walk a path of cells (path[0] = its cell),
+    recovery stalls included. Returns (ticks, energy left).
+    """
+    costs = [step_energy_cost(cell) for cell in path[1:]]
+    ticks, energy, _ = simulate_travel(costs, entity.energy, entity.max_energy,
+                                       entity.recharge_rate, entity.recovering)
+    return ticks, energy
\ No newline at end of file
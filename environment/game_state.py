@@ -0,0 +1,282 @@
+"""
+environment/game_state.py
+
+Compact, copyable game state shared by the planners.
+
+A GameState holds the Anteater and the ants as plain ints and lists over a
+Bitboard (positions are bit indices). The rules are those of the main loop
+and Entity.move_to / recharge:
+- Turn order: the Anteater, then every living ant in order; one full round
+  is one tick.
+- A move is a destination bit. WAIT is the only move while recovering
+  (recharge), and is offered as "start recovery" when some step cannot be
+  afforded (what a failed move_to does).
+- The Anteater may step on a trap and dies; ants walk over traps.
+- Sharing a cell is a capture: the ant dies and the Anteater gains
+  ENERGY_PER_ANT.
+apply_move / undo_move work in place with an undo stack, so a search
+walks the tree on one object. `key` is a Zobrist hash kept up to date
+incrementally (positions, energies, recovery flags, side to move).
+"""
+
+import random
+from math import gcd
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+
+WAIT = -1 # Recharge while recovering / start recovery
+
+# Every energy the rules can produce is a multiple of _UNIT (full tanks, step
+# costs, recharges, the capture bonus), so energy // _UNIT is exact, not a bucket
+_UNIT = gcd(gcd(gcd(config.ENERGY_COST_MOVE, config.ENERGY_COST_MUD),
+                gcd(config.RECHARGE_ANTEATER, config.RECHARGE_ANT)),
+            gcd(gcd(config.ANTEATER_MAX_ENERGY, config.ANT_MAX_ENERGY), config.ENERGY_PER_ANT))
+_LEVELS = max(config.ANTEATER_MAX_ENERGY, config.ANT_MAX_ENERGY) // _UNIT + 1
+_ZOBRIST = {} # size -> (hunter keys, ant keys, turn keys)
+
+
+def _zobrist(size, turns):
+    """Random keys for (bit, energy level, recovering) of each side, cached per board size."""
+    keys = _ZOBRIST.get((size, turns))
+    if keys is None:
+        rng = random.Random(0x5EED)
+        span = size * _LEVELS * 2
+        keys = ([rng.getrandbits(64) for _ in range(span)],
+                [rng.getrandbits(64) for _ in range(span)],
+                [rng.getrandbits(64) for _ in range(turns)])
+        _ZOBRIST[(size, turns)] = keys
+    return keys
+
+
+def _slot(position, energy, recovering):
+    return ((position * _LEVELS) + min(energy // _UNIT, _LEVELS - 1)) * 2 + recovering
+
+
+class GameState:
+    __slots__ = ("board", "hunter", "hunter_energy", "hunter_recovering", "hunter_alive",
+                 "ants", "ant_energy", "ant_recovering", "ant_alive", "alive_count",
+                 "turn", "tick", "key", "_undo", "_hunter_keys", "_ant_keys", "_turn_keys")
+
+    def __init__(self, board, hunter, hunter_energy, ants, ant_energy=None,
+                 hunter_recovering=False, ant_recovering=None, turn=0):
+        """
+        board: Bitboard of the map. hunter / ants: bit indices.
+        Energies default to full tanks, recovery flags to False.
+        turn: side to move (0: Anteater, k: ant k - 1).
+        """
+        n = len(ants)
+        self.board = board
+        self.hunter = hunter
+        self.hunter_energy = hunter_energy
+        self.hunter_recovering = bool(hunter_recovering)
+        self.hunter_alive = True
+        self.ants = list(ants)
+        self.ant_energy = list(ant_energy) if ant_energy is not None else [config.ANT_MAX_ENERGY] * n
+        self.ant_recovering = [bool(r) for r in ant_recovering] if ant_recovering is not None else [False] * n
+        self.ant_alive = [True] * n
+        self.alive_count = n
+        self.turn = turn # 0: Anteater, k: ant k - 1
+        self.tick = 0
+        self._undo = []
+        self._hunter_keys, self._ant_keys, self._turn_keys = _zobrist(len(board.row), n + 1)
+        self.key = self._full_key()
+
+        # Ants starting on the Anteater are already caught
+        for i in range(n):
+            if self.ants[i] == hunter:
+                self._capture(i)
+        self._undo.clear()
+
+    @classmethod
+    def from_entities(cls, board, anteater, ants):
+        """State of the living `ants` (in order) and the Anteater."""
+        alive = [a for a in ants if a.is_alive]
+        return cls(board, board.bit(anteater.r, anteater.c), anteater.energy,
+                   [board.bit(a.r, a.c) for a in alive], [a.energy for a in alive],
+                   anteater.recovering, [a.recovering for a in alive])
+
+    def write_back(self, anteater, ants):
+        """Copies the state onto the entities it was built from (same ant order)."""
+        board = self.board
+        anteater.set_position(*board.position(self.hunter))
+        anteater.energy = self.hunter_energy
+        anteater.recovering = self.hunter_recovering
+        anteater.is_alive = self.hunter_alive
+        for i, ant in enumerate(a for a in ants if a.is_alive):
+            ant.set_position(*board.position(self.ants[i]))
+            ant.energy = self.ant_energy[i]
+            ant.recovering = self.ant_recovering[i]
+            ant.is_alive = self.ant_alive[i]
+
+    def copy(self):
+        """Independent state (shares the board and key tables, empty undo stack)."""
+        other = GameState.__new__(GameState)
+        other.board = self.board
+        other.hunter = self.hunter
+        other.hunter_energy = self.hunter_energy
+        other.hunter_recovering = self.hunter_recovering
+        other.hunter_alive = self.hunter_alive
+        other.ants = self.ants[:]
+        other.ant_energy = self.ant_energy[:]
+        other.ant_recovering = self.ant_recovering[:]
+        other.ant_alive = self.ant_alive[:]
+        other.alive_count = self.alive_count
+        other.turn = self.turn
+        other.tick = self.tick
+        other.key = self.key
+        other._undo = []
+        other._hunter_keys, other._ant_keys, other._turn_keys = self._hunter_keys, self._ant_keys, self._turn_keys
+        return other
+
+    # --- Hashing ---
+
+    def _hunter_key(self):
+        return self._hunter_keys[_slot(self.hunter, self.hunter_energy, self.hunter_recovering)]
+
+    def _ant_key(self, i):
+        return self._ant_keys[_slot(self.ants[i], self.ant_energy[i], self.ant_recovering[i])]
+
+    def _full_key(self):
+        key = self._turn_keys[self.turn]
+        if self.hunter_alive:
+            key ^= self._hunter_key()
+        for i in range(len(self.ants)):
+            if self.ant_alive[i]:
+                key ^= self._ant_key(i)
+        return key
+
+    # --- Queries ---
+
+    @property
+    def is_terminal(self):
+        return not self.hunter_alive or self.alive_count == 0
+
+    def is_lethal(self, move):
+        """True if the Anteater stepping to `move` dies (trap)."""
+        return move >= 0 and (self.board.trap >> move) & 1 == 1
+
+    def mover(self):
+        """(position, energy, recovering, max energy) of the side to move."""
+        if self.turn == 0:
+            return self.hunter, self.hunter_energy, self.hunter_recovering, config.ANTEATER_MAX_ENERGY
+        i = self.turn - 1
+        return self.ants[i], self.ant_energy[i], self.ant_recovering[i], config.ANT_MAX_ENERGY
+
+    def legal_moves(self):
+        """Moves of the side to move: affordable steps, plus WAIT when it applies."""
+        if self.is_terminal:
+            return []
+        position, energy, recovering, _ = self.mover()
+        if recovering:
+            return [WAIT]
+        board = self.board
+        steps = board.moves(position, False) # Traps included: lethal for the Anteater
+        cost = board.energy
+        moves = [j for j in steps if energy >= cost[j]]
+        if len(moves) < len(steps) or not steps:
+            moves.append(WAIT) # A failed move starts recovery
+        return moves
+
+    # --- Make / unmake ---
+
+    def _capture(self, i):
+        self._undo.append(("capture", i, self.hunter_energy))
+        self.key ^= self._ant_key(i) ^ self._hunter_key()
+        self.ant_alive[i] = False
+        self.alive_count -= 1
+        self.hunter_energy = min(self.hunter_energy + config.ENERGY_PER_ANT, config.ANTEATER_MAX_ENERGY)
+        self.key ^= self._hunter_key()
+
+    def _next_turn(self):
+        self.key ^= self._turn_keys[self.turn]
+        turn = self.turn
+        n = len(self.ants)
+        while True:
+            turn += 1
+            if turn > n:
+                turn = 0
+                self.tick += 1
+                break
+            if self.ant_alive[turn - 1]:
+                break
+        self.turn = turn
+        self.key ^= self._turn_keys[turn]
+
+    def apply_move(self, move):
+        """Plays one move of the side to move (from legal_moves())."""
+        undo = self._undo
+        mark = len(undo)
+        undo.append(("turn", self.turn, self.tick, self.key))
+
+        if self.turn == 0:
+            undo.append(("hunter", self.hunter, self.hunter_energy, self.hunter_recovering))
+            self.key ^= self._hunter_key()
+            if move == WAIT:
+                if self.hunter_recovering:
+                    e = self.hunter_energy + config.RECHARGE_ANTEATER
+                    if e >= config.ANTEATER_MAX_ENERGY:
+                        e = config.ANTEATER_MAX_ENERGY
+                        self.hunter_recovering = False
+                    self.hunter_energy = e
+                else:
+                    self.hunter_recovering = True
+            else:
+                self.hunter = move
+                self.hunter_energy -= self.board.energy[move]
+            self.key ^= self._hunter_key()
+            if move != WAIT and (self.board.trap >> move) & 1:
+                undo.append(("dead",))
+                self.key ^= self._hunter_key()
+                self.hunter_alive = False
+            else:
+                for i in range(len(self.ants)):
+                    if self.ant_alive[i] and self.ants[i] == self.hunter:
+                        self._capture(i)
+        else:
+            i = self.turn - 1
+            undo.append(("ant", i, self.ants[i], self.ant_energy[i], self.ant_recovering[i]))
+            self.key ^= self._ant_key(i)
+            if move == WAIT:
+                if self.ant_recovering[i]:
+                    e = self.ant_energy[i] + config.RECHARGE_ANT
+                    if e >= config.ANT_MAX_ENERGY:
+                        e = config.ANT_MAX_ENERGY
+                        self.ant_recovering[i] = False
+                    self.ant_energy[i] = e
+                else:
+                    self.ant_recovering[i] = True
+            else:
+                self.ants[i] = move
+                self.ant_energy[i] -= self.board.energy[move]
+            self.key ^= self._ant_key(i)
+            if self.ants[i] == self.hunter:
+                self._capture(i)
+
+        if not self.is_terminal:
+            self._next_turn()
+        undo.append(("mark", mark))
+
+    def undo_move(self):
+        """Takes back the last apply_move()."""
+        undo = self._undo
+        _, mark = undo.pop()
+        while len(undo) > mark:
+            record = undo.pop()
+            kind = record[0]
+            if kind == "capture":
+                _, i, hunter_energy = record
+                self.ant_alive[i] = True
+                self.alive_count += 1
+                self.hunter_energy = hunter_energy
+            elif kind == "hunter":
+                _, self.hunter, self.hunter_energy, self.hunter_recovering = record
+            elif kind == "ant":
+                _, i, self.ants[i], self.ant_energy[i], self.ant_recovering[i] = record
+            elif kind == "dead":
+                self.hunter_alive = True
+            else: # "turn": restores side to move, tick and hash
+                _, self.turn, self.tick, self.key = record
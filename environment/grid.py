@@ -5,23 +5,38 @@ Defines the Grid class which manages the 2D array of Cells.
 """
 
 import random
+import hashlib
 from .cell import Cell, TerrainType
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
 import config
 
+# Hardcoded mud of the navigation map (the random scatter comes on top)
+MUD_SPOTS = [
+    (3, 3), (3, 4), (4, 3),
+    (7, 8), (8, 7), (8, 8), (8, 9), (9, 8),
+    (12, 2), (12, 3), (13, 2),
+    (2, 15), (2, 16), (3, 15)
+]
+
 class Grid:
     def __init__(self, rows=config.ROWS, cols=config.COLS):
         self.rows = rows
         self.cols = cols
         self.cells = [[Cell(r, c) for c in range(cols)] for r in range(rows)]
+        self.terrain_version = 0 # Bumped on every terrain change (cache invalidation)
+        self.terrain_listeners = [] # fn(r, c, old, new) called by set_terrain
+        self._fingerprint = (None, None) # (terrain_version, digest) of the last fingerprint()
         self.generate_navigation_map()
 
-    def generate_navigation_map(self):
+    def generate_navigation_map(self, seed=None):
         """
         Generates the main game map (The "Tactical Playground").
+        If a seed is given the random mud scatter is reproducible
+        (used by episode recordings to rebuild the exact map).
         
         Zones:
         1. scattered_mud: Random patches of high cost terrain.
@@ -30,6 +45,9 @@ class Grid:
            - Anteater cannot pass (Treats TRAP as Wall).
         3. spiral: A spiral wall structure at bottom-right to test pathfinding/HC depth.
         """
+        rng = random.Random(seed) if seed is not None else random
+        self.seed = seed
+
         # Reset grid to plain
         for r in range(self.rows):
             for c in range(self.cols):
@@ -37,13 +55,7 @@ class Grid:
 
         # --- 1. Scattered Mud (High Cost Zones) ---
         # Existing hardcoded spots + Random Scatter
-        mud_spots = [
-            (3, 3), (3, 4), (4, 3),
-            (7, 8), (8, 7), (8, 8), (8, 9), (9, 8),
-            (12, 2), (12, 3), (13, 2),
-            (2, 15), (2, 16), (3, 15)
-        ]
-        for r, c in mud_spots:
+        for r, c in MUD_SPOTS:
             self.cells[r][c].terrain_type = TerrainType.MUD
             
         # Add MORE Mud randomly (approx 10% of remaining free space)
@@ -51,40 +63,51 @@ class Grid:
         for r in range(self.rows):
             for c in range(self.cols):
                 if self.cells[r][c].terrain_type == TerrainType.NORMAL:
-                    if random.random() < 0.15: # 15% chance for mud
+                    if rng.random() < 0.15: # 15% chance for mud
                         self.cells[r][c].terrain_type = TerrainType.MUD
 
+        self._build_tactical_features()
+        self.terrain_version += 1
+
+    def _build_tactical_features(self):
+        """
+        Stamps the fixed gates, spiral and choke-point walls of the
+        Tactical Playground. Goes through get_cell so that any grid
+        storage (in-memory or chunked) can reuse the layout.
+        """
+        cell = self.get_cell
+
         # --- 2. Trap Gates (The "Filters") ---
         # Gate A: Vertical Barrier on the Left
-        for r in range(2, 7): self.cells[r][6].terrain_type = TerrainType.WALL
-        self.cells[4][6].terrain_type = TerrainType.TRAP # The Hole
+        for r in range(2, 7): cell(r, 6).terrain_type = TerrainType.WALL
+        cell(4, 6).terrain_type = TerrainType.TRAP # The Hole
         
         # Gate B: Horizontal Barrier in the Middle
-        for c in range(8, 14): self.cells[10][c].terrain_type = TerrainType.WALL
-        self.cells[10][11].terrain_type = TerrainType.TRAP
+        for c in range(8, 14): cell(10, c).terrain_type = TerrainType.WALL
+        cell(10, 11).terrain_type = TerrainType.TRAP
         
         # Gate C: Protecting the bottom-left corner
-        for r in range(15, 19): self.cells[r][5].terrain_type = TerrainType.WALL
-        self.cells[17][5].terrain_type = TerrainType.TRAP
+        for r in range(15, 19): cell(r, 5).terrain_type = TerrainType.WALL
+        cell(17, 5).terrain_type = TerrainType.TRAP
 
         # --- 3. The Spiral (Hill Climbing Trap) ---
-        for c in range(14, 19): self.cells[14][c].terrain_type = TerrainType.WALL
-        for r in range(14, 19): self.cells[r][18].terrain_type = TerrainType.WALL
-        for c in range(14, 19): self.cells[18][c].terrain_type = TerrainType.WALL
-        for r in range(16, 19): self.cells[r][14].terrain_type = TerrainType.WALL
+        for c in range(14, 19): cell(14, c).terrain_type = TerrainType.WALL
+        for r in range(14, 19): cell(r, 18).terrain_type = TerrainType.WALL
+        for c in range(14, 19): cell(18, c).terrain_type = TerrainType.WALL
+        for r in range(16, 19): cell(r, 14).terrain_type = TerrainType.WALL
         # Inner part
-        for c in range(15, 17): self.cells[16][c].terrain_type = TerrainType.WALL
-        self.cells[15][16].terrain_type = TerrainType.WALL
+        for c in range(15, 17): cell(16, c).terrain_type = TerrainType.WALL
+        cell(15, 16).terrain_type = TerrainType.WALL
         
         # --- 4. Extra Walls (New Request) ---
         # Add some random internal walls to create choke points
         # Horizontal snippet
-        for c in range(1, 5): self.cells[6][c].terrain_type = TerrainType.WALL
+        for c in range(1, 5): cell(6, c).terrain_type = TerrainType.WALL
         # Vertical snippet
-        for r in range(8, 12): self.cells[r][2].terrain_type = TerrainType.WALL
+        for r in range(8, 12): cell(r, 2).terrain_type = TerrainType.WALL
         
         # Ensure Start is clear
-        self.cells[0][0].terrain_type = TerrainType.NORMAL
+        cell(0, 0).terrain_type = TerrainType.NORMAL
             
     def smooth_map(self):
         # Disabled for fixed map
@@ -107,6 +130,19 @@ class Grid:
             for c in range(center_c - radius, center_c + radius + 1):
                 if 0 <= r < self.rows and 0 <= c < self.cols:
                     self.cells[r][c].terrain_type = TerrainType.NORMAL
+        self.terrain_version += 1
+
+    def set_terrain(self, r, c, terrain_type):
+        """
+        Changes the terrain of one cell. Use this (rather than assigning
+        cell.terrain_type) so precomputed map data notices the change.
+        """
+        cell = self.get_cell(r, c)
+        old = cell.terrain_type
+        cell.terrain_type = terrain_type
+        self.terrain_version += 1
+        for listener in self.terrain_listeners:
+            listener(r, c, old, terrain_type) # Incremental updates (see ComponentIndex)
 
     def get_neighbors(self, cell, avoid_traps=False):
         """Returns valid neighbors (Up, Down, Left, Right)."""
@@ -154,6 +190,36 @@ class Grid:
         for (r, c), level in scent_map.items():
             self.cells[r][c].pheromone_level = level
 
+    def terrain_bytes(self):
+        """Row-major terrain codes (TerrainType.value), one byte per cell."""
+        return bytes(self.get_cell(r, c).terrain_type.value
+                     for r in range(self.rows) for c in range(self.cols))
+
+    def load_terrain(self, data):
+        """Restores terrain from terrain_bytes() output."""
+        by_value = {t.value: t for t in TerrainType}
+        for r in range(self.rows):
+            for c in range(self.cols):
+                self.get_cell(r, c).terrain_type = by_value[data[r * self.cols + c]]
+        self.terrain_version += 1
+
+    def terrain_hash(self):
+        """SHA-1 digest of the terrain layout (identifies a map)."""
+        return hashlib.sha1(self.terrain_bytes()).digest()
+
+    def fingerprint(self):
+        """
+        Hex content hash of the map (size and terrain), the key of on-disk
+        precomputations. Cached until terrain_version changes.
+        """
+        version, digest = self._fingerprint
+        if version != self.terrain_version:
+            h = hashlib.sha1(f"{self.rows}x{self.cols}:".encode())
+            h.update(self.terrain_bytes())
+            digest = h.hexdigest()
+            self._fingerprint = (self.terrain_version, digest)
+        return digest
+
     def get_cell(self, r, c):
         if 0 <= r < self.rows and 0 <= c < self.cols:
             return self.cells[r][c]
@@ -0,0 +1,151 @@
+"""
+environment/spatial_index.py
+
+Grid-bucket spatial index for entities.
+
+Every cell holding at least one entity has a bucket, so "who is on this
+cell?" is a dict lookup. Nearest-neighbor queries grow outward in
+Manhattan rings around the query point and stop as soon as the ring that
+contains the k-th match is complete. Entities registered in an index keep
+it up to date themselves (Entity.move_to / set_position).
+"""
+
+
+class SpatialIndex:
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.buckets = {}   # (r, c) -> list of entities
+        self._seq = {}      # id(entity) -> insertion order (tie-breaker)
+        self._next_seq = 0
+
+    @classmethod
+    def from_entities(cls, entities, rows, cols):
+        index = cls(rows, cols)
+        for entity in entities:
+            index.add(entity)
+        return index
+
+    def __len__(self):
+        return len(self._seq)
+
+    def __contains__(self, entity):
+        return id(entity) in self._seq
+
+    # --- Maintenance ---
+
+    def add(self, entity):
+        if id(entity) in self._seq:
+            return
+        self._seq[id(entity)] = self._next_seq
+        self._next_seq += 1
+        self.buckets.setdefault(entity.position, []).append(entity)
+        entity.index = self
+
+    def remove(self, entity):
+        if self._seq.pop(id(entity), None) is None:
+            return
+        self._discard(entity, entity.position)
+        if entity.index is self:
+            entity.index = None
+
+    def moved(self, entity, old_position):
+        """Called by the entity after its position changed."""
+        if old_position == entity.position:
+            return
+        self._discard(entity, old_position)
+        self.buckets.setdefault(entity.position, []).append(entity)
+
+    def _discard(self, entity, position):
+        bucket = self.buckets.get(position)
+        if bucket is None:
+            return
+        for i, other in enumerate(bucket):
+            if other is entity:
+                del bucket[i]
+                break
+        if not bucket:
+            del self.buckets[position]
+
+    # --- Queries ---
+
+    def at(self, r, c):
+        """All entities on (r, c) (alive or not)."""
+        return self.buckets.get((r, c), [])
+
+    def alive_at(self, r, c):
+        bucket = self.buckets.get((r, c))
+        if not bucket:
+            return []
+        return [e for e in bucket if e.is_alive]
+
+    def occupied(self, r, c):
+        """True if a living entity stands on (r, c)."""
+        bucket = self.buckets.get((r, c))
+        if not bucket:
+            return False
+        for e in bucket:
+            if e.is_alive:
+                return True
+        return False
+
+    def nearest(self, r, c, k=1, alive_only=True, max_distance=None, where=None):
+        """
+        Up to k entities closest to (r, c) in Manhattan distance.
+        Ties are broken by insertion order, like min() over the original
+        list. Falls back to one linear scan when the rings would visit more
+        cells than there are entities (sparse maps).
+        where: optional predicate; entities failing it are skipped while the
+        rings grow (only the rings up to the k-th match are visited).
+        """
+        limit = self.rows + self.cols
+        if max_distance is not None:
+            limit = min(limit, max_distance)
+
+        found = []
+        scanned = 0
+        buckets = self.buckets
+        for d in range(limit + 1):
+            ring = []
+            for dr in range(-d, d + 1):
+                nr = r + dr
+                if nr < 0 or nr >= self.rows:
+                    continue
+                dc = d - abs(dr)
+                bucket = buckets.get((nr, c - dc))
+                if bucket: ring.extend(bucket)
+                if dc:
+                    bucket = buckets.get((nr, c + dc))
+                    if bucket: ring.extend(bucket)
+            scanned += 4 * d + 1
+
+            if alive_only:
+                ring = [e for e in ring if e.is_alive]
+            if where is not None:
+                ring = [e for e in ring if where(e)]
+            ring.sort(key=lambda e: self._seq[id(e)])
+            found.extend(ring)
+            if len(found) >= k:
+                return found[:k]
+            if scanned > len(self._seq):
+                return self._linear_nearest(r, c, k, alive_only, limit, where)
+        return found[:k]
+
+    def _linear_nearest(self, r, c, k, alive_only, limit, where=None):
+        candidates = []
+        for bucket in self.buckets.values():
+            for e in bucket:
+                if alive_only and not e.is_alive:
+                    continue
+                if where is not None and not where(e):
+                    continue
+                d = abs(e.r - r) + abs(e.c - c)
+                if d <= limit:
+                    candidates.append((d, self._seq[id(e)], e))
+        candidates.sort(key=lambda t: (t[0], t[1]))
+        return [e for _, _, e in candidates[:k]]
+
+    def closest(self, r, c, alive_only=True, where=None):
+        """Single nearest entity (passing `where`, if given) or None."""
+        result = self.nearest(r, c, 1, alive_only, where=where)
+        return result[0] if result else None
@@ -0,0 +1,105 @@
+"""
+environment/swarm.py
+
+Array-backed state for large groups of ants.
+
+Instead of one Ant object per ant, positions (flat cell index), energy and
+status flags live in parallel arrays. The rules are the same as
+Entity.move_to / recharge, applied to every ant in one pass.
+"""
+
+from array import array
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+
+
+class AntSwarm:
+    def __init__(self, positions, cols, max_energy=config.ANT_MAX_ENERGY, recharge_rate=config.RECHARGE_ANT):
+        """positions: iterable of (r, c)."""
+        self.cols = cols
+        self.max_energy = max_energy
+        self.recharge_rate = recharge_rate
+        self.index = array("i", [r * cols + c for r, c in positions])
+        n = len(self.index)
+        self.energy = array("i", [max_energy]) * n
+        self.recovering = bytearray(n)
+        self.alive = bytearray(b"\x01") * n
+
+    def __len__(self):
+        return len(self.index)
+
+    @classmethod
+    def from_ants(cls, ants, cols):
+        swarm = cls([a.position for a in ants], cols)
+        for i, ant in enumerate(ants):
+            swarm.energy[i] = ant.energy
+            swarm.recovering[i] = ant.recovering
+            swarm.alive[i] = ant.is_alive
+        return swarm
+
+    def write_back(self, ants):
+        """Copies the array state back onto the Ant entities it came from."""
+        cols = self.cols
+        for i, ant in enumerate(ants):
+            ant.set_position(*divmod(self.index[i], cols))
+            ant.energy = self.energy[i]
+            ant.recovering = bool(self.recovering[i])
+            ant.is_alive = bool(self.alive[i])
+
+    def position(self, i):
+        return divmod(self.index[i], self.cols)
+
+    def alive_count(self):
+        return sum(self.alive)
+
+    def flee_step(self, field, adjacency, move_costs, hunter_index):
+        """
+        Moves every living ant one step away from the hunter.
+
+        field: distance (steps) from the hunter to every cell, -1 where
+               the hunter cannot go (treated as infinitely safe).
+        Each ant picks the neighbor with the largest field value (ties:
+        farther Manhattan distance from the hunter, then Up/Down/Left/Right
+        order). Recovering ants recharge instead; an ant that cannot afford
+        its chosen step starts recovering, as in Entity.move_to.
+        """
+        cols = self.cols
+        hr, hc = divmod(hunter_index, cols)
+        far = len(field) + 1
+        index, energy, recovering, alive = self.index, self.energy, self.recovering, self.alive
+        max_energy, recharge = self.max_energy, self.recharge_rate
+
+        for i in range(len(index)):
+            if not alive[i]:
+                continue
+            if recovering[i]:
+                e = energy[i] + recharge
+                if e >= max_energy:
+                    e = max_energy
+                    recovering[i] = 0
+                energy[i] = e
+                continue
+
+            best = -1
+            best_key = None
+            for j in adjacency[index[i]]:
+                d = field[j]
+                if d < 0: d = far
+                r, c = divmod(j, cols)
+                key = (d, abs(r - hr) + abs(c - hc))
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best = j
+            if best < 0:
+                continue
+
+            cost = move_costs[best]
+            if energy[i] >= cost:
+                index[i] = best
+                energy[i] -= cost
+            else:
+                recovering[i] = 1
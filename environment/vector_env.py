@@ -0,0 +1,275 @@
+"""
+environment/vector_env.py
+
+Batched environment: N independent games on one map, stepped in lockstep.
+
+Every world follows the rules of the main loop's AI battle (Modes 5 / 8),
+one tick per step:
+1. The Anteater acts: recharges if recovering, otherwise tries its action
+   like Entity.move_to (a step it cannot afford starts recovery, walls and
+   the map edge are no-ops).
+2. Stepping on a trap kills it.
+3. Every ant on its cell is eaten (+ENERGY_PER_ANT, capped).
+4. The living ants flee like FleePolicy / AntSwarm.flee_step.
+
+State lives in flat arrays (world i's ants at i * ants_per_env + k), so a
+step is one pass over plain ints with no Entity or Cell objects. The map
+tables are built once and the flee distance field of each Anteater cell
+is computed the first time it is needed, then shared by all worlds.
+
+Actions: UP, DOWN, LEFT, RIGHT, STAY (STAY does nothing unless recovering).
+Observation per world (obs_size ints):
+    anteater r, c, energy, recovering, then per ant: r, c, energy, recovering, alive
+Reward: +1 per ant eaten, -1 when the Anteater dies.
+Done: all ants eaten, Anteater dead, or max_ticks reached. With
+auto_reset (default) finished worlds restart at once and their
+observation is the first one of the new episode; without it they stay
+frozen (done, reward 0) until reset().
+"""
+
+from array import array
+import random
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+from algorithms.distance_field import build_adjacency, build_move_costs, distance_field
+from environment.cell import TerrainType
+
+UP, DOWN, LEFT, RIGHT, STAY = range(5)
+NUM_ACTIONS = 5
+
+DEFAULT_ANTEATER = (0, 0)
+DEFAULT_ANTS = [(4, 9), (13, 11), (15, 15), (17, 2)] # Tactical positions of main.py
+
+ANTEATER_FIELDS = 4 # r, c, energy, recovering
+ANT_FIELDS = 5      # r, c, energy, recovering, alive
+
+
+class VectorEnv:
+    def __init__(self, grid, num_envs, anteater_start=DEFAULT_ANTEATER, ant_starts=None,
+                 max_ticks=500, randomize=False, auto_reset=True, seed=None):
+        """
+        grid: the shared map (its terrain is read once).
+        ant_starts: (r, c) of every ant (default: main.py's four ants).
+        randomize: new episodes place the Anteater and ants on random
+                   cells (safe cells for the Anteater) instead of the starts.
+        """
+        self.rows, self.cols = grid.rows, grid.cols
+        self.num_envs = n = num_envs
+        self.anteater_start = anteater_start
+        self.ant_starts = list(DEFAULT_ANTS if ant_starts is None else ant_starts)
+        self.ants_per_env = k = len(self.ant_starts)
+        self.max_ticks = max_ticks
+        self.randomize = randomize
+        self.auto_reset = auto_reset
+        self.rng = random.Random(seed)
+        self.obs_size = ANTEATER_FIELDS + ANT_FIELDS * k
+
+        # Map tables (shared by every world)
+        size = self.rows * self.cols
+        self.hunter_adjacency = build_adjacency(grid, avoid_traps=True)
+        self.ant_adjacency = build_adjacency(grid, avoid_traps=False)
+        self.move_costs = build_move_costs(grid)
+        terrain = [grid.get_cell(r, c).terrain_type for r in range(self.rows) for c in range(self.cols)]
+        self.trap = bytearray(t == TerrainType.TRAP for t in terrain)
+        self.open_cells = [i for i in range(size) if terrain[i] != TerrainType.WALL]
+        self.safe_cells = [i for i in self.open_cells if not self.trap[i]]
+        self.moves = self._action_table(terrain)
+        self.row = [i // self.cols for i in range(size)]
+        self.col = [i % self.cols for i in range(size)]
+        self.fields = [None] * size # Flee field per Anteater cell, built on demand
+
+        # World state
+        self.hunter = array("i", [0]) * n
+        self.hunter_energy = array("i", [0]) * n
+        self.hunter_recovering = bytearray(n)
+        self.hunter_alive = bytearray(n)
+        self.ant = array("i", [0]) * (n * k)
+        self.ant_energy = array("i", [0]) * (n * k)
+        self.ant_recovering = bytearray(n * k)
+        self.ant_alive = bytearray(n * k)
+        self.alive_count = array("i", [0]) * n
+        self.ticks = array("i", [0]) * n
+
+        # Step outputs (reused every step)
+        self.obs = array("i", [0]) * (n * self.obs_size)
+        self.rewards = array("d", [0.0]) * n
+        self.dones = bytearray(n)
+        self.episodes = 0
+
+    def _action_table(self, terrain):
+        """Destination per (action, cell); -1 when the move is a no-op (edge, wall, STAY)."""
+        rows, cols = self.rows, self.cols
+        table = [array("i", [-1]) * (rows * cols) for _ in range(NUM_ACTIONS)]
+        for i in range(rows * cols):
+            r, c = divmod(i, cols)
+            for action, (dr, dc) in enumerate(((-1, 0), (1, 0), (0, -1), (0, 1))):
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < cols and terrain[nr * cols + nc] != TerrainType.WALL:
+                    table[action][i] = nr * cols + nc
+        return table
+
+    def _field(self, hunter):
+        field = self.fields[hunter]
+        if field is None:
+            field = self.fields[hunter] = distance_field(self.hunter_adjacency, [hunter])
+        return field
+
+    # --- Episodes ---
+
+    def reset(self):
+        """Restarts every world; returns the observation array."""
+        for i in range(self.num_envs):
+            self._reset_world(i)
+        self.dones[:] = bytes(self.num_envs)
+        self._observe()
+        return self.obs
+
+    def _reset_world(self, i):
+        k = self.ants_per_env
+        cols = self.cols
+        if self.randomize:
+            hunter = self.rng.choice(self.safe_cells)
+            ants = [self.rng.choice(self.open_cells) for _ in range(k)]
+        else:
+            hunter = self.anteater_start[0] * cols + self.anteater_start[1]
+            ants = [r * cols + c for r, c in self.ant_starts]
+        self.hunter[i] = hunter
+        self.hunter_energy[i] = config.ANTEATER_MAX_ENERGY
+        self.hunter_recovering[i] = 0
+        self.hunter_alive[i] = 1
+        for j in range(k):
+            self.ant[i * k + j] = ants[j]
+            self.ant_energy[i * k + j] = config.ANT_MAX_ENERGY
+            self.ant_recovering[i * k + j] = 0
+            self.ant_alive[i * k + j] = ants[j] != hunter
+        self.alive_count[i] = sum(self.ant_alive[i * k:(i + 1) * k])
+        self.ticks[i] = 0
+        self.episodes += 1
+
+    # --- Stepping ---
+
+    def step(self, actions):
+        """
+        Advances every world one tick. actions: sequence of num_envs ints.
+        Returns (observations, rewards, dones); the arrays are reused by the
+        next step, copy them to keep them.
+        """
+        n, k = self.num_envs, self.ants_per_env
+        if len(actions) != n:
+            raise ValueError(f"Expected {n} actions, got {len(actions)}")
+        moves, move_costs, trap = self.moves, self.move_costs, self.trap
+        ant_adjacency, row, col = self.ant_adjacency, self.row, self.col
+        hunter, hunter_energy, hunter_recovering = self.hunter, self.hunter_energy, self.hunter_recovering
+        ant, ant_energy, ant_recovering, ant_alive = self.ant, self.ant_energy, self.ant_recovering, self.ant_alive
+        alive_count, ticks, rewards, dones = self.alive_count, self.ticks, self.rewards, self.dones
+        max_hunter, max_ant = config.ANTEATER_MAX_ENERGY, config.ANT_MAX_ENERGY
+        recharge_hunter, recharge_ant = config.RECHARGE_ANTEATER, config.RECHARGE_ANT
+        bonus, max_ticks = config.ENERGY_PER_ANT, self.max_ticks
+        far = len(row) + 1
+
+        for i in range(n):
+            if dones[i] and not self.auto_reset:
+                rewards[i] = 0.0 # Finished: frozen until reset()
+                continue
+            reward = 0.0
+            h = hunter[i]
+
+            # 1. Anteater (Entity.move_to / recharge)
+            if hunter_recovering[i]:
+                e = hunter_energy[i] + recharge_hunter
+                if e >= max_hunter:
+                    e = max_hunter
+                    hunter_recovering[i] = 0
+                hunter_energy[i] = e
+            else:
+                dest = moves[actions[i]][h] if actions[i] != STAY else -1
+                if dest >= 0:
+                    cost = move_costs[dest]
+                    if hunter_energy[i] >= cost:
+                        h = hunter[i] = dest
+                        hunter_energy[i] -= cost
+                    else:
+                        hunter_recovering[i] = 1
+
+            # 2. Traps
+            if trap[h]:
+                self.hunter_alive[i] = 0
+                reward -= 1.0
+            else:
+                # 3. Captures
+                base = i * k
+                for j in range(base, base + k):
+                    if ant_alive[j] and ant[j] == h:
+                        ant_alive[j] = 0
+                        alive_count[i] -= 1
+                        hunter_energy[i] = min(hunter_energy[i] + bonus, max_hunter)
+                        reward += 1.0
+
+                # 4. Ants flee (AntSwarm.flee_step rules)
+                if alive_count[i]:
+                    field = self._field(h)
+                    hr, hc = row[h], col[h]
+                    for j in range(base, base + k):
+                        if not ant_alive[j]:
+                            continue
+                        if ant_recovering[j]:
+                            e = ant_energy[j] + recharge_ant
+                            if e >= max_ant:
+                                e = max_ant
+                                ant_recovering[j] = 0
+                            ant_energy[j] = e
+                            continue
+                        best = -1
+                        best_d = best_m = -1
+                        for v in ant_adjacency[ant[j]]:
+                            d = field[v]
+                            if d < 0: d = far
+                            m = abs(row[v] - hr) + abs(col[v] - hc)
+                            if d > best_d or (d == best_d and m > best_m):
+                                best, best_d, best_m = v, d, m
+                        if best < 0:
+                            continue
+                        cost = move_costs[best]
+                        if ant_energy[j] >= cost:
+                            ant[j] = best
+                            ant_energy[j] -= cost
+                        else:
+                            ant_recovering[j] = 1
+
+            ticks[i] += 1
+            rewards[i] = reward
+            done = not self.hunter_alive[i] or alive_count[i] == 0 or ticks[i] >= max_ticks
+            dones[i] = done
+            if done and self.auto_reset:
+                self._reset_world(i)
+
+        self._observe()
+        return self.obs, rewards, dones
+
+    def _observe(self):
+        obs, size, k = self.obs, self.obs_size, self.ants_per_env
+        row, col = self.row, self.col
+        for i in range(self.num_envs):
+            o = i * size
+            h = self.hunter[i]
+            obs[o] = row[h]
+            obs[o + 1] = col[h]
+            obs[o + 2] = self.hunter_energy[i]
+            obs[o + 3] = self.hunter_recovering[i]
+            o += ANTEATER_FIELDS
+            for j in range(i * k, (i + 1) * k):
+                a = self.ant[j]
+                obs[o] = row[a]
+                obs[o + 1] = col[a]
+                obs[o + 2] = self.ant_energy[j]
+                obs[o + 3] = self.ant_recovering[j]
+                obs[o + 4] = self.ant_alive[j]
+                o += ANT_FIELDS
+
+    def observation(self, i):
+        """Observation slice of world i."""
+        return self.obs[i * self.obs_size:(i + 1) * self.obs_size]
@@ -6,22 +6,49 @@ Features:
 - Complex Demo Map (Spiral, Swamp, Wall).
 - Preview Path (Mode 1, 2, 3) -> Enter to Move.
 - Toggleable Minimax (Mode 4).
+- Full-clear tour of every ant (Mode 6).
+- Energy-aware path with the fewest real ticks (Mode 7).
+- MCTS hunt of every ant at once (Mode 8).
+- Expectimax hunt against the ants' real flee rule (Mode E).
+- Headless AI battles (--headless), without pygame.
+
+Startup: pygame and the renderer are imported by the windowed entry
+points only, and each algorithm module is imported when its mode is first
+selected. The import time and the time to the first frame are printed.
 """
 
-import pygame
-import sys
 import time
+_T_START = time.perf_counter()
+
+import sys
+import random
+import os
 
 from config import *
 from environment.grid import Grid
-from environment.entities import Anteater, Ant
-from environment.cell import TerrainType
-from algorithms.pathfinding import bfs, astar, dfs
-from algorithms.hill_climbing import hill_climbing_scent
-from algorithms.minimax import MinimaxAI
-from utils.visualization import init_screen, draw_grid, draw_entities, draw_path, draw_info
-
-def get_closest_ant(anteater, ants):
+from environment.entities import Anteater, Ant, step_energy_cost, path_travel_ticks
+from environment.spatial_index import SpatialIndex
+from algorithms.stats import SearchStats
+from algorithms.components import ComponentIndex
+from utils.recording import EpisodeRecorder, EpisodeReplay
+from utils.profiler import FrameProfiler
+from utils.precompute_cache import PrecomputeCache
+
+IMPORT_TIME = time.perf_counter() - _T_START # Seconds spent importing the modules above
+
+def get_closest_ant(anteater, ants, index=None, components=None):
+    """
+    Closest living ant (Manhattan). With a ComponentIndex, only ants the
+    Anteater can actually reach are candidates.
+    """
+    reachable = None
+    if components is not None:
+        reachable = lambda a: components.connected(anteater.position, a.position)
+        if index is None:
+            ants = [a for a in ants if reachable(a)]
+    if index is not None:
+        # Ring search in the SpatialIndex (same tie-breaking as min() below)
+        return index.closest(anteater.r, anteater.c, where=reachable)
     alive = [a for a in ants if a.is_alive]
     if not alive: return None
     return min(alive, key=lambda a: abs(a.r - anteater.r) + abs(a.c - anteater.c))
@@ -29,22 +56,98 @@ def get_closest_ant(anteater, ants):
 def calculate_path_cost(path):
     """Calculates total energy cost for a path (excluding start node)."""
     if not path or len(path) < 2: return 0
-    total_cost = 0
-    for cell in path[1:]: # Skip start cell
-        if cell.terrain_type == TerrainType.MUD:
-            total_cost += ENERGY_COST_MUD
-        else:
-            total_cost += ENERGY_COST_MOVE
-    return total_cost
+    return sum(step_energy_cost(cell) for cell in path[1:]) # Skip start cell
+
+def preview_tick(anteater, ants, ant_index, preview_path):
+    """
+    One tick of a preview walk (Modes 1-3, 6 and 7): the Anteater steps onto
+    preview_path[0] (popped once reached), then eats the ants on its cell.
+    A tick spent recovering keeps the pending cell: the walk resumes on it,
+    so every cell of the path is visited in order. Only an impassable step
+    is skipped. Returns (stepped, game_over, status_text), status_text None
+    if nothing happened.
+    """
+    game_over, status = False, None
+    next_cell = preview_path[0]
+    was_recovering = anteater.recovering # move_to() may end recovery and still return False
+    stepped = anteater.move_to(next_cell)
+    if stepped:
+        preview_path.pop(0)
+    elif not was_recovering and not anteater.recovering:
+        preview_path.pop(0) # Impassable step, skip it
+    # else: recharging, or exhausted by this step: it is retried after recovery
+
+    # Check Interactions
+    if anteater.position == next_cell.position and next_cell.is_lethal:
+        return stepped, True, "Died in Trap!"
+
+    # Eat Ants (bucket lookup instead of scanning every ant)
+    for ant in ant_index.alive_at(*anteater.position):
+        ant.is_alive = False
+        anteater.energy = min(anteater.energy + ENERGY_PER_ANT, ANTEATER_MAX_ENERGY)
+        status = f"Ant Eaten! Energy +{ENERGY_PER_ANT}"
+
+        # Check Win Condition
+        if not any(a.is_alive for a in ants):
+            game_over, status = True, "VICTORY! All Ants Eaten."
+    return stepped, game_over, status
+
+def ai_tick(grid, ai, anteater, ants, ant_index, flee_policy, profiler):
+    """
+    One tick of the AI battle (Modes 5, 8 and E): the Anteater recharges or
+    takes the AI's move, eats the ants on its cell, then the ants flee.
+    Returns (game_over, status_text), status_text None if nothing happened.
+    """
+    game_over, status = False, None
+    if anteater.recovering:
+        anteater.recharge()
+    else:
+        with profiler.scope("planner"):
+            best_move = ai.get_best_move(grid, anteater, ants, index=ant_index)
+        if best_move:
+            anteater.move_to(best_move)
+            if grid.get_cell(*anteater.position).is_lethal: # A failed move stays put
+                game_over, status = True, "Anteater died!"
+
+    # Check Capture
+    for ant in ant_index.alive_at(*anteater.position):
+        ant.is_alive = False
+        anteater.energy = min(anteater.energy + ENERGY_PER_ANT, ANTEATER_MAX_ENERGY)
+        status = "Ant Eaten!"
+
+    # Ants Flee
+    alive_ants = [a for a in ants if a.is_alive]
+    if not alive_ants:
+        game_over, status = True, "All Ants Eaten! Win!"
+
+    # One shared distance field from the Anteater per tick
+    with profiler.scope("ants"):
+        flee_policy.step(anteater, alive_ants)
+    return game_over, status
+
+def episode_path(record_path, episode):
+    """record.aerec, record-2.aerec, record-3.aerec... (one file per reset)."""
+    if episode <= 1: return record_path
+    base, ext = os.path.splitext(record_path)
+    return f"{base}-{episode}{ext}"
+
+def main(record_path=None, seed=None, profile_path=None):
+    t0 = time.perf_counter()
+    import pygame
+    from utils.visualization import init_screen, draw_grid, draw_entities, draw_path, draw_info, draw_compare
+    pygame_time = time.perf_counter() - t0
 
-def main():
     screen = init_screen()
     clock = pygame.time.Clock()
     
+    # Recordings rebuild the map from its seed, so always pick one when recording
+    if record_path and seed is None:
+        seed = random.randrange(2**31)
+
     # Initialize World
     grid = Grid(ROWS, COLS) # Default gen
     # Initial State
-    grid.generate_navigation_map()
+    grid.generate_navigation_map(seed=seed)
     anteater = Anteater(0, 0)
     # Tactics Map Ants:
     # 1. Behind Gate A (Left Vertical) - Easy to see Trap Block
@@ -57,6 +160,19 @@ def main():
         Ant(15, 15),  # Spiral
         Ant(17, 2)    # Bottom Left Corner (Trap at 17,5)
     ] 
+    # Bucket index over ant positions (kept in sync by Entity.move_to)
+    ant_index = SpatialIndex.from_entities(ants, grid.rows, grid.cols)
+    # Reachability labels (follow terrain changes, rebuilt for new maps)
+    components = ComponentIndex(grid)
+    landmarks = None # ALT tables for Mode 3, built on first use
+    compare = None         # CompareRun of Compare mode (created on first use)
+    pack = []              # Extra Anteaters of Mode 9 (the player's one leads)
+    pack_planner = None
+    tablebase_job = None   # TablebaseJob solving the Mode 5 duel in the background
+    # Per-map precomputations survive restarts (keyed by grid.fingerprint())
+    precompute_cache = PrecomputeCache() if PRECOMPUTE_CACHE_DIR else None
+    # Random maps never come back: only seeded ones are worth a tablebase file
+    tablebase_cache = precompute_cache if seed is not None else None
     
     running = True
     
@@ -70,21 +186,52 @@ def main():
     # Preview Stats for UI
     preview_steps_val = None
     preview_cost_val = None
+    search_stats = None # SearchStats of the last planner run
     
     minimax_active = False 
     
-    ai = MinimaxAI(depth=4)
+    # Created when their mode is first selected (modules imported then too)
+    minimax_ai = None
+    mcts_ai = None
+    expectimax_ai = None
+    ai = None # Engine driving the AI modes (5: Minimax, 8: MCTS, E: Expectimax)
+    flee_policy = None # FleePolicy of the AI modes, per map
     game_over = False
     anteater_steps = 0 
     
     last_move_time = 0
     move_delay = 100 
 
+    # Frame Profiler (P: toggle HUD, X: export trace)
+    profiler = FrameProfiler()
+
+    # Episode Recording (optional)
+    episode = 1
+    recorder = EpisodeRecorder(record_path, grid, anteater, ants) if record_path else None
+
+    # Redraw Scheduling: frames are drawn only when something changed
+    needs_redraw = True
+    first_frame = True
+
     while running:
+        # Idle (no movement, AI loop or comparison running): sleep until an event arrives
+        animating = (not game_over and (is_moving_preview or minimax_active or current_algorithm == "Pack Hunt (Sim)")) or (compare is not None and compare.running)
+        waited = []
+        if not needs_redraw and not animating:
+            event = pygame.event.wait(IDLE_WAIT_MS)
+            if event.type != pygame.NOEVENT:
+                waited.append(event)
+
+        profiler.begin_frame()
         current_time = pygame.time.get_ticks()
         
         # Event Handling
-        for event in pygame.event.get():
+        with profiler.scope("events"):
+            events = waited + pygame.event.get()
+        for event in events:
+            if event.type != pygame.MOUSEMOTION: # Keys, window exposed/resized/restored, ...
+                needs_redraw = True
+
             if event.type == pygame.QUIT:
                 running = False
             
@@ -96,9 +243,12 @@ def main():
                     is_moving_preview = False
                     preview_path = []
                     
-                    target = get_closest_ant(anteater, ants)
+                    target = get_closest_ant(anteater, ants, ant_index, components)
                     if target:
-                        preview_path, _ = bfs(grid, grid.get_cell(*anteater.position), grid.get_cell(*target.position))
+                        from algorithms.pathfinding import bfs
+                        search_stats = SearchStats("BFS")
+                        with profiler.scope("planner"):
+                            preview_path, _ = bfs(grid, grid.get_cell(*anteater.position), grid.get_cell(*target.position), stats=search_stats, components=components)
                         # Calculate Stats
                         preview_cost_val = calculate_path_cost(preview_path)
                         preview_steps_val = max(0, len(preview_path) - 1)
@@ -117,9 +267,12 @@ def main():
                     is_moving_preview = False
                     preview_path = []
                     
-                    target = get_closest_ant(anteater, ants)
+                    target = get_closest_ant(anteater, ants, ant_index, components)
                     if target:
-                        preview_path, _ = dfs(grid, grid.get_cell(*anteater.position), grid.get_cell(*target.position))
+                        from algorithms.pathfinding import dfs
+                        search_stats = SearchStats("DFS")
+                        with profiler.scope("planner"):
+                            preview_path, _ = dfs(grid, grid.get_cell(*anteater.position), grid.get_cell(*target.position), stats=search_stats, components=components)
                         # Calculate Stats
                         preview_cost_val = calculate_path_cost(preview_path)
                         preview_steps_val = max(0, len(preview_path) - 1)
@@ -138,9 +291,20 @@ def main():
                     is_moving_preview = False
                     preview_path = []
                     
-                    target = get_closest_ant(anteater, ants)
+                    target = get_closest_ant(anteater, ants, ant_index, components)
                     if target:
-                        preview_path, _ = astar(grid, grid.get_cell(*anteater.position), grid.get_cell(*target.position))
+                        from algorithms.pathfinding import astar
+                        from algorithms.landmarks import Landmarks
+                        search_stats = SearchStats("A*")
+                        target_cell = grid.get_cell(*target.position)
+                        with profiler.scope("planner"):
+                            # ALT heuristic: landmark tables once per map (or from the disk cache)
+                            heuristic = None
+                            if ALT_LANDMARKS > 0:
+                                if landmarks is None or not landmarks.matches(grid):
+                                    landmarks = Landmarks(grid, ALT_LANDMARKS, cache=precompute_cache)
+                                heuristic = landmarks.heuristic(target_cell)
+                            preview_path, _ = astar(grid, grid.get_cell(*anteater.position), target_cell, stats=search_stats, components=components, heuristic=heuristic)
                         # Calculate Stats
                         preview_cost_val = calculate_path_cost(preview_path)
                         preview_steps_val = max(0, len(preview_path) - 1)
@@ -163,7 +327,13 @@ def main():
                     if alive_ants:
                         # Update scent once for preview
                         grid.update_scent(ants) 
-                        preview_path, _ = hill_climbing_scent(grid, grid.get_cell(*anteater.position), ants)
+                        from algorithms.hill_climbing import hill_climbing_scent, hill_climbing_scent_multi
+                        search_stats = SearchStats("Scent HC")
+                        with profiler.scope("planner"):
+                            if HC_CHAINS > 1:
+                                preview_path, _, _ = hill_climbing_scent_multi(grid, grid.get_cell(*anteater.position), ants, chains=HC_CHAINS, workers=HC_WORKERS, stats=search_stats)
+                            else:
+                                preview_path, _ = hill_climbing_scent(grid, grid.get_cell(*anteater.position), ants, stats=search_stats)
                         
                         # Calculate Stats
                         preview_cost_val = calculate_path_cost(preview_path)
@@ -177,11 +347,70 @@ def main():
                         preview_steps_val = None
                         preview_cost_val = None
 
+                elif event.key == pygame.K_6:
+                    # === MODE 6: FULL-CLEAR TOUR ===
+                    # Plans the visit order for ALL ants in one pass
+                    current_algorithm = "Tour (Preview)"
+                    minimax_active = False
+                    is_moving_preview = False
+                    preview_path = []
+
+                    if any(a.is_alive for a in ants):
+                        from algorithms.tour import TourPlanner
+                        with profiler.scope("planner"):
+                            tour = TourPlanner(grid).plan(anteater, ants)
+                        preview_path = tour.path if tour.order else []
+                        search_stats = None
+
+                        preview_cost_val = calculate_path_cost(preview_path)
+                        preview_steps_val = tour.steps
+                        status_text = f"TOUR: {len(tour.order)} Ants | {tour.ticks} Ticks"
+                        if tour.unreachable:
+                            status_text += f" | {len(tour.unreachable)} Unreachable"
+                    else:
+                        status_text = "TOUR: No Target"
+                        preview_steps_val = None
+                        preview_cost_val = None
+
+                elif event.key == pygame.K_7:
+                    # === MODE 7: ENERGY-AWARE A* ===
+                    # Fewest real ticks, recovery stalls included
+                    current_algorithm = "Energy A* (Preview)"
+                    minimax_active = False
+                    is_moving_preview = False
+                    preview_path = []
+
+                    target = get_closest_ant(anteater, ants, ant_index, components)
+                    if target:
+                        from algorithms.energy_search import energy_astar_for
+                        search_stats = SearchStats("Energy A*")
+                        with profiler.scope("planner"):
+                            preview_path, _ = energy_astar_for(grid, anteater, grid.get_cell(*target.position), stats=search_stats, components=components)
+                        # Calculate Stats
+                        preview_cost_val = calculate_path_cost(preview_path)
+                        preview_steps_val = max(0, len(preview_path) - 1)
+
+                        cost = preview_cost_val
+                        steps = preview_steps_val
+                        status_text = f"E-A*: {steps} Steps | Cost {cost}E"
+                    else:
+                        status_text = "E-A*: No Target"
+                        preview_steps_val = None
+                        preview_cost_val = None
+
                 elif event.key == pygame.K_5:
                     # === MODE 5: MINIMAX DUEL ===
                     current_algorithm = "Minimax (Sim)"
                     status_text = "AI BATTLE: Duel Mode"
                     minimax_active = True
+                    from algorithms.minimax import MinimaxAI
+                    from algorithms.tablebase import TablebaseJob
+                    from algorithms.flee import FleePolicy
+                    if minimax_ai is None:
+                        minimax_ai = MinimaxAI(depth=6) # Move ordering keeps depth 6 affordable
+                    if flee_policy is None:
+                        flee_policy = FleePolicy(grid)
+                    ai = minimax_ai
                     
                     # Disable Preview Mode flags
                     preview_path = []
@@ -191,12 +420,22 @@ def main():
                     
                     # Scenario Setup:
                     # Select Closest Target
-                    target_ant = get_closest_ant(anteater, ants)
+                    target_ant = get_closest_ant(anteater, ants, ant_index, components)
                     
                     if target_ant:
                         # Filter: Only keep the target
                         ants = [target_ant]
+                        ant_index = SpatialIndex.from_entities(ants, grid.rows, grid.cols)
                         print(f"[DUEL] Focused on Ant at {target_ant.position}")
+
+                        # Solve the duel once per map (worker process): the search plays until it is ready
+                        if DUEL_TABLEBASE and (minimax_ai.tablebase is None or not minimax_ai.tablebase.matches(grid)):
+                            minimax_ai.tablebase = None
+                            if tablebase_job is None or not tablebase_job.matches(grid):
+                                if tablebase_job is not None: tablebase_job.close()
+                                tablebase_job = TablebaseJob(grid, cache=tablebase_cache)
+                                if not tablebase_job.done:
+                                    print("[DUEL] Solving the tablebase in the background...")
                     else:
                         status_text = "No Ants to Duel!"
                         minimax_active = False
@@ -204,10 +443,105 @@ def main():
                     # Note: We do NOT reset the Anteater position. 
                     # The duel starts from WHEREVER the player currently is.
 
+                elif event.key == pygame.K_8:
+                    # === MODE 8: MCTS HUNT ===
+                    # Same AI loop as Mode 5, but against ALL living ants
+                    current_algorithm = "MCTS (Sim)"
+                    status_text = "AI BATTLE: MCTS Hunt"
+                    minimax_active = True
+                    from algorithms.mcts import MCTSAI
+                    from algorithms.flee import FleePolicy
+                    if mcts_ai is None:
+                        mcts_ai = MCTSAI()
+                    if flee_policy is None:
+                        flee_policy = FleePolicy(grid)
+                    ai = mcts_ai
+
+                    # Disable Preview Mode flags
+                    preview_path = []
+                    is_moving_preview = False
+                    preview_steps_val = None
+                    preview_cost_val = None
+
+                    if not any(a.is_alive for a in ants):
+                        status_text = "No Ants to Hunt!"
+                        minimax_active = False
+
+                elif event.key == pygame.K_e:
+                    # === EXPECTIMAX HUNT ===
+                    # Same AI loop as Mode 5, planning against the ants' flee rule
+                    current_algorithm = "Expectimax (Sim)"
+                    status_text = "AI BATTLE: Expectimax Hunt"
+                    minimax_active = True
+                    from algorithms.expectimax import ExpectimaxAI
+                    from algorithms.flee import FleePolicy
+                    if expectimax_ai is None:
+                        expectimax_ai = ExpectimaxAI()
+                    if flee_policy is None:
+                        flee_policy = FleePolicy(grid)
+                    ai = expectimax_ai
+
+                    # Disable Preview Mode flags
+                    preview_path = []
+                    is_moving_preview = False
+                    preview_steps_val = None
+                    preview_cost_val = None
+
+                    if not any(a.is_alive for a in ants):
+                        status_text = "No Ants to Hunt!"
+                        minimax_active = False
+
+                elif event.key == pygame.K_9:
+                    # === MODE 9: PACK HUNT ===
+                    # ANTEATER_COUNT Anteaters: target assignment + collision-free joint plans
+                    current_algorithm = "Pack Hunt (Sim)"
+                    minimax_active = False
+                    is_moving_preview = False
+                    preview_path = []
+                    preview_steps_val = None
+                    preview_cost_val = None
+
+                    if any(a.is_alive for a in ants):
+                        from algorithms.multi_agent import MultiAnteaterPlanner, spawn_points
+                        from algorithms.flee import FleePolicy
+                        if flee_policy is None:
+                            flee_policy = FleePolicy(grid)
+                        if pack_planner is None or not pack_planner.matches(grid):
+                            pack_planner = MultiAnteaterPlanner(grid)
+                        # The player's Anteater leads, the others spawn spread over the map
+                        pack = [Anteater(r, c) for r, c in spawn_points(grid, ANTEATER_COUNT, anteater.position)[1:]]
+                        status_text = f"PACK HUNT: {len(pack) + 1} Anteaters"
+                    else:
+                        status_text = "No Ants to Hunt!"
+                        current_algorithm = "None"
+
+                elif event.key == pygame.K_c:
+                    # === COMPARE MODE ===
+                    # BFS, DFS, A* and Scent HC at once on worker processes,
+                    # one map snapshot; results appear as they finish
+                    current_algorithm = "Compare (Preview)"
+                    minimax_active = False
+                    is_moving_preview = False
+                    preview_path = []
+                    preview_steps_val = None
+                    preview_cost_val = None
+                    search_stats = None
+
+                    target = get_closest_ant(anteater, ants, ant_index, components)
+                    if compare is None:
+                        from algorithms.compare import CompareRun
+                        compare = CompareRun() # Worker pool started on first use
+                    if target:
+                        compare.start(grid, anteater, ants, target)
+                        status_text = "COMPARE: Running..."
+                    else:
+                        compare.cancel()
+                        status_text = "COMPARE: No Target"
+
                 elif event.key == pygame.K_RETURN:
                     # === EXECUTE MOVEMENT (Modes 1-3) ===
                     # If a preview path exists (from BFS/A*/HC), move along it.
-                    if current_algorithm in ["BFS (Preview)", "A* (Preview)", "Scent HC (Preview)", "DFS (Preview)"]:
+                    if current_algorithm in ["BFS (Preview)", "A* (Preview)", "Scent HC (Preview)", "DFS (Preview)", "Tour (Preview)", "Energy A* (Preview)"]:
                         if preview_path:
                             status_text = "Executing..."
                             is_moving_preview = True
@@ -224,14 +558,33 @@ def main():
                             preview_steps_val = None
                             preview_cost_val = None
 
+                elif event.key == pygame.K_p:
+                    # === PROFILER HUD ===
+                    profiler.show_hud = not profiler.show_hud
+
+                elif event.key == pygame.K_x:
+                    # === EXPORT PROFILER TRACE ===
+                    export_path = profile_path or "profile_trace.json"
+                    profiler.export(export_path)
+                    status_text = f"Trace -> {export_path}"
+
                 elif event.key == pygame.K_r:
                     # === RESET GAME ===
                     # Reloads the Navigation Map.
                     # Resets Start Positions.
-                    grid.generate_navigation_map()
+                    if recorder: seed = random.randrange(2**31)
+                    grid.generate_navigation_map(seed=seed)
+                    flee_policy = None # New map, new tables (built on the next AI mode)
                     anteater = Anteater(0, 0)
                     # Default Tactical Positions
                     ants = [Ant(4, 9), Ant(13, 11), Ant(15, 15), Ant(17, 2)]
+                    ant_index = SpatialIndex.from_entities(ants, grid.rows, grid.cols)
+
+                    # New Recording per Episode
+                    if recorder:
+                        recorder.close()
+                        episode += 1
+                        recorder = EpisodeRecorder(episode_path(record_path, episode), grid, anteater, ants)
                     
                     # Reset Game State
                     anteater_steps = 0
@@ -240,106 +593,319 @@ def main():
                     is_moving_preview = False
                     preview_steps_val = None
                     preview_cost_val = None
+                    search_stats = None
                     minimax_active = False
                     current_algorithm = "None"
                     status_text = "Reset! Select Mode."
+                    if compare is not None: compare.cancel()
+                    pack = []
 
         # --- UPDATE LOGIC ---
+
+        # 0. Compare Mode: pick up planners that finished (non-blocking)
+        if compare is not None and compare.running and compare.poll():
+            needs_redraw = True
+            if not compare.running and current_algorithm == "Compare (Preview)":
+                status_text = f"COMPARE: {len(compare.results)} Done in {compare.wall_time * 1000.0:.0f}ms"
         
+        # 0b. Duel tablebase: attach it once the worker is done (non-blocking)
+        if tablebase_job is not None and (tablebase_job.poll() is not None or tablebase_job.done):
+            tb = tablebase_job.result
+            if tb is not None and tablebase_job.matches(grid):
+                minimax_ai.tablebase = tb
+                source = "loaded" if tb.from_cache else "solved"
+                print(f"[DUEL] Tablebase: {tb.win_count}/{tb.state_count} won states, {source} in {tb.solve_time:.2f}s")
+            tablebase_job = None
+
         # 1. Preview Movement Execution (Modes 1, 2, 3)
         if is_moving_preview and not game_over:
             if current_time - last_move_time > move_delay:
                 last_move_time = current_time
+                needs_redraw = True
                 if preview_path:
-                    next_cell = preview_path.pop(0)
-                    if anteater.move_to(next_cell):
-                        anteater_steps += 1
-                    
-                    # Check Interactions
-                    if next_cell.is_lethal:
+                    stepped, tick_over, tick_status = preview_tick(anteater, ants, ant_index, preview_path)
+                    if stepped: anteater_steps += 1
+                    if tick_status: status_text = tick_status
+                    if tick_over:
                         game_over = True
-                        status_text = "Died in Trap!"
                         is_moving_preview = False
-                    
-                    # Eat Ants
-                    for ant in ants:
-                        if ant.is_alive and ant.position == anteater.position:
-                            ant.is_alive = False
-                            anteater.energy = min(anteater.energy + 30, ANTEATER_MAX_ENERGY)
-                            status_text = "Ant Eaten! Energy +30"
-                            
-                            # Check Win Condition
-                            if not any(a.is_alive for a in ants):
-                                game_over = True
-                                status_text = "VICTORY! All Ants Eaten."
+
+                    if recorder: recorder.record_tick(anteater, ants)
                 else:
                     # Path Finished
                     is_moving_preview = False
                     if not game_over:
                         status_text = "Movement Complete."
 
-        # 2. Minimax Logic (Mode 4)
-        if minimax_active and not game_over:
+        # 1b. Pack Hunt (Mode 9): one joint plan per tick, every hunter takes its first step
+        pack_hunting = current_algorithm == "Pack Hunt (Sim)"
+        if pack_hunting and not game_over:
             if current_time - last_move_time > GAME_SPEED:
                 last_move_time = current_time
-                
-                # Anteater
-                if anteater.recovering:
-                    anteater.recharge()
-                else:
-                    best_move = ai.get_best_move(grid, anteater, ants)
-                    if best_move:
-                        anteater.move_to(best_move)
-                        if best_move.is_lethal:
-                            game_over = True
-                            status_text = "Anteater died!"
-
-                # Check Capture
-                for ant in ants:
-                    if ant.is_alive and ant.position == anteater.position:
+                needs_redraw = True
+                hunters = [anteater] + pack
+                search_stats = SearchStats("Pack")
+                with profiler.scope("planner"):
+                    plans = pack_planner.plan(hunters, ants, stats=search_stats)
+
+                for hunter, plan in zip(hunters, plans):
+                    if hunter.recovering:
+                        hunter.recharge()
+                    elif len(plan) > 1: # The planner only hands out affordable first steps
+                        # plan[1] on its own cell is a planned wait: stay put, no step charged
+                        if plan[1].position != hunter.position and hunter.move_to(plan[1]) and hunter is anteater:
+                            anteater_steps += 1
+                    elif pack_planner.exhausted(hunter):
+                        hunter.start_recovery() # What its failed move_to would do
+                    if grid.get_cell(*hunter.position).is_lethal:
+                        game_over = True
+                        status_text = "An Anteater died!"
+
+                    # Check Capture (any hunter)
+                    for ant in ant_index.alive_at(*hunter.position):
                         ant.is_alive = False
+                        hunter.energy = min(hunter.energy + ENERGY_PER_ANT, hunter.max_energy)
                         status_text = "Ant Eaten!"
 
-                # Ants Flee
                 alive_ants = [a for a in ants if a.is_alive]
                 if not alive_ants:
-                     game_over = True
-                     status_text = "All Ants Eaten! Win!"
+                    game_over = True
+                    status_text = "All Ants Eaten! Win!"
+
+                # Ants flee from the nearest hunter (multi-source distance field)
+                with profiler.scope("ants"):
+                    flee_policy.step_pack(hunters, alive_ants)
+
+                if recorder: recorder.record_tick(anteater, ants)
+
+        # 2. Minimax Logic (Mode 4)
+        if minimax_active and not game_over:
+            if current_time - last_move_time > GAME_SPEED:
+                last_move_time = current_time
+                needs_redraw = True
                 
-                for ant in alive_ants:
-                    if ant.recovering:
-                        ant.recharge()
-                    else:
-                        neighbors = grid.get_neighbors(grid.get_cell(*ant.position))
-                        if neighbors:
-                            neighbors.sort(key=lambda n: abs(n.r - anteater.r) + abs(n.c - anteater.c), reverse=True)
-                            for n in neighbors:
-                                if n.terrain_type != TerrainType.WALL:
-                                    if ant.move_to(n): break
-
-        # Drawing
-        screen.fill(COLOR_WHITE) # Dark Retro BG
-        
-        show_scent = (current_algorithm == "Scent HC (Preview)")
-        draw_grid(screen, grid, show_scent=show_scent)
-        
-        if preview_path and not minimax_active:
-             draw_path(screen, preview_path)
+                tick_over, tick_status = ai_tick(grid, ai, anteater, ants, ant_index, flee_policy, profiler)
+                search_stats = ai.stats
+                game_over = game_over or tick_over
+                if tick_status: status_text = tick_status
 
-        draw_entities(screen, anteater, ants)
-        
-        # Pass steps to info
-        draw_info(screen, anteater, ants, current_algorithm, status_text, steps=anteater_steps, preview_steps=preview_steps_val, preview_cost=preview_cost_val)
-        
-        pygame.display.flip()
+                if recorder: recorder.record_tick(anteater, ants)
+
+        # Drawing (only when the state, preview or HUD changed since the last frame)
+        if needs_redraw:
+            needs_redraw = False
+            screen.fill(COLOR_WHITE) # Dark Retro BG
+            
+            show_scent = (current_algorithm == "Scent HC (Preview)")
+            with profiler.scope("draw_grid"):
+                draw_grid(screen, grid, show_scent=show_scent)
+            
+            if preview_path and not minimax_active:
+                 draw_path(screen, preview_path)
+
+            comparing = current_algorithm == "Compare (Preview)"
+            if comparing:
+                draw_compare(screen, compare)
+
+            with profiler.scope("draw_entities"):
+                draw_entities(screen, anteater, ants, pack=pack if pack_hunting else ())
+            
+            # Pass steps to info
+            with profiler.scope("draw_info"):
+                # Real ticks of the pending preview (recovery stalls included)
+                preview_ticks_val = path_travel_ticks(preview_path, anteater)[0] if preview_path and not is_moving_preview else None
+                draw_info(screen, anteater, ants, current_algorithm, status_text, steps=anteater_steps, preview_steps=preview_steps_val, preview_cost=preview_cost_val, profiler=profiler, search_stats=search_stats, preview_ticks=preview_ticks_val, compare=compare if comparing else None)
+            
+            with profiler.scope("flip"):
+                pygame.display.flip()
+            if first_frame:
+                first_frame = False
+                print(f"[STARTUP] Imports {IMPORT_TIME * 1000.0:.0f}ms | pygame + renderer {pygame_time * 1000.0:.0f}ms | "
+                      f"First frame {(time.perf_counter() - _T_START) * 1000.0:.0f}ms")
+            # The HUD shows the frame times, so it keeps redrawing while open
+            needs_redraw = profiler.show_hud and animating
+        profiler.end_frame() # Excludes the frame-cap sleep below
         clock.tick(30)
 
+    if compare is not None: compare.close()
+    if tablebase_job is not None: tablebase_job.close()
+    if recorder: recorder.close()
+    if profile_path: profiler.export(profile_path)
     pygame.quit()
     sys.exit()
 
+def replay_viewer(path):
+    """
+    Plays back an episode recording in the pygame window.
+    SPACE: Play/Pause | LEFT/RIGHT: Step | UP/DOWN: Jump one keyframe | HOME/END
+    """
+    import pygame
+    from utils.visualization import init_screen, draw_grid, draw_entities, draw_info
+
+    screen = init_screen()
+    clock = pygame.time.Clock()
+
+    replay = EpisodeReplay(path)
+    grid = replay.build_grid()
+    tick = 0
+    playing = True
+    last_step_time = 0
+    replay_delay = 100 # Same pace as preview execution
+    running = True
+    shown = None # (tick, playing) on screen, redrawn only when it changes
+
+    while running:
+        # Paused: sleep until an event arrives
+        events = [] if playing else [pygame.event.wait(IDLE_WAIT_MS)]
+        events += pygame.event.get()
+        current_time = pygame.time.get_ticks()
+
+        for event in events:
+            if event.type not in (pygame.NOEVENT, pygame.MOUSEMOTION):
+                shown = None # Keys, window exposed/restored, ...
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_RIGHT:
+                    tick += 1
+                elif event.key == pygame.K_LEFT:
+                    tick -= 1
+                elif event.key == pygame.K_UP:
+                    tick += replay.keyframe_interval
+                elif event.key == pygame.K_DOWN:
+                    tick -= replay.keyframe_interval
+                elif event.key == pygame.K_HOME:
+                    tick = 0
+                elif event.key == pygame.K_END:
+                    tick = replay.tick_count
+                tick = max(0, min(tick, replay.tick_count))
+
+        if playing and current_time - last_step_time > replay_delay:
+            last_step_time = current_time
+            if tick < replay.tick_count:
+                tick += 1
+            else:
+                playing = False
+
+        if shown != (tick, playing):
+            shown = (tick, playing)
+            anteater, ants = replay.build_entities(tick)
+
+            screen.fill(COLOR_WHITE)
+            draw_grid(screen, grid)
+            draw_entities(screen, anteater, ants)
+            status = "PLAYING" if playing else "PAUSED"
+            draw_info(screen, anteater, ants, "Replay", f"{status} {tick}/{replay.tick_count}", steps=tick)
+
+            pygame.display.flip()
+        clock.tick(30)
+
+    pygame.quit()
+    sys.exit()
+
+def headless(mode="minimax", episodes=1, max_ticks=500, seed=None, record_path=None):
+    """
+    AI battles with no window and no pygame import, for batch runs: Mode 5
+    (minimax duel against the closest ant), Mode 8 (MCTS hunt of every
+    ant) or Mode E (expectimax hunt), one summary line per episode.
+    Mode "tour" walks the Mode 6 full-clear tour through preview_tick and
+    checks the walk against the plan: every cell reached in order, in the
+    planned number of ticks.
+    Episode k uses map seed + k - 1.
+    """
+    t0 = time.perf_counter()
+    from algorithms.flee import FleePolicy
+    if mode == "tour":
+        from algorithms.tour import TourPlanner
+        ai = None
+    elif mode == "mcts":
+        from algorithms.mcts import MCTSAI
+        ai = MCTSAI()
+    elif mode == "expectimax":
+        from algorithms.expectimax import ExpectimaxAI
+        ai = ExpectimaxAI()
+    else:
+        from algorithms.minimax import MinimaxAI
+        from algorithms.tablebase import DuelTablebase
+        ai = MinimaxAI(depth=6)
+    precompute_cache = PrecomputeCache() if PRECOMPUTE_CACHE_DIR else None
+    profiler = FrameProfiler(enabled=False)
+    print(f"[STARTUP] Imports {IMPORT_TIME * 1000.0:.0f}ms | {mode} engine {(time.perf_counter() - t0) * 1000.0:.0f}ms")
+
+    first_tick = True
+    for episode in range(1, episodes + 1):
+        map_seed = random.randrange(2**31) if seed is None else seed + episode - 1
+        grid = Grid(ROWS, COLS)
+        grid.generate_navigation_map(seed=map_seed)
+        anteater = Anteater(0, 0)
+        ants = [Ant(4, 9), Ant(13, 11), Ant(15, 15), Ant(17, 2)]
+        if mode == "minimax":
+            # Mode 5 duels the closest reachable ant
+            index = SpatialIndex.from_entities(ants, grid.rows, grid.cols)
+            target = get_closest_ant(anteater, ants, index, ComponentIndex(grid))
+            ants = [target] if target else []
+            if DUEL_TABLEBASE and ants and (ai.tablebase is None or not ai.tablebase.matches(grid)):
+                # Solved up front (no window to keep responsive), kept on disk for seeded maps only
+                ai.tablebase = DuelTablebase(grid, cache=precompute_cache if seed is not None else None)
+        ant_index = SpatialIndex.from_entities(ants, grid.rows, grid.cols)
+        flee_policy = FleePolicy(grid)
+        recorder = EpisodeRecorder(episode_path(record_path, episode), grid, anteater, ants) if record_path else None
+
+        t_episode = time.perf_counter()
+        ticks, game_over, status = 0, not ants, "No Ants"
+        if mode == "tour":
+            tour = TourPlanner(grid).plan(anteater, ants)
+            planned = tour.path[1:] # path[0] is the Anteater's cell
+            preview_path = list(planned)
+            walked = []
+        while not game_over and ticks < max_ticks:
+            if mode == "tour":
+                if not preview_path:
+                    break
+                stepped, game_over, tick_status = preview_tick(anteater, ants, ant_index, preview_path)
+                if stepped: walked.append(anteater.position)
+            else:
+                game_over, tick_status = ai_tick(grid, ai, anteater, ants, ant_index, flee_policy, profiler)
+            ticks += 1
+            if tick_status: status = tick_status
+            if recorder: recorder.record_tick(anteater, ants)
+            if first_tick:
+                first_tick = False
+                print(f"[STARTUP] First tick {(time.perf_counter() - _T_START) * 1000.0:.0f}ms")
+        if not game_over:
+            status = "Tick limit"
+        if recorder: recorder.close()
+        if mode == "tour":
+            in_order = walked == [cell.position for cell in planned]
+            print(f"[CHECK] Tour walk: {len(walked)}/{len(planned)} Cells in order: {'OK' if in_order else 'FAILED'} | "
+                  f"{ticks}/{tour.ticks} Planned ticks: {'OK' if ticks == tour.ticks else 'FAILED'}")
+
+        elapsed = time.perf_counter() - t_episode
+        eaten = sum(1 for a in ants if not a.is_alive)
+        print(f"[HEADLESS] Episode {episode} (seed {map_seed}): {status} | {ticks} Ticks | "
+              f"{eaten}/{len(ants)} Eaten | {elapsed:.2f}s ({elapsed / max(1, ticks) * 1000.0:.1f}ms/tick)")
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Ant Eater AI Simulator")
+    parser.add_argument("--record", metavar="PATH", help="Record every episode to PATH (binary .aerec)")
+    parser.add_argument("--replay", metavar="PATH", help="Play back a recorded episode")
+    parser.add_argument("--seed", type=int, help="Seed for the random mud scatter")
+    parser.add_argument("--profile-out", metavar="PATH", help="Export the frame-timing trace on exit (.csv or .json)")
+    parser.add_argument("--headless", choices=["minimax", "mcts", "expectimax", "tour"], help="Run AI battles (or the tour walk check) without a window (no pygame)")
+    parser.add_argument("--episodes", type=int, default=1, help="Headless episodes to run")
+    parser.add_argument("--max-ticks", type=int, default=500, help="Headless tick limit per episode")
+    args = parser.parse_args()
+
     try:
-        main()
+        if args.headless:
+            headless(args.headless, args.episodes, args.max_ticks, args.seed, record_path=args.record)
+        elif args.replay:
+            replay_viewer(args.replay)
+        else:
+            main(record_path=args.record, seed=args.seed, profile_path=args.profile_out)
     except Exception as e:
         import traceback
         import datetime
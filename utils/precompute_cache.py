@@ -0,0 +1,173 @@
+"""
+utils/precompute_cache.py
+
+On-disk cache of per-map precomputations (landmark tables, tablebases, ...).
+
+An artifact is a list of typed arrays identified by:
+    kind         what it is ("landmarks", "tablebase", ...)
+    fingerprint  grid.fingerprint(), the content hash of the map
+    key          the parameters it was built with (any repr-able value)
+Files are written to a temporary name and renamed, so concurrent worker
+processes never read half an artifact. Loading memory-maps the file and
+hands back read-only memoryviews cast to each array's type: nothing is
+parsed or copied, pages are read on first touch and shared between
+processes mapping the same file.
+The cache directory is kept under max_bytes by deleting the least
+recently used artifacts (loads refresh a file's modification time). A kind
+can also get its own, smaller limit (kind_max_bytes), so many large
+artifacts of one kind (a tablebase per seeded map) only evict each other
+and never the small ones of the other kinds.
+
+Usage:
+    cache = PrecomputeCache()
+    tables = cache.get("landmarks", grid.fingerprint(), build, key=(8, True))
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+import sys
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+import config
+
+MAGIC = b"AEPC"
+VERSION = 1 # File layout version (bump to invalidate every artifact)
+_HEADER = struct.Struct("<4sBxxxI")  # magic, version, array count
+_ENTRY = struct.Struct("<cxxxxxxxQ") # typecode, item count
+_ALIGN = 8
+
+
+def _aligned(n):
+    return -(-n // _ALIGN) * _ALIGN
+
+
+class PrecomputeCache:
+    def __init__(self, directory=None, max_bytes=None, kind_max_bytes=None):
+        """Defaults: config.PRECOMPUTE_CACHE_DIR / PRECOMPUTE_CACHE_MAX_BYTES / PRECOMPUTE_CACHE_KIND_MAX_BYTES."""
+        self.directory = config.PRECOMPUTE_CACHE_DIR if directory is None else directory
+        self.max_bytes = config.PRECOMPUTE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.kind_max_bytes = dict(config.PRECOMPUTE_CACHE_KIND_MAX_BYTES if kind_max_bytes is None else kind_max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, kind, fingerprint, key=""):
+        params = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+        return os.path.join(self.directory, f"{kind}-{fingerprint}-{params}.bin")
+
+    # --- Load / store ---
+
+    def load(self, kind, fingerprint, key=""):
+        """Read-only memoryviews (one per stored array), or None on a miss."""
+        path = self.path(kind, fingerprint, key)
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < _HEADER.size:
+                    raise ValueError("truncated")
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            views = self._parse(mapped, size)
+            os.utime(path) # Recently used: evicted last
+        except (OSError, ValueError, struct.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return views
+
+    def _parse(self, mapped, size):
+        magic, version, count = _HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a cache file of this version")
+        offset = _HEADER.size
+        entries = []
+        for _ in range(count):
+            typecode, length = _ENTRY.unpack_from(mapped, offset)
+            entries.append((typecode.decode(), length))
+            offset += _ENTRY.size
+        offset = _aligned(offset)
+        buffer = memoryview(mapped)
+        views = []
+        for typecode, length in entries:
+            nbytes = length * array(typecode).itemsize
+            if offset + nbytes > size:
+                raise ValueError("truncated")
+            views.append(buffer[offset:offset + nbytes].cast(typecode))
+            offset = _aligned(offset + nbytes)
+        return views
+
+    def store(self, kind, fingerprint, arrays, key=""):
+        """Writes the arrays (array.array, or memoryviews of them); returns the file path."""
+        path = self.path(kind, fingerprint, key)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(arrays)))
+            for data in arrays:
+                f.write(_ENTRY.pack(data.typecode.encode() if isinstance(data, array) else data.format.encode(),
+                                    len(data)))
+            f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+            for data in arrays:
+                f.write(data.tobytes() if isinstance(data, array) else bytes(data))
+                f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+        try:
+            os.replace(tmp, path)
+        except OSError: # Target mapped by another process (Windows): keep theirs
+            os.remove(tmp)
+        self.evict(keep=path)
+        return path
+
+    def get(self, kind, fingerprint, build, key=""):
+        """Cached arrays, or build() -> list of arrays, stored for next time."""
+        views = self.load(kind, fingerprint, key)
+        if views is not None:
+            return views
+        arrays = build()
+        self.store(kind, fingerprint, arrays, key)
+        return arrays
+
+    # --- Size limit ---
+
+    def evict(self, keep=None):
+        """
+        Deletes least recently used artifacts until every kind with a limit
+        fits kind_max_bytes and the directory fits max_bytes.
+        """
+        files = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".bin") and entry.is_file():
+                    st = entry.stat()
+                    files.append((st.st_mtime, st.st_size, entry.path, entry.name.rsplit("-", 2)[0]))
+        except OSError:
+            return
+        files.sort()
+        removed = set()
+        for kind, limit in self.kind_max_bytes.items():
+            self._evict([f for f in files if f[3] == kind], limit, keep, removed)
+        if self.max_bytes is not None:
+            self._evict([f for f in files if f[2] not in removed], self.max_bytes, keep, removed)
+
+    def _evict(self, files, limit, keep, removed):
+        """Removes the oldest of `files` (sorted oldest first) until they fit limit."""
+        total = sum(size for _, size, _, _ in files)
+        for _, size, path, _ in files:
+            if total <= limit:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue # Mapped or already removed by another process
+            removed.add(path)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        max_bytes, self.max_bytes = self.max_bytes, 0
+        self.evict()
+        self.max_bytes = max_bytes
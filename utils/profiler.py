@@ -0,0 +1,168 @@
+"""
+utils/profiler.py
+
+Lightweight per-frame timing instrumentation.
+
+Usage:
+    profiler = FrameProfiler()
+    profiler.begin_frame()
+    with profiler.scope("draw_grid"):
+        draw_grid(...)
+    profiler.end_frame()
+
+Each named scope keeps a rolling window of its per-frame time, from which
+percentiles are computed on demand (only when the HUD or a report asks).
+A bounded trace of every frame is kept for CSV/JSON export, and frames
+slower than `stall_ms` are counted as stalls.
+When disabled, scope() hands back a shared no-op context manager.
+"""
+
+import csv
+import json
+import math
+from collections import deque
+from time import perf_counter
+
+FRAME = "frame" # Pseudo-scope holding the whole frame time
+
+
+class _Scope:
+    """Reusable timing context for one scope name (not re-entrant)."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler._add(self.name, perf_counter() - self.start)
+        return False
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class FrameProfiler:
+    def __init__(self, window=120, trace_limit=10000, stall_ms=50.0, enabled=True):
+        self.window = window
+        self.stall_ms = stall_ms
+        self.enabled = enabled
+        self.show_hud = False
+
+        self.frame_index = 0
+        self.stalls = 0
+        self._scopes = {}     # name -> _Scope (cached, avoids allocation per use)
+        self._windows = {}    # name -> deque of ms
+        self._order = []      # scope names in first-seen order (HUD/report order)
+        self._current = {}    # name -> seconds accumulated in the current frame
+        self._frame_start = None
+        self.trace = deque(maxlen=trace_limit) # (frame_index, {name: ms})
+
+    # --- Recording ---
+
+    def scope(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = _Scope(self, name)
+        return scope
+
+    def _add(self, name, seconds):
+        self._current[name] = self._current.get(name, 0.0) + seconds
+
+    def begin_frame(self):
+        if self.enabled:
+            self._current = {}
+            self._frame_start = perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        frame_ms = (perf_counter() - self._frame_start) * 1000.0
+        sample = {name: seconds * 1000.0 for name, seconds in self._current.items()}
+        sample[FRAME] = frame_ms
+
+        for name, ms in sample.items():
+            values = self._windows.get(name)
+            if values is None:
+                values = self._windows[name] = deque(maxlen=self.window)
+                self._order.append(name)
+            values.append(ms)
+
+        if frame_ms > self.stall_ms:
+            self.stalls += 1
+        self.trace.append((self.frame_index, sample))
+        self.frame_index += 1
+        self._frame_start = None
+
+    # --- Reporting ---
+
+    def percentiles(self, name, points=(50, 95, 99)):
+        values = sorted(self._windows.get(name, ()))
+        result = {f"p{p}": percentile(values, p) for p in points}
+        result["max"] = values[-1] if values else 0.0
+        return result
+
+    def report(self):
+        """List of (scope, {p50, p95, p99, max}) with the frame total last."""
+        names = [n for n in self._order if n != FRAME]
+        if FRAME in self._windows:
+            names.append(FRAME)
+        return [(name, self.percentiles(name)) for name in names]
+
+    def summary(self):
+        return {
+            "frames": self.frame_index,
+            "stalls": self.stalls,
+            "stall_ms": self.stall_ms,
+            "window": self.window,
+            "scopes": dict(self.report()),
+        }
+
+    def export_csv(self, path):
+        """One row per (frame, scope) sample in the trace."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "scope", "ms"])
+            for frame, sample in self.trace:
+                for name, ms in sample.items():
+                    writer.writerow([frame, name, f"{ms:.4f}"])
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump({
+                "summary": self.summary(),
+                "trace": [{"frame": frame, "ms": sample} for frame, sample in self.trace],
+            }, f, indent=1)
+
+    def export(self, path):
+        """Exports the trace as CSV or JSON depending on the extension."""
+        if path.lower().endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
@@ -0,0 +1,410 @@
+"""
+utils/recording.py
+
+Compact binary episode recording and deterministic replay.
+
+File layout (little endian):
+    Header   : magic, version, rows, cols, keyframe interval, map seed,
+               map hash (SHA-1), terrain (zlib, only when there is no seed)
+    Entities : kind, row, col, energy, max energy (initial state)
+    Records  : TAG_TICK    -> per entity: 1 flag byte + 1 energy byte
+                              (+ 4 bytes row/col only for non-adjacent jumps)
+               TAG_KEYFRAME -> tick number + full state of every entity
+               TAG_END      -> end of episode
+
+A tick therefore costs 1 + 2 * N bytes for N entities. Keyframes every
+`keyframe_interval` ticks let the replayer seek to any tick by restoring
+the nearest keyframe and applying at most interval-1 deltas.
+
+Headless use:
+    python utils/recording.py episode.aerec            # summary
+    python utils/recording.py episode.aerec --tick 40  # state at tick 40
+    python utils/recording.py a.aerec --compare b.aerec
+"""
+
+import struct
+import zlib
+import sys
+import os
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
+
+MAGIC = b"AEREC"
+VERSION = 1
+
+TAG_TICK = 1
+TAG_KEYFRAME = 2
+TAG_END = 3
+
+KIND_ANTEATER = 0
+KIND_ANT = 1
+
+# Move codes (flag bits 0-2)
+MOVE_STAY = 0
+MOVE_UP = 1
+MOVE_DOWN = 2
+MOVE_LEFT = 3
+MOVE_RIGHT = 4
+MOVE_JUMP = 5 # Non-adjacent position change, coordinates follow
+
+MOVE_DELTAS = {
+    (0, 0): MOVE_STAY,
+    (-1, 0): MOVE_UP,
+    (1, 0): MOVE_DOWN,
+    (0, -1): MOVE_LEFT,
+    (0, 1): MOVE_RIGHT,
+}
+DELTAS_BY_MOVE = {code: delta for delta, code in MOVE_DELTAS.items()}
+
+# State / event bits
+FLAG_RECOVERING = 1 << 3
+FLAG_ALIVE = 1 << 4
+EVENT_CAPTURE = 1 << 5    # Anteater ate an ant / ant was eaten
+EVENT_TRAP = 1 << 6       # Stepped on a lethal trap
+EVENT_EXHAUSTED = 1 << 7  # Entered recovery this tick
+
+_HEADER = struct.Struct("<5sBHHHq20sI")
+_ENTITY = struct.Struct("<BHHHH")
+_KEY_ENTITY = struct.Struct("<HHHB")
+_TICK_NUMBER = struct.Struct("<I")
+_JUMP = struct.Struct("<HH")
+
+NO_SEED = -1
+
+
+class EntityState:
+    """Immutable-ish snapshot of one entity at one tick."""
+
+    __slots__ = ("kind", "r", "c", "energy", "max_energy", "recovering", "alive", "events")
+
+    def __init__(self, kind, r, c, energy, max_energy, recovering=False, alive=True, events=0):
+        self.kind = kind
+        self.r = r
+        self.c = c
+        self.energy = energy
+        self.max_energy = max_energy
+        self.recovering = recovering
+        self.alive = alive
+        self.events = events
+
+    @property
+    def position(self):
+        return (self.r, self.c)
+
+    def copy(self):
+        return EntityState(self.kind, self.r, self.c, self.energy, self.max_energy,
+                           self.recovering, self.alive, self.events)
+
+    def key(self):
+        return (self.kind, self.r, self.c, self.energy, self.recovering, self.alive)
+
+    def __repr__(self):
+        name = "Anteater" if self.kind == KIND_ANTEATER else "Ant"
+        return f"{name}({self.r}, {self.c}, E={self.energy}, alive={self.alive})"
+
+
+def _entity_state(entity, kind, alive):
+    return EntityState(kind, entity.r, entity.c, int(entity.energy), int(entity.max_energy),
+                       entity.recovering, alive)
+
+
+class EpisodeRecorder:
+    """
+    Streams an episode to disk. Create it once the map and entities are
+    set up, then call record_tick() after every simulation step.
+    Entities are tracked by identity; an ant that is no longer in the
+    `ants` list passed to record_tick() (e.g. filtered out by Duel mode)
+    is recorded as gone (not alive).
+    """
+
+    def __init__(self, path, grid, anteater, ants, keyframe_interval=64):
+        self.path = path
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.entities = [anteater] + list(ants)
+        self.kinds = [KIND_ANTEATER] + [KIND_ANT] * len(ants)
+        self.previous = [_entity_state(e, k, e.is_alive) for e, k in zip(self.entities, self.kinds)]
+        self.tick = 0
+        self.grid = grid
+
+        seed = getattr(grid, "seed", None)
+        self.file = open(path, "wb")
+        self.file.write(_HEADER.pack(MAGIC, VERSION, grid.rows, grid.cols, self.keyframe_interval,
+                                     NO_SEED if seed is None else seed,
+                                     grid.terrain_hash(), len(self.entities)))
+        if seed is None:
+            terrain = zlib.compress(grid.terrain_bytes())
+            self.file.write(_TICK_NUMBER.pack(len(terrain)))
+            self.file.write(terrain)
+
+        for state in self.previous:
+            self.file.write(_ENTITY.pack(state.kind, state.r, state.c, state.energy, state.max_energy))
+
+    def record_tick(self, anteater, ants):
+        """Appends one tick (delta record, plus a keyframe when due)."""
+        present = set(id(a) for a in ants)
+        present.add(id(anteater))
+
+        current = []
+        captured = False
+        for entity, kind, before in zip(self.entities, self.kinds, self.previous):
+            alive = entity.is_alive and id(entity) in present
+            state = _entity_state(entity, kind, alive)
+            if kind == KIND_ANT and before.alive and not alive and state.position == anteater.position:
+                state.events |= EVENT_CAPTURE
+                captured = True
+            cell = self.grid.get_cell(state.r, state.c)
+            if kind == KIND_ANTEATER and cell is not None and cell.is_lethal:
+                state.events |= EVENT_TRAP
+            if state.recovering and not before.recovering:
+                state.events |= EVENT_EXHAUSTED
+            current.append(state)
+        if captured:
+            current[0].events |= EVENT_CAPTURE
+
+        out = bytearray([TAG_TICK])
+        for before, state in zip(self.previous, current):
+            move = MOVE_DELTAS.get((state.r - before.r, state.c - before.c), MOVE_JUMP)
+            flags = move | state.events
+            if state.recovering: flags |= FLAG_RECOVERING
+            if state.alive: flags |= FLAG_ALIVE
+            out.append(flags)
+            out.append(min(255, max(0, state.energy)))
+            if move == MOVE_JUMP:
+                out += _JUMP.pack(state.r, state.c)
+        self.file.write(out)
+
+        self.tick += 1
+        self.previous = current
+        if self.tick % self.keyframe_interval == 0:
+            self._write_keyframe(current)
+
+    def _write_keyframe(self, states):
+        out = bytearray([TAG_KEYFRAME])
+        out += _TICK_NUMBER.pack(self.tick)
+        for state in states:
+            flags = state.events
+            if state.recovering: flags |= FLAG_RECOVERING
+            if state.alive: flags |= FLAG_ALIVE
+            out += _KEY_ENTITY.pack(state.r, state.c, state.energy, flags)
+        self.file.write(out)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.write(bytes([TAG_END]))
+            self.file.close()
+
+
+class EpisodeReplay:
+    """
+    Loads a recording and reconstructs the entity states at any tick.
+
+    Loading scans the file once to index keyframes and tick offsets;
+    state_at(tick) then restores the closest keyframe at or before the
+    tick and applies the remaining deltas.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+
+        (magic, version, self.rows, self.cols, self.keyframe_interval,
+         seed, self.map_hash, count) = _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an episode recording")
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version {version}")
+        self.seed = None if seed == NO_SEED else seed
+
+        pos = _HEADER.size
+        self.terrain = None
+        if self.seed is None:
+            (size,) = _TICK_NUMBER.unpack_from(self.data, pos)
+            pos += _TICK_NUMBER.size
+            self.terrain = zlib.decompress(self.data[pos:pos + size])
+            pos += size
+
+        self.initial = []
+        for _ in range(count):
+            kind, r, c, energy, max_energy = _ENTITY.unpack_from(self.data, pos)
+            self.initial.append(EntityState(kind, r, c, energy, max_energy))
+            pos += _ENTITY.size
+
+        self.tick_offsets = [] # tick_offsets[t] = offset of the record producing tick t+1
+        self.keyframes = {0: pos} # tick -> offset of keyframe payload (0 = initial state)
+        self._index(pos)
+
+    @property
+    def tick_count(self):
+        return len(self.tick_offsets)
+
+    def _index(self, pos):
+        data = self.data
+        count = len(self.initial)
+        while pos < len(data):
+            tag = data[pos]
+            if tag == TAG_END:
+                break
+            if tag == TAG_TICK:
+                self.tick_offsets.append(pos)
+                pos += 1
+                for _ in range(count):
+                    flags = data[pos]
+                    pos += 2
+                    if flags & 0b111 == MOVE_JUMP:
+                        pos += _JUMP.size
+            elif tag == TAG_KEYFRAME:
+                (tick,) = _TICK_NUMBER.unpack_from(data, pos + 1)
+                self.keyframes[tick] = pos
+                pos += 1 + _TICK_NUMBER.size + count * _KEY_ENTITY.size
+            else:
+                raise ValueError(f"Corrupt recording: unknown tag {tag} at offset {pos}")
+
+    def _read_keyframe(self, tick):
+        if tick == 0:
+            return [s.copy() for s in self.initial]
+        pos = self.keyframes[tick] + 1 + _TICK_NUMBER.size
+        states = []
+        for base in self.initial:
+            r, c, energy, flags = _KEY_ENTITY.unpack_from(self.data, pos)
+            pos += _KEY_ENTITY.size
+            states.append(EntityState(base.kind, r, c, energy, base.max_energy,
+                                      bool(flags & FLAG_RECOVERING), bool(flags & FLAG_ALIVE),
+                                      flags & (EVENT_CAPTURE | EVENT_TRAP | EVENT_EXHAUSTED)))
+        return states
+
+    def _apply_tick(self, states, tick_index):
+        data = self.data
+        pos = self.tick_offsets[tick_index] + 1
+        for state in states:
+            flags = data[pos]
+            state.energy = data[pos + 1]
+            pos += 2
+            move = flags & 0b111
+            if move == MOVE_JUMP:
+                state.r, state.c = _JUMP.unpack_from(data, pos)
+                pos += _JUMP.size
+            else:
+                dr, dc = DELTAS_BY_MOVE[move]
+                state.r += dr
+                state.c += dc
+            state.recovering = bool(flags & FLAG_RECOVERING)
+            state.alive = bool(flags & FLAG_ALIVE)
+            state.events = flags & (EVENT_CAPTURE | EVENT_TRAP | EVENT_EXHAUSTED)
+
+    def state_at(self, tick):
+        """Entity states after `tick` ticks (0 = initial)."""
+        tick = max(0, min(tick, self.tick_count))
+        base = (tick // self.keyframe_interval) * self.keyframe_interval
+        while base not in self.keyframes:
+            base -= self.keyframe_interval
+        states = self._read_keyframe(base)
+        for t in range(base, tick):
+            self._apply_tick(states, t)
+        return states
+
+    def iter_states(self):
+        """Yields (tick, states) for every tick, sequentially (no seeking)."""
+        states = self._read_keyframe(0)
+        yield 0, [s.copy() for s in states]
+        for t in range(self.tick_count):
+            self._apply_tick(states, t)
+            yield t + 1, [s.copy() for s in states]
+
+    def build_grid(self):
+        """Rebuilds the recorded map and checks it against the stored hash."""
+        from environment.grid import Grid
+
+        grid = Grid(self.rows, self.cols)
+        if self.seed is not None:
+            grid.generate_navigation_map(seed=self.seed)
+        else:
+            grid.load_terrain(self.terrain)
+        if grid.terrain_hash() != self.map_hash:
+            raise ValueError("Recorded map hash does not match the rebuilt map")
+        return grid
+
+    def build_entities(self, tick):
+        """Returns (anteater, ants) Entity objects positioned at `tick`."""
+        from environment.entities import Anteater, Ant
+
+        anteater, ants = None, []
+        for state in self.state_at(tick):
+            entity = Anteater(state.r, state.c) if state.kind == KIND_ANTEATER else Ant(state.r, state.c)
+            entity.energy = state.energy
+            entity.recovering = state.recovering
+            entity.is_alive = state.alive
+            if state.kind == KIND_ANTEATER:
+                anteater = entity
+            else:
+                ants.append(entity)
+        return anteater, ants
+
+    def events(self):
+        """Lists (tick, entity index, event flags) for every recorded event."""
+        found = []
+        for tick, states in self.iter_states():
+            for i, state in enumerate(states):
+                if state.events:
+                    found.append((tick, i, state.events))
+        return found
+
+    def summary(self):
+        final = self.state_at(self.tick_count)
+        anteater = final[0]
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "seed": self.seed,
+            "map_hash": self.map_hash.hex(),
+            "ticks": self.tick_count,
+            "bytes": len(self.data),
+            "ants": len(final) - 1,
+            "ants_eaten": sum(1 for s in final[1:] if not s.alive),
+            "anteater_final": anteater.position,
+            "anteater_energy": anteater.energy,
+            "died_in_trap": any(flags & EVENT_TRAP for _, i, flags in self.events() if i == 0),
+        }
+
+
+def first_divergence(replay_a, replay_b):
+    """
+    Compares two recordings tick by tick (regression fixtures).
+    Returns None if they match, otherwise the first differing tick.
+    """
+    if replay_a.map_hash != replay_b.map_hash:
+        return 0
+    iter_b = replay_b.iter_states()
+    for (tick, states_a), (_, states_b) in zip(replay_a.iter_states(), iter_b):
+        if [s.key() for s in states_a] != [s.key() for s in states_b]:
+            return tick
+    if replay_a.tick_count != replay_b.tick_count:
+        return min(replay_a.tick_count, replay_b.tick_count) + 1
+    return None
+
+
+def _main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect an Ant Eater episode recording.")
+    parser.add_argument("path")
+    parser.add_argument("--tick", type=int, help="Print entity states at this tick")
+    parser.add_argument("--compare", help="Second recording to diff against")
+    args = parser.parse_args(argv)
+
+    replay = EpisodeReplay(args.path)
+    if args.compare:
+        tick = first_divergence(replay, EpisodeReplay(args.compare))
+        print("IDENTICAL" if tick is None else f"DIVERGED at tick {tick}")
+        return 0 if tick is None else 1
+    if args.tick is not None:
+        for state in replay.state_at(args.tick):
+            print(state)
+        return 0
+    for key, value in replay.summary().items():
+        print(f"{key:>16}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,227 @@
+"""
+utils/render_benchmark.py
+
+Headless frame-time benchmark of utils/visualization.
+
+Renders offscreen through SDL's dummy video driver (no window, no GPU),
+for every combination of map size, scent overlay on/off and preview path
+length, and times draw_grid, draw_entities, draw_path and draw_info per
+frame with a FrameProfiler. Alongside p50/p95/p99/max (ms) it counts, per
+function and frame, the surfaces each draw call allocates:
+- surfaces:  pygame.Surface(...) constructions
+- text:      Font.render calls (every one returns a new surface)
+- fonts:     pygame.font.SysFont lookups
+Results go to JSON; --baseline compares against an earlier run and exits
+with 1 when a function's p95 got slower than the tolerance allows.
+
+Usage:
+    python utils/render_benchmark.py [--sizes 20 40 80] [--paths 0 50 400]
+                                     [--frames 200] [--out render_benchmark.json]
+                                     [--baseline old.json --tolerance 0.25]
+"""
+
+import json
+import os
+import platform
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Before pygame opens a display
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path: sys.path.append(ROOT)
+import pygame
+import config
+from environment.grid import Grid
+from environment.entities import Anteater, Ant
+from utils import visualization
+from utils.profiler import FrameProfiler
+
+FUNCTIONS = ("draw_grid", "draw_entities", "draw_path", "draw_info")
+WARMUP_FRAMES = 10
+
+
+class _CountingFont:
+    """Font proxy counting render() calls."""
+
+    def __init__(self, font, counter):
+        self._font = font
+        self._counter = counter
+
+    def render(self, *args, **kwargs):
+        self._counter.hit("text")
+        return self._font.render(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._font, name)
+
+
+class AllocationCounter:
+    """
+    Counts surface allocations per benchmarked function while installed
+    (patches pygame.Surface and pygame.font.SysFont, restored on exit).
+    """
+
+    def __init__(self):
+        self.scope = None
+        self.counts = {}  # function -> {"surfaces": n, "text": n, "fonts": n}
+
+    def hit(self, kind):
+        if self.scope is not None:
+            counts = self.counts.setdefault(self.scope, {"surfaces": 0, "text": 0, "fonts": 0})
+            counts[kind] += 1
+
+    def __enter__(self):
+        counter = self
+        self._surface, self._sysfont = pygame.Surface, pygame.font.SysFont
+
+        class CountedSurface(self._surface):
+            def __init__(self, *args, **kwargs):
+                counter.hit("surfaces")
+                super().__init__(*args, **kwargs)
+
+        def counted_sysfont(*args, **kwargs):
+            counter.hit("fonts")
+            return _CountingFont(self._sysfont(*args, **kwargs), counter)
+
+        pygame.Surface = CountedSurface
+        pygame.font.SysFont = counted_sysfont
+        visualization._FONTS.clear() # Cached fonts are looked up again through the counter
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pygame.Surface, pygame.font.SysFont = self._surface, self._sysfont
+        visualization._FONTS.clear()
+        return False
+
+
+def _scenario(size, path_length, seed):
+    """Map, entities and a preview path of path_length cells (serpentine)."""
+    grid = Grid(size, size)
+    grid.generate_navigation_map(seed=seed)
+    rng = random.Random(seed)
+    free = [(r, c) for r in range(size) for c in range(size) if grid.get_cell(r, c).cost < config.COST_TRAP]
+    anteater = Anteater(0, 0)
+    ants = [Ant(*rng.choice(free)) for _ in range(4)]
+    serpentine = [(r, c if r % 2 == 0 else size - 1 - c) for r in range(size) for c in range(size)]
+    path = [grid.get_cell(r, c) for r, c in serpentine[:path_length]]
+    return grid, anteater, ants, path
+
+
+def run_case(screen, size, scent, path_length, frames, seed=0):
+    """Renders one combination; returns its result entry."""
+    grid, anteater, ants, path = _scenario(size, path_length, seed)
+    if scent:
+        grid.update_scent(ants)
+    profiler = FrameProfiler(window=frames, stall_ms=1000.0 / 30)
+    counter = AllocationCounter()
+
+    with counter:
+        for frame in range(WARMUP_FRAMES + frames):
+            if frame == WARMUP_FRAMES: # Measured frames only
+                profiler = FrameProfiler(window=frames, stall_ms=1000.0 / 30)
+                counter.counts.clear()
+            profiler.begin_frame()
+            screen.fill(config.COLOR_WHITE)
+            for name in FUNCTIONS:
+                counter.scope = name
+                with profiler.scope(name):
+                    if name == "draw_grid":
+                        visualization.draw_grid(screen, grid, show_scent=scent)
+                    elif name == "draw_entities":
+                        visualization.draw_entities(screen, anteater, ants)
+                    elif name == "draw_path":
+                        visualization.draw_path(screen, path)
+                    else:
+                        visualization.draw_info(screen, anteater, ants, "Benchmark", "Rendering",
+                                                steps=frame, preview_steps=len(path), preview_cost=0)
+            counter.scope = None
+            pygame.display.flip()
+            profiler.end_frame()
+
+    functions = {}
+    for name in FUNCTIONS + ("frame",):
+        entry = {k: round(v, 4) for k, v in profiler.percentiles(name).items()}
+        for kind, count in counter.counts.get(name, {"surfaces": 0, "text": 0, "fonts": 0}).items():
+            entry[f"{kind}_per_frame"] = count / frames
+        functions[name] = entry
+    return {"rows": size, "cols": size, "scent": scent, "path_length": path_length,
+            "frames": frames, "stalls": profiler.stalls, "functions": functions}
+
+
+def compare(results, baseline, tolerance):
+    """Regressions: (case, function, old p95, new p95) where new > old * (1 + tolerance)."""
+    key = lambda r: (r["rows"], r["cols"], r["scent"], r["path_length"])
+    old = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = old.get(key(result))
+        if before is None:
+            continue
+        for name, entry in result["functions"].items():
+            prev = before["functions"].get(name)
+            if prev and entry["p95"] > prev["p95"] * (1.0 + tolerance):
+                regressions.append((key(result), name, prev["p95"], entry["p95"]))
+    return regressions
+
+
+def _main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark of the renderer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 40, 80])
+    parser.add_argument("--paths", type=int, nargs="+", default=[0, 50, 400], help="Preview path lengths")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="render_benchmark.json")
+    parser.add_argument("--baseline", help="Earlier JSON output to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown (0.25 = +25%%)")
+    args = parser.parse_args(argv)
+    # Output and baseline paths are the caller's, not the repo root's
+    args.out = os.path.abspath(args.out)
+    if args.baseline:
+        args.baseline = os.path.abspath(args.baseline)
+
+    os.chdir(ROOT) # Assets are loaded from ./assets, as when running main.py
+    pygame.init()
+    results = []
+    for size in args.sizes:
+        # Board plus the side panel, as init_screen() sizes it for the default map
+        screen = pygame.display.set_mode((size * config.GRID_SIZE + 400, max(size * config.GRID_SIZE, 800)))
+        for scent in (False, True):
+            for path_length in args.paths:
+                result = run_case(screen, size, scent, min(path_length, size * size), args.frames, args.seed)
+                results.append(result)
+                fn = result["functions"]
+                print(f"{size:>4}x{size:<4} scent={'on ' if scent else 'off'} path={result['path_length']:>5}  "
+                      + "  ".join(f"{name} p95 {fn[name]['p95']:.2f}ms" for name in FUNCTIONS + ("frame",)))
+    pygame.quit()
+
+    report = {
+        "meta": {
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(map(str, pygame.get_sdl_version())),
+            "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"Wrote {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for case, name, before, after in regressions:
+            print(f"REGRESSION {case} {name}: p95 {before:.2f}ms -> {after:.2f}ms")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -8,12 +8,19 @@ import pygame
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path: sys.path.append(_ROOT)
 import config
 from environment.cell import TerrainType
 
-# Asset Cache
-ASSETS = {}
+# Asset Cache (decoded and scaled on first use)
+ASSETS = {}   # name -> Surface, or None if it could not be loaded
+ASSET_FILES = {  # name -> (file in assets/, size relative to a cell)
+    "anteater": ("anteater.png", 1.0),
+    "ant": ("ant.png", 0.8),
+    "mud": ("mud.png", 1.0),
+}
+_FONTS = {}   # (name, size) -> Font
 
 def init_screen():
     pygame.init()
@@ -21,31 +28,35 @@ def init_screen():
     pygame.display.set_caption("Ant Eater Simulation: v2.0 Retro")
     return screen
 
-def load_assets():
-    if ASSETS: return
-    
+def asset(name):
+    """The scaled image, loaded the first time it is drawn; None -> fallback shapes."""
+    if name in ASSETS:
+        return ASSETS[name]
+    filename, scale = ASSET_FILES[name]
+    size = int(config.GRID_SIZE * scale)
     try:
-        # Load and Scale
-        cell_size = config.GRID_SIZE
-        
-        # Anteater
-        img = pygame.image.load(os.path.join("assets", "anteater.png"))
-        ASSETS["anteater"] = pygame.transform.scale(img, (cell_size, cell_size))
-        
-        # Ant
-        img = pygame.image.load(os.path.join("assets", "ant.png"))
-        ASSETS["ant"] = pygame.transform.scale(img, (int(cell_size*0.8), int(cell_size*0.8)))
-        
-        # Mud
-        img = pygame.image.load(os.path.join("assets", "mud.png"))
-        ASSETS["mud"] = pygame.transform.scale(img, (cell_size, cell_size))
-        
+        img = pygame.image.load(os.path.join("assets", filename))
+        ASSETS[name] = pygame.transform.scale(img, (size, size)).convert_alpha()
     except Exception as e:
-        print(f"Warning: Could not load assets: {e}. Fallback to shapes.")
+        print(f"Warning: Could not load asset {filename}: {e}. Fallback to shapes.")
+        ASSETS[name] = None # Not retried every frame
+    return ASSETS[name]
+
+def load_assets():
+    """Loads every asset now (otherwise each one loads on first use)."""
+    for name in ASSET_FILES:
+        asset(name)
+
+def get_font(name, size):
+    """Bold SysFont, looked up once (the system font search is slow)."""
+    key = (name, size)
+    if key not in _FONTS:
+        _FONTS[key] = pygame.font.SysFont(name, size, bold=True)
+    return _FONTS[key]
 
 def draw_grid(screen, grid, show_scent=False):
-    load_assets() # Ensure loaded
     cell_size = config.GRID_SIZE
+    mud = None
     
     for r in range(grid.rows):
         for c in range(grid.cols):
@@ -58,8 +69,9 @@ def draw_grid(screen, grid, show_scent=False):
             if cell.terrain_type == TerrainType.MUD:
                 color = config.COLOR_TERRAIN_MUD
                 pygame.draw.rect(screen, color, rect)
-                if "mud" in ASSETS:
-                    screen.blit(ASSETS["mud"], (c*cell_size, r*cell_size))
+                mud = mud or asset("mud")
+                if mud:
+                    screen.blit(mud, (c*cell_size, r*cell_size))
             elif cell.terrain_type == TerrainType.TRAP:
                 color = config.COLOR_TERRAIN_TRAP
                 pygame.draw.rect(screen, color, rect)
@@ -81,24 +93,25 @@ def draw_grid(screen, grid, show_scent=False):
 
             pygame.draw.rect(screen, config.COLOR_GRID_LINE, rect, 1) # Border
 
-def draw_entities(screen, anteater, ants):
-    load_assets()
+def draw_entities(screen, anteater, ants, pack=()):
     cell_size = config.GRID_SIZE
+    anteater_img, ant_img = asset("anteater"), asset("ant")
     
-    # Draw Anteater
-    ax, ay = anteater.c * cell_size, anteater.r * cell_size
-    if "anteater" in ASSETS:
-        screen.blit(ASSETS["anteater"], (ax, ay))
-    else:
-        pygame.draw.circle(screen, config.COLOR_ANTEATER, (ax + cell_size//2, ay + cell_size//2), cell_size//3)
+    # Draw Anteater (and the rest of the pack in Mode 9)
+    for hunter in (anteater, *pack):
+        ax, ay = hunter.c * cell_size, hunter.r * cell_size
+        if anteater_img:
+            screen.blit(anteater_img, (ax, ay))
+        else:
+            pygame.draw.circle(screen, config.COLOR_ANTEATER, (ax + cell_size//2, ay + cell_size//2), cell_size//3)
     
     # Draw Ants
     for ant in ants:
         if ant.is_alive:
             tx, ty = ant.c * cell_size, ant.r * cell_size
-            if "ant" in ASSETS:
-                offset = (cell_size - ASSETS["ant"].get_width()) // 2
-                screen.blit(ASSETS["ant"], (tx + offset, ty + offset))
+            if ant_img:
+                offset = (cell_size - ant_img.get_width()) // 2
+                screen.blit(ant_img, (tx + offset, ty + offset))
             else:
                 pygame.draw.circle(screen, config.COLOR_ANT, (tx + cell_size//2, ty + cell_size//2), cell_size//4)
 
@@ -113,9 +126,24 @@ def draw_path(screen, path):
         s.fill(config.COLOR_PATH)
         screen.blit(s, (cell.c * cell_size, cell.r * cell_size))
 
-def draw_info(screen, anteater, ants, current_algo, status_text, steps=0, preview_steps=None, preview_cost=None):
-    font = pygame.font.SysFont("Courier New", 15, bold=True) # Slightly smaller font
-    title_font = pygame.font.SysFont("Verdana", 20, bold=True)
+def draw_compare(screen, compare):
+    """
+    Compare-mode overlay: every finished planner's path as a coloured line
+    through the cell centres, each shifted a little so overlapping paths
+    stay visible.
+    """
+    cell_size = config.GRID_SIZE
+    names = list(config.COMPARE_COLORS)
+    for name, result in compare.results.items():
+        if len(result.path) < 2: continue
+        shift = (names.index(name) - (len(names) - 1) / 2) * 3 if name in names else 0
+        points = [(c * cell_size + cell_size // 2 + shift, r * cell_size + cell_size // 2 + shift)
+                  for r, c in result.path]
+        pygame.draw.lines(screen, config.COMPARE_COLORS.get(name, config.COLOR_PATH), False, points, 3)
+
+def draw_info(screen, anteater, ants, current_algo, status_text, steps=0, preview_steps=None, preview_cost=None, profiler=None, search_stats=None, preview_ticks=None, compare=None):
+    font = get_font("Courier New", 15) # Slightly smaller font
+    title_font = get_font("Verdana", 20)
     
     # UI Panel Settings
     panel_x = config.COLS * config.GRID_SIZE
@@ -178,6 +206,31 @@ def draw_info(screen, anteater, ants, current_algo, status_text, steps=0, previe
 
     if preview_steps is not None:
         draw_line("PREVIEW:", str(preview_steps), (100, 255, 255))
+
+    if preview_ticks is not None:
+        draw_line("TRAVEL:", f"{preview_ticks} Ticks", (100, 255, 255))
+
+    # Compare Widget: one line per planner (steps, energy, compute time)
+    if compare is not None:
+        for name, color in config.COMPARE_COLORS.items():
+            result = compare.results.get(name)
+            if result is None:
+                draw_line(f"{name}:", "..." if compare.running else "-", color)
+            elif not result.path:
+                draw_line(f"{name}:", f"NO PATH {result.elapsed * 1000.0:.0f}ms", color)
+            else:
+                draw_line(f"{name}:", f"{result.steps}st {result.cost}E {result.elapsed * 1000.0:.0f}ms", color)
+
+    # Search Stats Widget (compact, two lines)
+    if search_stats is not None and search_stats.runs:
+        small_font = get_font("Courier New", 12)
+        line_1 = (f"EXP {search_stats.expanded}  GEN {search_stats.generated}  "
+                  f"PEAK {search_stats.peak_frontier}  {search_stats.elapsed * 1000.0:.1f}ms")
+        line_2 = (f"PUSH {search_stats.pushes}  POP {search_stats.pops}  REEXP {search_stats.reexpansions}  "
+                  f"CUT {search_stats.cutoffs}  TT {search_stats.tt_hits}")
+        screen.blit(small_font.render(line_1, True, (180, 180, 255)), (margin_left, y_offset))
+        screen.blit(small_font.render(line_2, True, (180, 180, 255)), (margin_left, y_offset + 15))
+        y_offset += 32
     
     y_offset += 25
 
@@ -202,6 +255,11 @@ def draw_info(screen, anteater, ants, current_algo, status_text, steps=0, previe
             y_offset += 5
 
     y_offset += 30
+
+    # --- SECTION: PROFILER (replaces CONTROLS while the HUD is on) ---
+    if profiler is not None and profiler.show_hud:
+        draw_profiler_hud(screen, profiler, margin_left, y_offset)
+        return
     
     # --- SECTION: CONTROLS ---
     ctrl_header = font.render("--- CONTROLS ---", True, (0, 255, 255))
@@ -214,9 +272,39 @@ def draw_info(screen, anteater, ants, current_algo, status_text, steps=0, previe
         ("3", "A* PREVIEW"),
         ("4", "SCENT PREVIEW"),
         ("5", "AI BATTLE"),
+        ("6", "TOUR PREVIEW"),
+        ("7", "ENERGY A* PREVIEW"),
+        ("8", "MCTS BATTLE"),
+        ("9", "PACK HUNT"),
+        ("E", "EXPECTIMAX"),
+        ("C", "COMPARE ALL"),
         ("ENTER", "EXECUTE MOVE"),
+        ("P / X", "PROFILER / EXPORT"),
         ("R", "RESET GAME"),
     ]
     
     for k, d in controls:
         draw_line(k, d, (255, 165, 0))
+
+
+def draw_profiler_hud(screen, profiler, x, y):
+    """Rolling p50/p95/max per scope (ms), smaller font to fit the panel."""
+    header_font = get_font("Courier New", 15)
+    font = get_font("Courier New", 12)
+
+    header = header_font.render("--- PROFILER (ms) ---", True, (0, 255, 255))
+    screen.blit(header, (x, y))
+    y += 22
+
+    columns = font.render(f"{'SCOPE':<14}{'P50':>7}{'P95':>7}{'MAX':>7}", True, (150, 150, 150))
+    screen.blit(columns, (x, y))
+    y += 16
+
+    for name, stats in profiler.report():
+        color = (255, 80, 80) if stats["p95"] > profiler.stall_ms else (200, 200, 200)
+        line = f"{name[:13]:<14}{stats['p50']:>7.2f}{stats['p95']:>7.2f}{stats['max']:>7.1f}"
+        screen.blit(font.render(line, True, color), (x, y))
+        y += 16
+
+    stalls = font.render(f"STALLS >{profiler.stall_ms:.0f}ms: {profiler.stalls}", True, (255, 165, 0))
+    screen.blit(stalls, (x, y))
\ No newline at end of file